@@ -34,17 +34,125 @@ class Unit():
         return self.symbol
     
     def __eq__(self, value):
+        if not isinstance(value, Unit):
+            return NotImplemented
         return (
             (self.si_shift == value.si_shift) and
             (self.conversion == value.conversion) and
             (self.native_shift == value.native_shift) and
             (self.type == value.type))
 
+    def __hash__(self):
+        # equal units convert identically, so they hash the same whatever their symbol
+        return hash((self.si_shift, self.conversion, self.native_shift, self.type))
+
+class Converter():
+    def __init__(self, unit_from: Unit, unit_to: Unit):
+        """
+        Creates a conversion between two units, with the type check done up front
+
+        Works on anything that supports ``*`` and ``+``, including NumPy arrays.
+
+        :param unit_from: Unit to convert from
+        :type unit_from: Unit
+        :param unit_to: Unit to convert to
+        :type unit_to: Unit
+        """
+        if unit_from.type != unit_to.type:
+            raise ValueError("Cannot convert between units of mismatched type!")
+        self.unit_from = unit_from
+        self.unit_to = unit_to
+        self.identity = unit_from == unit_to
+        # the arithmetic is kept in the same order as going through SI units
+        # by hand, so results match to the last bit (e.g. 100 °C is exactly
+        # 212 °F); only the lookups and checks are done ahead of time
+        self.shift_in = unit_from.native_shift
+        self.scale_in = unit_from.conversion
+        self.si_shift = unit_from.si_shift - unit_to.si_shift
+        self.scale_out = unit_to.conversion
+        self.shift_out = unit_to.native_shift
+        # how fast the result changes with the value, for converting slopes
+        self.slope = 1.0 if self.identity else self.scale_in / self.scale_out
+
+    def __call__(self, value):
+        if self.identity:
+            return value
+        return ((value + self.shift_in) * self.scale_in + self.si_shift) / self.scale_out - self.shift_out
+
+    def __repr__(self):
+        return f"Converter({self.unit_from!r} -> {self.unit_to!r})"
+
+_converters = {}
+
+def converter(unit_from: Unit, unit_to: Unit) -> Converter:
+    """
+    Returns the (cached) ``Converter`` from ``unit_from`` to ``unit_to``.
+
+    :param unit_from: Unit to convert from
+    :type unit_from: Unit
+    :param unit_to: Unit to convert to
+    :type unit_to: Unit
+    :return: Converter between the two
+    :rtype: Converter
+    """
+    # keyed on the units themselves: equal units convert identically, so units
+    # rebuilt per request share one entry instead of growing the cache
+    key = (unit_from, unit_to)
+    conv = _converters.get(key)
+    if conv is None:
+        conv = _converters[key] = Converter(unit_from, unit_to)
+    return conv
+
+class Registry():
+    def __init__(self, units=()):
+        """
+        Creates a lookup of units by symbol and by type
+
+        :param units: Units to register, in display order
+        :type units: list[Unit]
+        """
+        self.by_symbol = {}
+        self.by_type = {}
+        for unit in units:
+            self.add(unit)
+
+    def add(self, unit: Unit) -> None:
+        self.by_symbol[unit.symbol] = unit
+        self.by_type.setdefault(unit.type, []).append(unit)
+
+    def __getitem__(self, symbol: str) -> Unit:
+        return self.by_symbol[symbol]
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self.by_symbol
+
+    def __iter__(self):
+        return iter(self.by_symbol.values())
+
+    def get(self, symbol: str, type: Type = None) -> Unit:
+        """
+        Finds a unit by symbol.
+
+        :param symbol: Unit symbol
+        :type symbol: str
+        :param type: If given, the unit must be of this type
+        :type type: Type
+        :return: The unit, or None if there is no such unit of that type
+        :rtype: Unit
+        """
+        unit = self.by_symbol.get(symbol)
+        if unit is None or (type is not None and unit.type != type):
+            return None
+        return unit
+
+    def of_type(self, type: Type) -> list:
+        return list(self.by_type.get(type, []))
+
 def convert(value: float, unit_from: Unit, unit_to: Unit) -> float:
     """
     Returns ``value`` converted to ``unit_to`` from ``unit_from``. 
     
-    :param value: Value to convert
+    :param value: Value to convert, or an array of them
     :type value: float
     :param unit_from: Unit to convert from (the unit of ``value``)
     :type unit_from: Unit
@@ -53,9 +161,4 @@ def convert(value: float, unit_from: Unit, unit_to: Unit) -> float:
     :return: ``value``, in terms of ``unit_to``
     :rtype: float
     """
-    if unit_from == unit_to:
-        return value
-    if unit_from.type != unit_to.type:
-        raise ValueError("Cannot convert between units of mismatched type!")
-    si_value = ((value + unit_from.native_shift) * unit_from.conversion) + unit_from.si_shift
-    return ((si_value - unit_to.si_shift) / unit_to.conversion) - unit_to.native_shift
\ No newline at end of file
+    return converter(unit_from, unit_to)(value)
@@ -0,0 +1,359 @@
+import os
+from array import array
+from math import log10, nan
+import steam_engine
+import table_cache
+from steam_engine import Property, Phase, PHASES, Table, SaturationDome
+
+# Tables resampled onto evenly spaced nodes, so a lookup works out its cell
+# with arithmetic instead of searching. comp_sup becomes a DenseGrid, even in
+# temperature and in log pressure; a saturation table becomes a DenseLine,
+# even in whichever of the two it is searched by. Both trade accuracy for
+# speed; error_report says how much, against the lookups they were built from.
+#
+# Nodes are stored as a Table (nodes in row order, temperature major for a
+# grid) so they can be saved and mapped with table_cache like the tables are.
+
+def node_phase(value) -> int:
+    # phase code for a node, -1 where the lookup blended two phases
+    try:
+        return PHASES.index(Phase(value))
+    except ValueError:
+        return -1
+
+def axis(low: float, high: float, step: float) -> tuple:
+    # (start, step, count) of evenly spaced nodes from low up to at most high
+    return low, step, int((high - low) / step + 1e-9) + 1
+
+def dense_path(csv_path: str) -> str:
+    return os.path.splitext(csv_path)[0] + ".dense.cache"
+
+class DenseGrid():
+    def __init__(self, table: Table, T_axis: tuple, log_P_axis: tuple, dome: bool = False):
+        """
+        Wraps nodes already resampled from a temperature and pressure table
+
+        :param table: Node values, temperature major
+        :type table: Table
+        :param T_axis: ``(start, step, count)`` of the temperatures, in °C
+        :type T_axis: tuple
+        :param log_P_axis: ``(start, step, count)`` of the base 10 logarithms
+            of the pressures, in MPa
+        :type log_P_axis: tuple
+        :param dome: Whether the nodes were looked up against the saturation dome
+        :type dome: bool
+        """
+        self.table = table
+        self.dome = dome
+        (self.T_start, self.T_step, self.n_T) = T_axis
+        (self.log_P_start, self.log_P_step, self.n_P) = log_P_axis
+        # the axes as fractions of a cell, so locating one is a multiply and an add
+        self._T_scale = 1 / self.T_step
+        self._T_offset = -self.T_start / self.T_step
+        self._P_scale = 1 / self.log_P_step
+        self._P_offset = -self.log_P_start / self.log_P_step
+        self._columns = table.columns
+
+    @classmethod
+    def build(cls, T_P_table: Table, T_step: float = 5.0, log_P_step: float = 0.02, dome: SaturationDome = None) -> "DenseGrid":
+        """
+        Resamples a temperature and pressure table
+
+        :param T_P_table: Table to resample, e.g. ``comp_sup``
+        :type T_P_table: Table
+        :param T_step: Node spacing in temperature, in °C
+        :type T_step: float
+        :param log_P_step: Node spacing in base 10 logarithm of pressure
+        :type log_P_step: float
+        :param dome: Passed on to ``find_state_T_P`` for each node
+        :type dome: SaturationDome
+        :return: The resampled grid
+        :rtype: DenseGrid
+        """
+        grid = T_P_table.grid()
+        T_axis = axis(grid.temps[0], grid.temps[-1], T_step)
+        log_P_axis = axis(log10(grid.pressures[0]), log10(grid.pressures[-1]), log_P_step)
+        pressures = [10 ** (log_P_axis[0] + j * log_P_step) for j in range(log_P_axis[2])]
+        columns = {x: array("d") for x in T_P_table.columns}
+        phases = array("b") if T_P_table.phases is not None else None
+        for i in range(T_axis[2]):
+            T = T_axis[0] + i * T_step
+            for P in pressures:
+                state = steam_engine.find_state_T_P(T, P, T_P_table, None, dome)
+                for (prop, column) in columns.items():
+                    column.append(state[prop] if state is not None else nan)
+                if phases is not None:
+                    phases.append(node_phase(state[Property.PHASE]) if state is not None else -1)
+        return cls(Table(columns, phases), T_axis, log_P_axis, dome is not None)
+
+    def locate(self, T: float, P: float):
+        # (first node of the cell, fraction across in T, fraction across in log P);
+        # on the last node of an axis the fraction is 0 and the node starts the cell
+        if not P > 0:
+            return None
+        x = T * self._T_scale + self._T_offset
+        y = log10(P) * self._P_scale + self._P_offset
+        if not (0 <= x <= self.n_T - 1 and 0 <= y <= self.n_P - 1):
+            return None
+        i = int(x)
+        j = int(y)
+        return i * self.n_P + j, x - i, y - j
+
+    def value(self, T: float, P: float, prop: Property):
+        """
+        Looks up one property, interpolating bilinearly in T and log P.
+
+        The phase is taken from the nearest node.
+
+        :param T: Temperature, in °C
+        :type T: float
+        :param P: Pressure, in MPa
+        :type P: float
+        :param prop: Property to look up
+        :type prop: Property
+        :return: The value, or None outside the table or where a corner of
+            the cell the value depends on is outside the table
+        :rtype: float | str
+        """
+        if prop == Property.PHASE:
+            cell = self.locate(T, P)
+            if cell is None:
+                return None
+            (k, x, y) = cell
+            code = self.table.phases[k + (self.n_P if x >= 0.5 else 0) + (1 if y >= 0.5 else 0)]
+            return PHASES[code].value if code >= 0 else None
+        # locate, inlined since this is the hot path
+        if not P > 0:
+            return None
+        x = T * self._T_scale + self._T_offset
+        y = log10(P) * self._P_scale + self._P_offset
+        n = self.n_P
+        if not (0 <= x <= self.n_T - 1 and 0 <= y <= n - 1):
+            return None
+        i = int(x)
+        j = int(y)
+        k = i * n + j
+        x -= i
+        y -= j
+        # corners with no weight are left out, as they may be blank (NaN)
+        column = self._columns[prop]
+        result = column[k]
+        if y:
+            result = result * (1 - y) + column[k + 1] * y
+        if x:
+            high = column[k + n]
+            if y:
+                high = high * (1 - y) + column[k + n + 1] * y
+            result = result * (1 - x) + high * x
+        return result if result == result else None
+
+    def state(self, T: float, P: float, props: list = None):
+        if props is None:
+            props = self.table.properties()
+        state = {x: self.value(T, P, x) for x in props}
+        return None if all(x is None for x in state.values()) else state
+
+    def header(self) -> dict:
+        return {"dense": {"kind": "grid", "dome": self.dome, "axes": [
+            [self.T_start, self.T_step, self.n_T],
+            [self.log_P_start, self.log_P_step, self.n_P],
+        ]}}
+
+    def error_report(self, T_P_table: Table, props: list = None, dome: SaturationDome = None) -> dict:
+        """
+        Compares lookups at the centre of every cell, where bilinear
+        interpolation is furthest from its nodes, with ``find_state_T_P``.
+
+        :return: For each numeric property, ``max_error`` (absolute, in table
+            units), the ``T`` and ``P`` it occurred at, and how many points
+            were ``compared``
+        :rtype: dict[Property, dict]
+        """
+        if props is None:
+            props = [x for x in self.table.columns if x not in (Property.TEMP, Property.PRESSURE)]
+        report = {x: {"max_error": 0.0, "T": None, "P": None, "compared": 0} for x in props}
+        for i in range(self.n_T - 1):
+            T = self.T_start + (i + 0.5) * self.T_step
+            for j in range(self.n_P - 1):
+                P = 10 ** (self.log_P_start + (j + 0.5) * self.log_P_step)
+                exact = steam_engine.find_state_T_P(T, P, T_P_table, props, dome)
+                if exact is None:
+                    continue
+                for prop in props:
+                    (want, got) = (exact[prop], self.value(T, P, prop))
+                    if got is None or want != want:
+                        continue
+                    entry = report[prop]
+                    entry["compared"] += 1
+                    if abs(got - want) > entry["max_error"]:
+                        entry.update(max_error=abs(got - want), T=T, P=P)
+        return report
+
+class DenseLine():
+    def __init__(self, table: Table, search_by: Property, key_axis: tuple, log: bool):
+        """
+        Wraps nodes already resampled from a saturation table
+
+        :param table: Node values
+        :type table: Table
+        :param search_by: Property the nodes are spaced in
+        :type search_by: Property
+        :param key_axis: ``(start, step, count)`` of the nodes, in base 10
+            logarithms if ``log`` is set
+        :type key_axis: tuple
+        :param log: Whether the nodes are evenly spaced in logarithm
+        :type log: bool
+        """
+        self.table = table
+        self.search_by = search_by
+        (self.start, self.step, self.count) = key_axis
+        self.log = log
+
+    @classmethod
+    def build(cls, sat_table: Table, search_by: Property, step: float, log: bool = None) -> "DenseLine":
+        """
+        Resamples a saturation table
+
+        :param sat_table: Table to resample
+        :type sat_table: Table
+        :param search_by: ``Property.TEMP`` or ``Property.PRESSURE``
+        :type search_by: Property
+        :param step: Node spacing, in table units or in base 10 logarithm
+        :type step: float
+        :param log: Space the nodes evenly in logarithm, defaults to doing so for pressure
+        :type log: bool
+        :return: The resampled table
+        :rtype: DenseLine
+        """
+        if log is None:
+            log = search_by == Property.PRESSURE
+        keys = sat_table.index(search_by).keys
+        (low, high) = (keys[0], keys[-1])
+        key_axis = axis(log10(low), log10(high), step) if log else axis(low, high, step)
+        columns = {x: array("d") for x in sat_table.columns}
+        for i in range(key_axis[2]):
+            key = key_axis[0] + i * step
+            state = steam_engine.search_state(search_by, 10 ** key if log else key, sat_table)
+            for (prop, column) in columns.items():
+                column.append(state[prop] if state is not None else nan)
+        return cls(Table(columns), search_by, key_axis, log)
+
+    def value(self, search_by_value: float, prop: Property):
+        """
+        Looks up one property, interpolating linearly between nodes.
+
+        :return: The value, or None outside the table
+        :rtype: float
+        """
+        if self.log:
+            if not search_by_value > 0:
+                return None
+            search_by_value = log10(search_by_value)
+        x = (search_by_value - self.start) / self.step
+        if not 0 <= x <= self.count - 1:
+            return None
+        i = int(x)
+        x -= i
+        column = self.table.columns[prop]
+        # the next node has no weight on a node, and may be blank or past the end
+        result = column[i] * (1 - x) + column[i + 1] * x if x else column[i]
+        return result if result == result else None
+
+    def state(self, search_by_value: float, props: list = None):
+        if props is None:
+            props = self.table.properties()
+        state = {x: self.value(search_by_value, x) for x in props}
+        return None if all(x is None for x in state.values()) else state
+
+    def header(self) -> dict:
+        return {"dense": {"kind": "line", "search_by": self.search_by.name, "log": self.log,
+                          "axes": [[self.start, self.step, self.count]]}}
+
+    def error_report(self, sat_table: Table, props: list = None) -> dict:
+        """
+        Compares lookups halfway between every pair of nodes with ``search_state``.
+
+        :return: For each property, ``max_error`` (absolute, in table units),
+            the ``at`` value of ``search_by`` it occurred at, and how many
+            points were ``compared``
+        :rtype: dict[Property, dict]
+        """
+        if props is None:
+            props = [x for x in self.table.columns if x != self.search_by]
+        report = {x: {"max_error": 0.0, "at": None, "compared": 0} for x in props}
+        for i in range(self.count - 1):
+            key = self.start + (i + 0.5) * self.step
+            key = 10 ** key if self.log else key
+            exact = steam_engine.search_state(self.search_by, key, sat_table, props)
+            if exact is None:
+                continue
+            for prop in props:
+                (want, got) = (exact[prop], self.value(key, prop))
+                if got is None or want != want:
+                    continue
+                entry = report[prop]
+                entry["compared"] += 1
+                if abs(got - want) > entry["max_error"]:
+                    entry.update(max_error=abs(got - want), at=key)
+        return report
+
+def save(dense, path: str, csv_path: str) -> None:
+    """
+    Writes a ``DenseGrid`` or ``DenseLine`` to ``path``, to be mapped back by ``load``.
+
+    :param csv_path: CSV of the table it was built from; the file is stale once that changes
+    :type csv_path: str
+    """
+    header = dense.header()
+    header["sources"] = [table_cache.stamp(x) for x in table_cache.sources(csv_path)]
+    table_cache.write_file(path, table_cache.to_bytes(dense.table, header_extra=header, indexed=False))
+
+def load(path: str, csv_path: str):
+    """
+    Maps a ``DenseGrid`` or ``DenseLine`` written by ``save``.
+
+    :return: The resampled table, or None if there is no file or it is stale
+    """
+    mapped = table_cache.map_file(path, csv_path)
+    if mapped is None or "dense" not in mapped[0]:
+        return None
+    (header, table) = mapped
+    dense = header["dense"]
+    if dense["kind"] == "grid":
+        return DenseGrid(table, *(tuple(x) for x in dense["axes"]), dense.get("dome", False))
+    return DenseLine(table, Property[dense["search_by"]], tuple(dense["axes"][0]), dense["log"])
+
+def dense_table(name: str, step: float, log_P_step: float = 0.02, persist: bool = True, dome: bool = False):
+    """
+    Returns a table resampled at the given resolution, mapping it from disk
+    if it was saved at that resolution before.
+
+    :param name: ``"comp_sup"``, ``"sat_by_T"`` or ``"sat_by_P"``
+    :type name: str
+    :param step: Node spacing in temperature (°C) for ``comp_sup`` and
+        ``sat_by_T``, in base 10 logarithm of pressure for ``sat_by_P``
+    :type step: float
+    :param log_P_step: Node spacing in base 10 logarithm of pressure for ``comp_sup``
+    :type log_P_step: float
+    :param persist: Whether to save the result after building it
+    :type persist: bool
+    :param dome: Look the ``comp_sup`` nodes up against the saturation dome;
+        a saved grid is only reused if it was built the same way
+    :type dome: bool
+    :rtype: DenseGrid | DenseLine
+    """
+    csv_path = steam_engine.TABLE_FILES[name]
+    path = dense_path(csv_path)
+    dense = load(path, csv_path)
+    table = steam_engine.get_table(name)
+    if name in steam_engine.TABLE_SEARCH_BY:
+        if isinstance(dense, DenseLine) and dense.step == step:
+            return dense
+        dense = DenseLine.build(table, steam_engine.TABLE_SEARCH_BY[name], step)
+    else:
+        if isinstance(dense, DenseGrid) and (dense.T_step, dense.log_P_step, dense.dome) == (step, log_P_step, dome):
+            return dense
+        dense = DenseGrid.build(table, step, log_P_step, steam_engine.saturation_dome() if dome else None)
+    if persist:
+        save(dense, path, csv_path)
+    return dense
@@ -0,0 +1,97 @@
+from collections import OrderedDict
+import steam_engine
+from steam_engine import Property, Table, SaturationDome
+
+class LookupCache():
+    def __init__(self, maxsize: int = 4096, tolerance: float = 0.0):
+        """
+        Creates a bounded, least-recently-used memo in front of the lookup functions
+
+        Entries are keyed on the table's version as well as the query, so a
+        reloaded table never returns results from the old one.
+
+        :param maxsize: Most results to keep before evicting the least recently used
+        :type maxsize: int
+        :param tolerance: If nonzero, inputs are rounded to a multiple of this
+            (in table units) before lookup, so nearby queries share an entry
+        :type tolerance: float
+        """
+        if maxsize < 1:
+            raise ValueError("Lookup cache size must be at least 1!")
+        self.maxsize = maxsize
+        self.tolerance = tolerance
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+
+    def quantize(self, value: float) -> float:
+        if not self.tolerance:
+            return value
+        return round(value / self.tolerance) * self.tolerance
+
+    def _get(self, key: tuple, lookup):
+        try:
+            result = self._entries[key]
+        except KeyError:
+            self.misses += 1
+            result = lookup()
+            self._entries[key] = result
+            if len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+            return result
+        self.hits += 1
+        self._entries.move_to_end(key)
+        return result
+
+    def search_interpolate(self, search_by: Property, search_by_value: float, search_for: Property, table: Table):
+        value = self.quantize(search_by_value)
+        return self._get(
+            ("search", table.version, search_by, value, search_for),
+            lambda: steam_engine.search_interpolate(search_by, value, search_for, table),
+        )
+
+    def find_value_T_P(self, T: float, P: float, search_for: Property, T_P_table: Table, dome: SaturationDome = None):
+        T = self.quantize(T)
+        P = self.quantize(P)
+        return self._get(
+            ("T_P", T_P_table.version, T, P, search_for, dome),
+            lambda: steam_engine.find_value_T_P(T, P, search_for, T_P_table, dome),
+        )
+
+    def search_state(self, search_by: Property, search_by_value: float, table: Table):
+        value = self.quantize(search_by_value)
+        result = self._get(
+            ("search_state", table.version, search_by, value),
+            lambda: steam_engine.search_state(search_by, value, table),
+        )
+        # hand out copies so callers can't edit the cached state
+        return dict(result) if result is not None else None
+
+    def find_state_T_P(self, T: float, P: float, T_P_table: Table, dome: SaturationDome = None):
+        T = self.quantize(T)
+        P = self.quantize(P)
+        result = self._get(
+            ("T_P_state", T_P_table.version, T, P, dome),
+            lambda: steam_engine.find_state_T_P(T, P, T_P_table, None, dome),
+        )
+        return dict(result) if result is not None else None
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def stats(self) -> dict:
+        """
+        Returns counters for tuning the cache size and tolerance.
+
+        :return: ``hits``, ``misses``, ``evictions``, current ``size`` and ``maxsize``
+        :rtype: dict
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "size": len(self._entries),
+            "maxsize": self.maxsize,
+        }
@@ -0,0 +1,47 @@
+from steam_engine import Property, Table, SaturationDome, index_bracket, bracket_value, bracket_T_P, dome_value
+
+class LookupCursor():
+    def __init__(self):
+        """
+        Creates a lookup session for slowly changing states, such as a sensor stream
+
+        The cursor remembers where its last search of each index ended and
+        checks there, and either side, before falling back to a binary
+        search, so a state that stays in or next to the last table cell is
+        found in constant time. Results are the same as the plain lookup
+        functions.
+        """
+        self._hints = {}
+
+    def search_interpolate(self, search_by: Property, search_by_value: float, search_for: Property, table: Table):
+        index = table.index(search_by)
+        bracket = index_bracket(index, search_by_value, self._hints)
+        if bracket is None:
+            return None, None, None
+        return bracket[0], bracket[1], bracket_value(table, search_for, search_by_value, bracket)
+
+    def search_state(self, search_by: Property, search_by_value: float, table: Table, props: list = None):
+        bracket = index_bracket(table.index(search_by), search_by_value, self._hints)
+        if bracket is None:
+            return None
+        if props is None:
+            props = table.properties()
+        return {x: bracket_value(table, x, search_by_value, bracket) for x in props}
+
+    def find_value_T_P(self, T: float, P: float, search_for: Property, T_P_table: Table, dome: SaturationDome = None):
+        bracket = bracket_T_P(T, P, T_P_table, dome, self._hints)
+        if bracket is None:
+            return None, None, None, None, None
+        return bracket[:4] + (dome_value(T, P, search_for, T_P_table, bracket, dome),)
+
+    def find_state_T_P(self, T: float, P: float, T_P_table: Table, props: list = None, dome: SaturationDome = None):
+        bracket = bracket_T_P(T, P, T_P_table, dome, self._hints)
+        if bracket is None:
+            return None
+        if props is None:
+            props = T_P_table.properties()
+        return {x: dome_value(T, P, x, T_P_table, bracket, dome) for x in props}
+
+    def reset(self) -> None:
+        # forgets every remembered position, e.g. when a stream restarts elsewhere
+        self._hints.clear()
@@ -0,0 +1,91 @@
+from multiprocessing import shared_memory
+import steam_engine
+import table_cache
+
+# Hosts the tables, with their indexes, in shared memory so a pool of workers
+# can use one copy between them. The parent publishes:
+#
+#   with SharedTables() as shared:
+#       with Pool(32, initializer=attach, initargs=(shared.handle,)) as pool:
+#           ...
+#
+# and each worker attaches by name. Workers should be started from the
+# publishing process (see open_block). Blocks use the table_cache layout, so
+# attaching is just reading a header and making memoryviews; nothing is
+# parsed or copied.
+
+class AttachedBlock(shared_memory.SharedMemory):
+    # tables keep memoryviews into the block for the life of the process, so
+    # it can't be closed on collection; the mapping goes when the process does
+    def __del__(self):
+        pass
+
+def open_block(name: str) -> AttachedBlock:
+    try:
+        return AttachedBlock(name, track=False)
+    except TypeError:
+        # before 3.13 attaching always registers the block with the resource
+        # tracker; workers started by the publisher share its tracker, so
+        # that is harmless there
+        return AttachedBlock(name)
+
+class SharedTables():
+    def __init__(self, names: list = None):
+        """
+        Copies tables into shared memory blocks for workers to attach to
+
+        :param names: Tables to publish, defaults to all of ``steam_engine.TABLE_FILES``
+        :type names: list[str]
+        """
+        if names is None:
+            names = list(steam_engine.TABLE_FILES)
+        self.blocks = {}
+        try:
+            for name in names:
+                data = table_cache.to_bytes(steam_engine.get_table(name), steam_engine.TABLE_SEARCH_BY.get(name))
+                block = shared_memory.SharedMemory(create=True, size=len(data))
+                block.buf[:len(data)] = data
+                self.blocks[name] = block
+        except BaseException:
+            self.close()
+            raise
+
+    @property
+    def handle(self) -> dict:
+        """
+        What a worker needs to attach: ``{table name: shared memory block name}``.
+        """
+        return {name: block.name for (name, block) in self.blocks.items()}
+
+    def close(self) -> None:
+        # only the publisher unlinks; attached workers keep their mappings
+        # until they exit
+        for block in self.blocks.values():
+            block.close()
+            block.unlink()
+        self.blocks = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+_attached = []
+
+def attach(handle: dict) -> None:
+    """
+    Installs published tables as this process's ``steam_engine`` tables.
+
+    Suitable as a pool initializer.
+
+    :param handle: ``SharedTables.handle`` from the publishing process
+    :type handle: dict
+    """
+    for (name, block_name) in handle.items():
+        block = open_block(block_name)
+        header = table_cache.read_header(block.buf)
+        if header is None:
+            raise ValueError(f"Shared memory block {block_name} does not hold a table!")
+        steam_engine._tables[name] = table_cache.from_buffer(block.buf, header)
+        _attached.append(block)
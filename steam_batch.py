@@ -0,0 +1,563 @@
+import weakref
+import numpy as np
+import Units
+import steam_engine
+from steam_engine import Property, Phase, PHASES, Table, SaturationDome, DOME_SIDES, CELSIUS, MPA, table_unit
+
+# NumPy versions of search_interpolate and find_value_T_P, for whole arrays
+# of states at once. Points outside the table come back as NaN (or -1 for
+# phase codes) instead of a tuple of Nones.
+
+class Segments():
+    def __init__(self, indexes: list):
+        """
+        Flattens a list of sorted indexes so they can all be bracketed at once
+
+        :param indexes: Sorted indexes over the same table, one per segment
+            (e.g. one per isotherm)
+        :type indexes: list[SortedIndex]
+        """
+        self.table = indexes[0].table
+        keys = [np.asarray(x.keys) for x in indexes]
+        self.keys = np.concatenate(keys)
+        self.rows = np.concatenate([np.asarray(x.rows) for x in indexes])
+        self.lengths = np.array([len(x) for x in keys])
+        self.starts = np.concatenate(([0], np.cumsum(self.lengths)[:-1]))
+        # every key in every segment is one of these, so counting how many keys
+        # of segment k sit below union[j] tells us where any value between
+        # union[j - 1] and union[j] would land in that segment
+        self.union = np.unique(self.keys)
+        self.below = np.empty((len(keys), len(self.union) + 1), dtype=np.intp)
+        # position of the first entry sharing each key, to match search_interpolate
+        self.first = np.empty(len(self.keys), dtype=np.intp)
+        for (k, x) in enumerate(keys):
+            self.below[k, :-1] = np.searchsorted(x, self.union)
+            self.below[k, -1] = len(x)
+            self.first[self.starts[k]:self.starts[k] + len(x)] = self.starts[k] + np.searchsorted(x, x)
+
+    def locate(self, segment: np.ndarray, x: np.ndarray) -> tuple:
+        """
+        Brackets each ``x`` in its segment
+
+        :param segment: Segment number of each point
+        :type segment: np.ndarray
+        :param x: Value to search for in each point's segment
+        :type x: np.ndarray
+        :return: ``(row_low, row_high, weight, valid)``; a value is
+            ``column[row_low] + weight * (column[row_high] - column[row_low])``
+            wherever ``valid`` is set
+        :rtype: tuple
+        """
+        i = self.below[segment, np.searchsorted(self.union, x)]
+        n = self.lengths[segment]
+        pos = self.starts[segment] + i
+        last = len(self.keys) - 1
+        exact = (i < n) & (self.keys[np.minimum(pos, last)] == x)
+        valid = exact | ((i > 0) & (i < n))
+        low = self.first[np.clip(pos - 1, 0, last)]
+        high = np.where(exact, pos, np.minimum(pos, last))
+        low = np.where(exact, high, low)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            weight = np.where(exact, 0.0, (x - self.keys[low]) / (self.keys[high] - self.keys[low]))
+        return self.rows[low], self.rows[high], weight, valid
+
+    def cell(self, segment: np.ndarray, x: np.ndarray) -> tuple:
+        """
+        Array version of ``steam_engine.index_cell``
+
+        :return: ``(row_low, row_high, key_low, key_high, valid)``
+        :rtype: tuple
+        """
+        j = np.searchsorted(self.union, x)
+        i = self.below[segment, j]
+        n = self.lengths[segment]
+        pos = self.starts[segment] + i
+        last = len(self.keys) - 1
+        exact = (i < n) & (self.keys[np.minimum(pos, last)] == x)
+        # on a row, the segment starts there and ends at the next larger key,
+        # unless the row is the last one
+        above = self.below[segment, np.minimum(j + 1, len(self.union))]
+        upward = exact & (above < n)
+        low = np.where(upward, pos, self.first[np.clip(pos - 1, 0, last)])
+        high = np.minimum(np.where(upward, self.starts[segment] + above, pos), last)
+        valid = upward | ((i > 0) & (i < n)) | (exact & (i > 0))
+        return self.rows[low], self.rows[high], self.keys[low], self.keys[high], valid
+
+def apply(table: Table, search_for: Property, location: tuple) -> np.ndarray:
+    (low, high, weight, valid) = location
+    if search_for == Property.PHASE:
+        codes = np.asarray(table.phases)
+        result = np.where(codes[low] == codes[high], codes[low], -1).astype(np.int8)
+        result[~valid] = -1
+        return result
+    column = np.asarray(table.columns[search_for])
+    # blank cells are NaN, which is the right answer but not worth a warning
+    with np.errstate(invalid="ignore"):
+        result = column[low] + weight * (column[high] - column[low])
+    result[~valid] = np.nan
+    return result
+
+def blend(low: np.ndarray, high: np.ndarray, weight: np.ndarray, search_for: Property) -> np.ndarray:
+    if search_for == Property.PHASE:
+        return np.where(low == high, low, -1).astype(np.int8)
+    with np.errstate(invalid="ignore"):
+        return low + weight * (high - low)
+
+_segments = weakref.WeakKeyDictionary()
+
+def segments(table: Table) -> dict:
+    """
+    Returns the flattened indexes of ``table``, building them on first use.
+
+    :return: For a table with a grid, its sorted distinct ``"temps"`` and
+        ``"pressures"`` and the matching ``"isotherms"`` and ``"isobars"``;
+        otherwise ``{key: Segments}`` for each column indexed so far
+    :rtype: dict
+    """
+    if table not in _segments:
+        if table._grid is not None or not table._indexes:
+            grid = table.grid()
+            built = {
+                "temps": np.array(grid.temps),
+                "pressures": np.array(grid.pressures),
+                "isotherms": Segments([grid.isotherms[x] for x in grid.temps]),
+                "isobars": Segments([grid.isobars[x] for x in grid.pressures]),
+            }
+        else:
+            built = {}
+        _segments[table] = built
+    built = _segments[table]
+    for key in table._indexes:
+        if key not in built:
+            built[key] = Segments([table.index(key)])
+    return built
+
+def prepare_sat(search_by: Property, values, inp_unit: Units.Unit, *others) -> tuple:
+    # flattens saturation inputs, and anything broadcast against them, to 1-d
+    arrays = np.broadcast_arrays(*(np.asarray(x, dtype=np.float64) for x in (values,) + others))
+    x = arrays[0]
+    if inp_unit is not None:
+        x = Units.converter(inp_unit, table_unit(search_by))(x)
+    return (x.shape, x.ravel()) + tuple(y.ravel() for y in arrays[1:])
+
+def sat_lookup(
+        search_by: Property,
+        values,
+        search_for: Property,
+        inp_unit: Units.Unit = None,
+        result_unit: Units.Unit = None,
+        table: Table = None,
+        ) -> np.ndarray:
+    """
+    Array version of ``search_interpolate`` on a saturation table.
+
+    :param search_by: ``Property.TEMP`` or ``Property.PRESSURE``
+    :type search_by: Property
+    :param values: Values to look up
+    :type values: array_like
+    :param search_for: Property to return
+    :type search_for: Property
+    :param inp_unit: Unit of ``values``, defaults to the table's unit
+    :type inp_unit: Units.Unit
+    :param result_unit: Unit to return results in, defaults to the table's unit
+    :type result_unit: Units.Unit
+    :param table: Table to search, defaults to ``sat_by_T`` or ``sat_by_P``
+        to match ``search_by``
+    :type table: Table
+    :return: Results, NaN where ``values`` are outside the table
+    :rtype: np.ndarray
+    """
+    if table is None:
+        table = steam_engine.sat_by_T if search_by == Property.TEMP else steam_engine.sat_by_P
+    (shape, x) = prepare_sat(search_by, values, inp_unit)
+    table.index(search_by)
+    location = segments(table)[search_by].locate(np.zeros(x.shape, dtype=np.intp), x)
+    result = apply(table, search_for, location).reshape(shape)
+    if result_unit is not None and search_for != Property.PHASE:
+        result = Units.converter(table_unit(search_for), result_unit)(result)
+    return result
+
+def classify(dome: SaturationDome, T: np.ndarray, P: np.ndarray) -> np.ndarray:
+    """
+    Array version of ``SaturationDome.classify``.
+
+    :return: Indices into ``steam_engine.PHASES``, -1 on the saturation curve
+    :rtype: np.ndarray
+    """
+    saturation = np.interp(T, np.asarray(dome.temps), np.asarray(dome.pressures))
+    codes = np.where(P > saturation, PHASES.index(Phase.LIQUID), np.where(P < saturation, PHASES.index(Phase.VAPOR), -1))
+    above = T > dome.critical_T
+    codes[above] = np.where(P[above] > dome.critical_P, PHASES.index(Phase.SUPERCRITICAL_FLUID), PHASES.index(Phase.VAPOR))
+    return codes.astype(np.int8)
+
+def same_side(table: Table, phases: np.ndarray, locations: list) -> np.ndarray:
+    # array version of SaturationDome.same_side, for the rows of some locations
+    sides = np.asarray(DOME_SIDES)
+    codes = np.asarray(table.phases)
+    point = np.where(phases >= 0, sides[phases], 0)
+    liquid = point == -1
+    vapor = point == 1
+    for (low, high, weight, valid) in locations:
+        for rows in (low, high):
+            liquid |= sides[codes[rows]] == -1
+            vapor |= sides[codes[rows]] == 1
+    return ~(liquid & vapor)
+
+def locate_T_P(T: np.ndarray, P: np.ndarray, table: Table, dome: SaturationDome = None) -> tuple:
+    """
+    Brackets flat arrays of temperatures (°C) and pressures (MPa) in ``table``
+
+    :param dome: If given, points are classified against it and brackets
+        that cross it are marked invalid
+    :type dome: SaturationDome
+    :return: ``(exact, between, phases)``; ``exact`` is a list of
+        ``(points, location)`` for points on an isotherm or isobar,
+        ``between`` is ``(points, low_location, high_location, weight)`` for
+        points interpolated between two isotherms, ``phases`` is the
+        ``classify`` result or None without a dome
+    :rtype: tuple
+    """
+    grid = segments(table)
+    temps = grid["temps"]
+    pressures = grid["pressures"]
+
+    # same order of preference as find_value_T_P: exact T, then exact P,
+    # then interpolate between the two isotherms either side of T
+    ti = np.searchsorted(temps, T)
+    exact_T = (ti < len(temps)) & (temps[np.minimum(ti, len(temps) - 1)] == T)
+    pi = np.searchsorted(pressures, P)
+    exact_P = ~exact_T & (pi < len(pressures)) & (pressures[np.minimum(pi, len(pressures) - 1)] == P)
+    between = ~exact_T & ~exact_P & (ti > 0) & (ti < len(temps))
+
+    exact = []
+    sel = np.nonzero(exact_T)[0]
+    exact.append((sel, grid["isotherms"].locate(ti[sel], P[sel])))
+    sel = np.nonzero(exact_P)[0]
+    exact.append((sel, grid["isobars"].locate(pi[sel], T[sel])))
+
+    sel = np.nonzero(between)[0]
+    low = grid["isotherms"].locate(ti[sel] - 1, P[sel])
+    high = grid["isotherms"].locate(ti[sel], P[sel])
+    low_temp = temps[ti[sel] - 1]
+    weight = (T[sel] - low_temp) / (temps[ti[sel]] - low_temp)
+
+    phases = None
+    if dome is not None:
+        phases = classify(dome, T, P)
+        # the valid masks are updated in place
+        for (points, location) in exact:
+            valid = location[3]
+            valid &= same_side(table, phases[points], [location])
+        ok = same_side(table, phases[sel], [low, high])
+        for valid in (low[3], high[3]):
+            valid &= ok
+    return exact, (sel, low, high, weight), phases
+
+def T_P_values(table: Table, search_for: Property, located: tuple, size: int) -> np.ndarray:
+    # evaluates one property at points bracketed by locate_T_P
+    (exact, (sel, low, high, weight), phases) = located
+    if search_for == Property.PHASE:
+        result = np.full(size, -1, dtype=np.int8)
+    else:
+        result = np.full(size, np.nan)
+    inside = np.zeros(size, dtype=bool)
+    for (points, location) in exact:
+        result[points] = apply(table, search_for, location)
+        inside[points] = location[3]
+    values = blend(apply(table, search_for, low), apply(table, search_for, high), weight, search_for)
+    if search_for == Property.PHASE:
+        values[~(low[3] & high[3])] = -1
+    else:
+        values[~(low[3] & high[3])] = np.nan
+    result[sel] = values
+    inside[sel] = low[3] & high[3]
+    if search_for == Property.PHASE and phases is not None:
+        # the classified phase wherever the point is in the table and off the curve
+        result = np.where(inside & (phases >= 0), phases, result).astype(np.int8)
+    return result
+
+def prepare_T_P(T, P, temp_unit: Units.Unit, pres_unit: Units.Unit) -> tuple:
+    (T, P) = np.broadcast_arrays(np.asarray(T, dtype=np.float64), np.asarray(P, dtype=np.float64))
+    if temp_unit is not None:
+        T = Units.converter(temp_unit, CELSIUS)(T)
+    if pres_unit is not None:
+        P = Units.converter(pres_unit, MPA)(P)
+    return T.shape, T.ravel(), P.ravel()
+
+def T_P_lookup(
+        T,
+        P,
+        search_for: Property,
+        temp_unit: Units.Unit = None,
+        pres_unit: Units.Unit = None,
+        result_unit: Units.Unit = None,
+        table: Table = None,
+        dome: SaturationDome = None,
+        ) -> np.ndarray:
+    """
+    Array version of ``find_value_T_P``.
+
+    :param T: Temperatures
+    :type T: array_like
+    :param P: Pressures, broadcast against ``T``
+    :type P: array_like
+    :param search_for: Property to return; ``Property.PHASE`` gives indices
+        into ``steam_engine.PHASES``
+    :type search_for: Property
+    :param temp_unit: Unit of ``T``, defaults to °C
+    :type temp_unit: Units.Unit
+    :param pres_unit: Unit of ``P``, defaults to MPa
+    :type pres_unit: Units.Unit
+    :param result_unit: Unit to return results in, defaults to the table's unit
+    :type result_unit: Units.Unit
+    :param table: Table to search, defaults to ``comp_sup``
+    :type table: Table
+    :param dome: If given, the phase is classified against it and states
+        whose brackets cross the saturation dome are treated as outside the table
+    :type dome: SaturationDome
+    :return: Results, NaN (or -1 for phase) where the state is outside the table
+    :rtype: np.ndarray
+    """
+    if table is None:
+        table = steam_engine.comp_sup
+    (shape, T, P) = prepare_T_P(T, P, temp_unit, pres_unit)
+    result = T_P_values(table, search_for, locate_T_P(T, P, table, dome), len(T)).reshape(shape)
+    if result_unit is not None and search_for != Property.PHASE:
+        result = Units.converter(table_unit(search_for), result_unit)(result)
+    return result
+
+def T_P_state(
+        T,
+        P,
+        temp_unit: Units.Unit = None,
+        pres_unit: Units.Unit = None,
+        props: list = None,
+        table: Table = None,
+        dome: SaturationDome = None,
+        ) -> dict:
+    """
+    Array version of ``find_state_T_P``; every property shares one bracketing pass.
+
+    :param props: Properties to return, defaults to every column of the table
+        plus the phase
+    :type props: list[Property]
+    :return: Results in table units, keyed by property
+    :rtype: dict[Property, np.ndarray]
+    """
+    if table is None:
+        table = steam_engine.comp_sup
+    if props is None:
+        props = table.properties()
+    (shape, T, P) = prepare_T_P(T, P, temp_unit, pres_unit)
+    located = locate_T_P(T, P, table, dome)
+    return {x: T_P_values(table, x, located, len(T)).reshape(shape) for x in props}
+
+def sat_state(
+        search_by: Property,
+        values,
+        inp_unit: Units.Unit = None,
+        props: list = None,
+        table: Table = None,
+        ) -> dict:
+    """
+    Array version of ``search_state``; every property shares one bracketing pass.
+
+    :param props: Properties to return, defaults to every column of the table
+    :type props: list[Property]
+    :return: Results in table units, keyed by property
+    :rtype: dict[Property, np.ndarray]
+    """
+    if table is None:
+        table = steam_engine.sat_by_T if search_by == Property.TEMP else steam_engine.sat_by_P
+    if props is None:
+        props = table.properties()
+    (shape, x) = prepare_sat(search_by, values, inp_unit)
+    table.index(search_by)
+    location = segments(table)[search_by].locate(np.zeros(x.shape, dtype=np.intp), x)
+    return {prop: apply(table, prop, location).reshape(shape) for prop in props}
+
+def mixture_state(
+        search_by: Property,
+        values,
+        quality,
+        inp_unit: Units.Unit = None,
+        props: list = None,
+        table: Table = None,
+        ) -> dict:
+    """
+    Array version of ``find_mixture``; every property shares one bracketing pass.
+
+    :param search_by: ``Property.TEMP`` or ``Property.PRESSURE``
+    :type search_by: Property
+    :param values: Saturation temperatures or pressures
+    :type values: array_like
+    :param quality: Vapor mass fractions, broadcast against ``values``
+    :type quality: array_like
+    :param inp_unit: Unit of ``values``, defaults to the table's unit
+    :type inp_unit: Units.Unit
+    :param props: Properties to return, defaults to ``steam_engine.MIXTURE_PROPS``
+    :type props: list[Property]
+    :param table: Table to search, defaults to ``sat_by_T`` or ``sat_by_P``
+        to match ``search_by``
+    :type table: Table
+    :return: Results in table units, keyed by property; NaN outside the
+        table or where the quality isn't between 0 and 1
+    :rtype: dict[Property, np.ndarray]
+    """
+    if table is None:
+        table = steam_engine.sat_by_T if search_by == Property.TEMP else steam_engine.sat_by_P
+    if props is None:
+        props = steam_engine.MIXTURE_PROPS
+    (shape, x, quality) = prepare_sat(search_by, values, inp_unit, quality)
+    quality = np.where((quality >= 0) & (quality <= 1), quality, np.nan)
+    table.index(search_by)
+    location = segments(table)[search_by].locate(np.zeros(x.shape, dtype=np.intp), x)
+
+    def mix(prop):
+        if prop == Property.DENSITY:
+            return 1 / mix(Property.VOLUME)
+        if prop not in steam_engine.SAT_COLUMNS:
+            return apply(table, prop, location)
+        (liquid, vapor) = (apply(table, y, location) for y in steam_engine.SAT_COLUMNS[prop])
+        return liquid + quality * (vapor - liquid)
+
+    results = {}
+    for prop in props:
+        results[prop] = mix(prop)
+        results[prop][np.isnan(quality)] = np.nan
+        results[prop] = results[prop].reshape(shape)
+    return results
+
+def mixture_quality(
+        search_by: Property,
+        values,
+        prop: Property,
+        prop_values,
+        inp_unit: Units.Unit = None,
+        table: Table = None,
+        ) -> np.ndarray:
+    """
+    Array version of ``find_quality``.
+
+    :param prop: ``Property.VOLUME``, ``ENERGY``, ``ENTHALPY`` or ``ENTROPY``
+    :type prop: Property
+    :param prop_values: Values of ``prop`` in table units, broadcast against ``values``
+    :type prop_values: array_like
+    :return: Qualities, NaN where the state isn't a saturated mixture or is
+        outside the table
+    :rtype: np.ndarray
+    """
+    if prop not in steam_engine.SAT_COLUMNS:
+        raise ValueError(f"Can't find quality from {prop.disp_name}!")
+    if table is None:
+        table = steam_engine.sat_by_T if search_by == Property.TEMP else steam_engine.sat_by_P
+    (shape, x, y) = prepare_sat(search_by, values, inp_unit, prop_values)
+    table.index(search_by)
+    location = segments(table)[search_by].locate(np.zeros(x.shape, dtype=np.intp), x)
+    (liquid, vapor) = (apply(table, z, location) for z in steam_engine.SAT_COLUMNS[prop])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        quality = np.where(liquid == vapor, 0.0, (y - liquid) / (vapor - liquid))
+    quality[~((liquid <= y) & (y <= vapor))] = np.nan
+    return quality.reshape(shape)
+
+def cell_slope(table: Table, prop: Property, x: np.ndarray, cell: tuple) -> tuple:
+    # array version of steam_engine.cell_slope, NaN where the cell isn't valid
+    (low, high, low_x, high_x, valid) = cell
+    column = np.asarray(table.columns[prop])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        slope = (column[high] - column[low]) / (high_x - low_x)
+        value = column[low] + (x - low_x) * slope
+    value[~valid] = np.nan
+    slope[~valid] = np.nan
+    return value, slope
+
+def T_P_slopes(T: np.ndarray, P: np.ndarray, prop: Property, table: Table) -> tuple:
+    """
+    Array version of ``steam_engine.T_P_slopes``, NaN where it gives None.
+    """
+    grid = segments(table)
+    (temps, pressures) = (grid["temps"], grid["pressures"])
+    (isotherms, isobars) = (grid["isotherms"], grid["isobars"])
+    d_dT = np.full(len(T), np.nan)
+    d_dP = np.full(len(T), np.nan)
+
+    def on_isotherm(k, points):
+        return cell_slope(table, prop, P[points], isotherms.cell(k, P[points]))
+
+    k = np.searchsorted(temps, T)
+    exact_T = (k < len(temps)) & (temps[np.minimum(k, len(temps) - 1)] == T)
+    pi = np.searchsorted(pressures, P)
+    on_isobar = (pi < len(pressures)) & (pressures[np.minimum(pi, len(pressures) - 1)] == P)
+
+    # on an isobar: slope in T along it, and the isotherms its cell spans
+    sel = np.nonzero(on_isobar)[0]
+    cell = isobars.cell(pi[sel], T[sel])
+    d_dT[sel] = cell_slope(table, prop, T[sel], cell)[1]
+    T_cells = np.where(cell[4], np.searchsorted(temps, cell[2]), 0)
+    T_cells = (sel[cell[4]], T_cells[cell[4]], np.searchsorted(temps, cell[3])[cell[4]])
+
+    # on an isotherm only: slope to the nearest isotherm either side that reaches P
+    sel = np.nonzero(exact_T & ~on_isobar)[0]
+    (here, d_dP[sel]) = on_isotherm(k[sel], sel)
+    for direction in (1, -1):
+        todo = ~np.isnan(here) & np.isnan(d_dT[sel])
+        j = k[sel] + direction
+        while True:
+            todo &= (j >= 0) & (j < len(temps))
+            if not todo.any():
+                break
+            points = sel[todo]
+            other = on_isotherm(j[todo], points)[0]
+            found = ~np.isnan(other)
+            d_dT[points[found]] = (other[found] - here[todo][found]) / (temps[j[todo][found]] - T[points[found]])
+            todo[np.nonzero(todo)[0][found]] = False
+            j += direction
+
+    # on neither: the cell between the isotherms either side
+    sel = np.nonzero(~exact_T & ~on_isobar & (k > 0) & (k < len(temps)))[0]
+    (low, high) = (on_isotherm(k[sel] - 1, sel), on_isotherm(k[sel], sel))
+    d_dT[sel] = (high[0] - low[0]) / (temps[k[sel]] - temps[k[sel] - 1])
+    T_cells = tuple(np.concatenate(x) for x in zip(T_cells, (sel, k[sel] - 1, k[sel])))
+
+    # slope in P, blended between the isotherms of each cell
+    (sel, low_k, high_k) = T_cells
+    exact = exact_T[sel]
+    d_dP[sel[exact]] = on_isotherm(k[sel[exact]], sel[exact])[1]
+    (sel, low_k, high_k) = (sel[~exact], low_k[~exact], high_k[~exact])
+    (low, high) = (on_isotherm(low_k, sel)[1], on_isotherm(high_k, sel)[1])
+    weight = (T[sel] - temps[low_k]) / (temps[high_k] - temps[low_k])
+    d_dP[sel] = (1 - weight) * low + weight * high
+    return d_dT, d_dP
+
+def T_P_derivatives(
+        T,
+        P,
+        search_for: Property,
+        temp_unit: Units.Unit = None,
+        pres_unit: Units.Unit = None,
+        result_unit: Units.Unit = None,
+        table: Table = None,
+        ) -> tuple:
+    """
+    Array version of ``find_derivatives_T_P``.
+
+    :return: ``(value, d_dT, d_dP)``, NaN where ``find_derivatives_T_P`` gives None
+    :rtype: tuple
+    """
+    if search_for == Property.PHASE:
+        raise ValueError("Phase has no derivatives!")
+    if table is None:
+        table = steam_engine.comp_sup
+    (shape, T, P) = prepare_T_P(T, P, temp_unit, pres_unit)
+    T_scale = Units.converter(temp_unit, CELSIUS).slope if temp_unit is not None else 1.0
+    P_scale = Units.converter(pres_unit, MPA).slope if pres_unit is not None else 1.0
+    value = T_P_values(table, search_for, locate_T_P(T, P, table), len(T))
+    (d_dT, d_dP) = T_P_slopes(T, P, search_for, table)
+    outside = np.isnan(value)
+    d_dT[outside] = np.nan
+    d_dP[outside] = np.nan
+    result_scale = 1.0
+    if result_unit is not None:
+        from_table = Units.converter(table_unit(search_for), result_unit)
+        (value, result_scale) = (from_table(value), from_table.slope)
+    return value.reshape(shape), (d_dT * result_scale * T_scale).reshape(shape), (d_dP * result_scale * P_scale).reshape(shape)
@@ -0,0 +1,380 @@
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+import Units
+import steam_engine
+from steam_engine import Property, PropType, SearchMode, UNITS
+
+# Headless benchmarks for the lookup engine.
+#
+#   python steam_bench.py -o results.json      run, check and write results
+#   python steam_bench.py --compare old.json   also flag slowdowns against an
+#                                              earlier results file
+#   python steam_bench.py --record             rewrite bench_reference.json
+#
+# Covers cold import and table loading (each in a fresh interpreter), scalar
+# lookups in every SearchMode split into exact hits, single and double
+# interpolation and out-of-range rejection, unit conversion, large random
+# batches, and the resampled grid of dense_grid.py against bisection. Every scalar case is also checked against bench_reference.json,
+# which holds the inputs and the results they gave when it was recorded, so a
+# faster change that gives different answers fails rather than passes.
+# Results are JSON; the exit status is nonzero if any check fails.
+
+REFERENCE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_reference.json")
+CASES_PER_KIND = 500
+BATCH_SIZE = 100000
+SCALAR_BATCH_SIZE = 20000
+SEED = 20261018
+TOLERANCE = 1e-9
+
+MODE_TABLES = {
+    SearchMode.SAT_BY_T: ("sat_by_T", Property.TEMP),
+    SearchMode.SAT_BY_P: ("sat_by_P", Property.PRESSURE),
+    SearchMode.T_AND_P: ("comp_sup", None),
+}
+
+def mode_properties(mode: SearchMode) -> list:
+    match mode:
+        case SearchMode.SAT_BY_T:
+            return [x for x in Property if x.type == PropType.SAT] + [Property.PRESSURE]
+        case SearchMode.SAT_BY_P:
+            return [x for x in Property if x.type == PropType.SAT] + [Property.TEMP]
+        case SearchMode.T_AND_P:
+            return [x for x in Property if x.type == PropType.P_T]
+
+def run_case(mode: SearchMode, inputs: list, prop: Property):
+    (name, search_by) = MODE_TABLES[mode]
+    table = steam_engine.get_table(name)
+    if search_by is None:
+        return steam_engine.find_value_T_P(inputs[0], inputs[1], prop, table)
+    return steam_engine.search_interpolate(search_by, inputs[0], prop, table)
+
+def case_kind(result: tuple) -> str:
+    # how many of the inputs had to be interpolated
+    if result[-1] is None or result[0] is None:
+        return "out_of_range"
+    between = sum(result[i] != result[i + 1] for i in range(0, len(result) - 1, 2))
+    return ("exact", "single", "double")[between]
+
+def encode(value):
+    # JSON has no NaN (blank table cells)
+    if isinstance(value, float) and math.isnan(value):
+        return "nan"
+    return value
+
+def same(got, expected) -> bool:
+    if isinstance(got, float) and math.isnan(got):
+        return expected == "nan"
+    if isinstance(got, float) and isinstance(expected, (int, float)):
+        return abs(got - expected) <= TOLERANCE * max(1.0, abs(expected))
+    return got == expected
+
+def candidates(mode: SearchMode, rng: random.Random):
+    # random states biased towards table rows so every kind turns up
+    (name, search_by) = MODE_TABLES[mode]
+    table = steam_engine.get_table(name)
+    props = mode_properties(mode)
+    if search_by is not None:
+        keys = list(table.columns[search_by])
+        (low, high) = (min(keys), max(keys))
+        while True:
+            x = rng.choice([rng.choice(keys), rng.uniform(low, high), rng.uniform(low - 0.2 * (high - low), low),
+                            rng.uniform(high, high + 0.2 * (high - low))])
+            yield [x], rng.choice(props)
+    grid = table.grid()
+    (temps, pressures) = (list(grid.temps), list(grid.pressures))
+    while True:
+        T = rng.choice([rng.choice(temps), rng.uniform(temps[0], temps[-1]), rng.uniform(temps[-1], 1.2 * temps[-1])])
+        P = rng.choice([rng.choice(pressures), 10 ** rng.uniform(math.log10(pressures[0]), math.log10(pressures[-1])),
+                        rng.uniform(pressures[-1], 1.2 * pressures[-1])])
+        yield [T, P], rng.choice(props)
+
+def record(path: str) -> dict:
+    """
+    Records lookup cases and their current results as the reference.
+
+    :param path: File to write
+    :type path: str
+    :return: The reference
+    :rtype: dict
+    """
+    rng = random.Random(SEED)
+    lookups = {}
+    for mode in SearchMode:
+        kinds = {x: [] for x in ("exact", "single", "double", "out_of_range")}
+        if mode != SearchMode.T_AND_P:
+            del kinds["double"]
+        for (inputs, prop) in candidates(mode, rng):
+            result = run_case(mode, inputs, prop)
+            kind = case_kind(result)
+            if len(kinds[kind]) < CASES_PER_KIND:
+                kinds[kind].append([inputs, prop.name, [encode(x) for x in result]])
+            if all(len(x) == CASES_PER_KIND for x in kinds.values()):
+                break
+        lookups[mode.name] = kinds
+    conversions = []
+    for unit_type in Units.Type:
+        units = UNITS.of_type(unit_type)
+        for _ in range(CASES_PER_KIND // len(Units.Type) + 1):
+            (unit_from, unit_to) = (rng.choice(units), rng.choice(units))
+            value = rng.uniform(-100, 1000)
+            conversions.append([value, unit_from.symbol, unit_to.symbol, Units.convert(value, unit_from, unit_to)])
+    reference = {"recorded_from": git_commit(), "lookups": lookups, "conversions": conversions}
+    with open(path, "w", encoding="utf-8") as f:
+        write_reference(reference, f)
+    return reference
+
+def write_reference(reference: dict, f) -> None:
+    # compact JSON with one case per line, so a re-recorded reference diffs
+    # case by case
+    def compact(x):
+        return json.dumps(x, separators=(",", ":"))
+    def cases(items: list) -> str:
+        return "[\n" + ",\n".join(compact(x) for x in items) + "]"
+    modes = []
+    for (mode, kinds) in reference["lookups"].items():
+        modes.append(compact(mode) + ":{" + ",\n".join(compact(k) + ":" + cases(x) for (k, x) in kinds.items()) + "}")
+    f.write('{"recorded_from":' + compact(reference["recorded_from"]) + ",\n")
+    f.write('"lookups":{\n' + ",\n".join(modes) + "},\n")
+    f.write('"conversions":' + cases(reference["conversions"]) + "}\n")
+
+def git_commit() -> str:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                             cwd=os.path.dirname(REFERENCE_FILE), timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+def timed(func, items: list, repeat: int) -> dict:
+    """
+    Times ``func`` over ``items``, ``repeat`` times.
+
+    :return: Per-call nanoseconds (best and median of the repeats) and the call count
+    :rtype: dict
+    """
+    per_call = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for x in items:
+            func(x)
+        per_call.append((time.perf_counter() - start) / len(items) * 1e9)
+    return {"unit": "ns/call", "best": min(per_call), "median": statistics.median(per_call), "calls": len(items)}
+
+def fresh_interpreter(code: str, repeat: int) -> dict:
+    # cold timings need a new process each time; the code prints seconds
+    here = os.path.dirname(REFERENCE_FILE)
+    seconds = []
+    for _ in range(repeat):
+        out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=here, check=True)
+        seconds.append(float(out.stdout.strip().splitlines()[-1]))
+    return {"unit": "ms", "best": min(seconds) * 1e3, "median": statistics.median(seconds) * 1e3, "runs": repeat}
+
+LOAD_CODE = """
+import time
+start = time.perf_counter()
+import steam_engine
+steam_engine.USE_TABLE_CACHE = {cache}
+for name in {names}:
+    steam_engine.get_table(name)
+print(time.perf_counter() - start)
+"""
+
+def bench_startup(repeat: int) -> dict:
+    results = {"import": fresh_interpreter(LOAD_CODE.format(cache=True, names=[]), repeat)}
+    # make sure the caches are current before timing loads from them
+    for name in steam_engine.TABLE_FILES:
+        steam_engine.get_table(name)
+    for (label, cache) in (("load_csv", False), ("load_cached", True)):
+        for name in steam_engine.TABLE_FILES:
+            results[f"{label}:{name}"] = fresh_interpreter(LOAD_CODE.format(cache=cache, names=[name]), repeat)
+        results[f"{label}:all"] = fresh_interpreter(LOAD_CODE.format(cache=cache, names=list(steam_engine.TABLE_FILES)), repeat)
+    return results
+
+def bench_lookups(reference: dict, repeat: int) -> tuple:
+    """
+    Checks and times every recorded lookup case.
+
+    :return: ``(timings, checks)``
+    :rtype: tuple
+    """
+    timings = {}
+    checks = {}
+    for (mode_name, kinds) in reference["lookups"].items():
+        mode = SearchMode[mode_name]
+        (name, search_by) = MODE_TABLES[mode]
+        table = steam_engine.get_table(name)
+        for (kind, cases) in kinds.items():
+            label = f"{mode_name}:{kind}"
+            calls = [(x[0], Property[x[1]]) for x in cases]
+            failures = []
+            for ((inputs, prop), case) in zip(calls, cases):
+                got = run_case(mode, inputs, prop)
+                if len(got) != len(case[2]) or not all(same(a, b) for (a, b) in zip(got, case[2])):
+                    failures.append({"inputs": inputs, "property": prop.name, "expected": case[2],
+                                     "got": [encode(x) for x in got]})
+            checks[label] = {"cases": len(cases), "failures": len(failures), "examples": failures[:5]}
+            if search_by is None:
+                func = lambda x: steam_engine.find_value_T_P(x[0][0], x[0][1], x[1], table)
+            else:
+                func = lambda x: steam_engine.search_interpolate(search_by, x[0][0], x[1], table)
+            timings[label] = timed(func, calls, repeat)
+    return timings, checks
+
+def bench_conversions(reference: dict, repeat: int) -> tuple:
+    calls = [(x[0], UNITS[x[1]], UNITS[x[2]]) for x in reference["conversions"]]
+    failures = [x for (x, call) in zip(reference["conversions"], calls) if not same(Units.convert(*call), x[3])]
+    checks = {"units:convert": {"cases": len(calls), "failures": len(failures), "examples": failures[:5]}}
+    timings = {"units:convert": timed(lambda x: Units.convert(*x), calls, repeat)}
+    converters = [(x[0], Units.converter(x[1], x[2])) for x in calls]
+    timings["units:converter"] = timed(lambda x: x[1](x[0]), converters, repeat)
+    return timings, checks
+
+def bench_batches(repeat: int) -> tuple:
+    """
+    Times random T/P batches, scalar and (with NumPy) with ``steam_batch``.
+    """
+    rng = random.Random(SEED + 1)
+    table = steam_engine.comp_sup
+    grid = table.grid()
+    (temps, pressures) = (grid.temps, grid.pressures)
+    (log_low, log_high) = (math.log10(pressures[0]), math.log10(pressures[-1]))
+    states = [(rng.uniform(temps[0], temps[-1]), 10 ** rng.uniform(log_low, log_high)) for _ in range(BATCH_SIZE)]
+    timings = {}
+    checks = {}
+    scalar = states[:SCALAR_BATCH_SIZE]
+    result = timed(lambda x: steam_engine.find_value_T_P(x[0], x[1], Property.ENTHALPY, table), scalar, repeat)
+    timings["batch:scalar"] = dict(result, unit="states/s", best=1e9 / result["best"], median=1e9 / result["median"])
+    try:
+        import numpy as np
+        import steam_batch
+    except ImportError:
+        timings["batch:numpy"] = {"skipped": "NumPy is not installed"}
+        return timings, checks
+    T = np.array([x[0] for x in states])
+    P = np.array([x[1] for x in states])
+    seconds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        values = steam_batch.T_P_lookup(T, P, Property.ENTHALPY, table=table)
+        seconds.append(time.perf_counter() - start)
+    timings["batch:numpy"] = {"unit": "states/s", "best": BATCH_SIZE / min(seconds),
+                              "median": BATCH_SIZE / statistics.median(seconds), "calls": BATCH_SIZE}
+    failures = []
+    for (i, (x, y)) in enumerate(scalar):
+        expected = steam_engine.find_value_T_P(x, y, Property.ENTHALPY, table)[-1]
+        got = float(values[i])
+        if not ((expected is None and math.isnan(got)) or (expected is not None and same(got, encode(expected)))):
+            failures.append({"inputs": [x, y], "expected": encode(expected), "got": encode(got)})
+    checks["batch:numpy"] = {"cases": len(scalar), "failures": len(failures), "examples": failures[:5]}
+    return timings, checks
+
+def bench_dense(repeat: int) -> tuple:
+    """
+    Times ``DenseGrid.value`` against the bisecting ``find_value_T_P`` at the
+    same random states, and checks the grid's nodes against the lookups they
+    were resampled from.
+    """
+    import dense_grid
+    rng = random.Random(SEED + 2)
+    table = steam_engine.comp_sup
+    dense = dense_grid.DenseGrid.build(table)
+    grid = table.grid()
+    (log_low, log_high) = (math.log10(grid.pressures[0]), math.log10(grid.pressures[-1]))
+    states = [(rng.uniform(grid.temps[0], grid.temps[-1]), 10 ** rng.uniform(log_low, log_high))
+              for _ in range(SCALAR_BATCH_SIZE)]
+    timings = {
+        "dense:grid": timed(lambda x: dense.value(x[0], x[1], Property.ENTHALPY), states, repeat),
+        "dense:bisect": timed(lambda x: steam_engine.find_value_T_P(x[0], x[1], Property.ENTHALPY, table), states, repeat),
+    }
+    failures = []
+    nodes = [(rng.randrange(dense.n_T), rng.randrange(dense.n_P)) for _ in range(CASES_PER_KIND)]
+    for (i, j) in nodes:
+        (T, P) = (dense.T_start + i * dense.T_step, 10 ** (dense.log_P_start + j * dense.log_P_step))
+        expected = steam_engine.find_value_T_P(T, P, Property.ENTHALPY, table)[-1]
+        got = dense.value(T, P, Property.ENTHALPY)
+        if not (((expected is None or math.isnan(expected)) and got is None) or same(got, encode(expected))):
+            failures.append({"inputs": [T, P], "expected": encode(expected), "got": encode(got)})
+    checks = {"dense:nodes": {"cases": len(nodes), "failures": len(failures), "examples": failures[:5]}}
+    return timings, checks
+
+def compare(results: dict, previous: dict, threshold: float) -> list:
+    # names of timings that got worse by more than threshold (a ratio)
+    slower = []
+    for (name, now) in results["timings"].items():
+        before = previous.get("timings", {}).get(name)
+        if not before or "best" not in now or "best" not in before:
+            continue
+        ratio = now["best"] / before["best"]
+        if now["unit"] == "states/s":
+            ratio = 1 / ratio
+        if ratio > threshold:
+            slower.append({"name": name, "ratio": ratio, "before": before["best"], "now": now["best"], "unit": now["unit"]})
+    return slower
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark and check the steam table lookups.")
+    parser.add_argument("-o", "--output", default="-", help="results JSON file, - for stdout (default)")
+    parser.add_argument("--repeat", type=int, default=5, help="timing repeats; the best and median are kept (default 5)")
+    parser.add_argument("--skip-startup", action="store_true", help="skip the fresh-interpreter import and load timings")
+    parser.add_argument("--compare", metavar="RESULTS", help="earlier results file to flag slowdowns against")
+    parser.add_argument("--threshold", type=float, default=1.2,
+                        help="slowdown ratio --compare reports (default 1.2)")
+    parser.add_argument("--reference", default=REFERENCE_FILE, help="reference cases and results")
+    parser.add_argument("--record", action="store_true",
+                        help="record the reference from the current implementation instead of benchmarking")
+    args = parser.parse_args(argv)
+
+    if args.record:
+        reference = record(args.reference)
+        print(f"Recorded {sum(len(y) for x in reference['lookups'].values() for y in x.values())} lookup cases "
+              f"and {len(reference['conversions'])} conversions to {args.reference}.", file=sys.stderr)
+        return 0
+    with open(args.reference, encoding="utf-8") as f:
+        reference = json.load(f)
+
+    results = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "commit": git_commit(),
+        "reference_commit": reference.get("recorded_from"),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "repeat": args.repeat,
+        "timings": {},
+        "checks": {},
+    }
+    if not args.skip_startup:
+        results["timings"].update(bench_startup(args.repeat))
+    for bench in (bench_lookups, bench_conversions):
+        (timings, checks) = bench(reference, args.repeat)
+        results["timings"].update(timings)
+        results["checks"].update(checks)
+    for bench in (bench_batches, bench_dense):
+        (timings, checks) = bench(args.repeat)
+        results["timings"].update(timings)
+        results["checks"].update(checks)
+    failed = sum(x["failures"] for x in results["checks"].values())
+    results["passed"] = failed == 0
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            results["slower"] = compare(results, json.load(f), args.threshold)
+
+    text = json.dumps(results, indent=2)
+    if args.output == "-":
+        print(text)
+    else:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text + "\n")
+    if failed:
+        print(f"{failed} results differ from the reference.", file=sys.stderr)
+    return 1 if failed else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
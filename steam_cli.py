@@ -0,0 +1,229 @@
+import argparse
+import csv
+import io
+import json
+import sys
+from collections import deque
+from itertools import islice
+import Units
+import steam_engine
+from steam_engine import Property, SearchMode, CELSIUS, MPA, UNITS, table_unit
+
+# Batch lookups from the command line. Reads states from a CSV or JSON Lines
+# file and streams the requested properties out in the same order, a chunk at
+# a time so memory stays flat however big the input is.
+#
+# Each input row has:
+#   mode        SAT_BY_T, SAT_BY_P or T_AND_P
+#   T, P        whichever the mode needs
+#   T_unit, P_unit
+#               unit symbols from unit_config.json, default °C and MPa
+#   properties  Property names to look up; a list in JSON Lines, separated by
+#               ";" in CSV. Defaults to --properties.
+# Every row has to fit on one line (no quoted line breaks in CSV).
+
+def parse_properties(raw) -> list:
+    if isinstance(raw, str):
+        raw = [x for x in raw.split(";") if x.strip()]
+    return [Property[x.strip()] for x in raw]
+
+def result_converters(units: dict) -> dict:
+    """
+    Turns ``{property name: unit symbol}`` into the ``result_units`` that
+    ``evaluate`` takes.
+    """
+    converters = {}
+    for (name, symbol) in units.items():
+        prop = Property[name.strip()]
+        converters[prop] = Units.converter(table_unit(prop), UNITS[symbol.strip()])
+    return converters
+
+def read_value(row: dict, name: str, default_unit: Units.Unit) -> float:
+    raw = row.get(name)
+    if raw is None or raw == "":
+        raise ValueError(f"{name} is required for mode {row.get('mode')}.")
+    unit = UNITS[row.get(f"{name}_unit") or default_unit.symbol]
+    return Units.converter(unit, default_unit)(float(raw))
+
+def evaluate(row: dict, default_props: list, result_units: dict, dome: bool = False) -> dict:
+    """
+    Looks up the properties one input row asks for.
+
+    :param row: Input row
+    :type row: dict
+    :param default_props: Properties to use when the row doesn't list any
+    :type default_props: list[Property]
+    :param result_units: Converter to the output unit for each property, where
+        not the table's unit
+    :type result_units: dict[Property, Units.Converter]
+    :param dome: Classify T_AND_P phases against the saturation dome and
+        treat states whose brackets cross it as outside the table
+    :type dome: bool
+    :return: Result for each property name, None where the state is outside
+        the table or the table has no such property
+    :rtype: dict
+    """
+    mode = SearchMode[str(row["mode"]).strip()]
+    props = parse_properties(row["properties"]) if row.get("properties") else default_props
+    T = read_value(row, "T", CELSIUS) if mode != SearchMode.SAT_BY_P else None
+    P = read_value(row, "P", MPA) if mode != SearchMode.SAT_BY_T else None
+    return lookup(mode, T, P, props, result_units, dome)
+
+def lookup(mode: SearchMode, T: float, P: float, props: list, result_units: dict, dome: bool = False) -> dict:
+    """
+    Looks up properties at a state already in table units.
+
+    Takes the same arguments as ``evaluate`` and gives the same results.
+    """
+    match mode:
+        case SearchMode.SAT_BY_T:
+            table = steam_engine.sat_by_T
+            wanted = [x for x in props if x in table.properties()]
+            state = steam_engine.search_state(Property.TEMP, T, table, wanted)
+        case SearchMode.SAT_BY_P:
+            table = steam_engine.sat_by_P
+            wanted = [x for x in props if x in table.properties()]
+            state = steam_engine.search_state(Property.PRESSURE, P, table, wanted)
+        case SearchMode.T_AND_P:
+            table = steam_engine.comp_sup
+            wanted = [x for x in props if x in table.properties()]
+            state = steam_engine.find_state_T_P(
+                T, P, table, wanted,
+                steam_engine.saturation_dome() if dome else None,
+            )
+    results = {}
+    for prop in props:
+        value = state.get(prop) if state is not None else None
+        if value != value:
+            # blank table cells
+            value = None
+        if value is not None and prop in result_units:
+            value = result_units[prop](value)
+        results[prop.name] = value
+    return results
+
+def process_chunk(args: tuple) -> str:
+    """
+    Turns a chunk of input lines into the matching block of output.
+
+    Parsing and formatting happen here rather than in the main process so
+    that with ``--workers`` the main process only moves text around.
+    """
+    (lines, config) = args
+    (in_fmt, out_fmt, in_fields, out_fields, default_props, result_units, dome) = config
+    if in_fmt == "csv":
+        rows = csv.DictReader(lines, in_fields)
+    else:
+        rows = (json.loads(x) for x in lines if x.strip())
+    out = io.StringIO()
+    writer = csv.DictWriter(out, out_fields, extrasaction="ignore") if out_fmt == "csv" else None
+    for row in rows:
+        try:
+            values = evaluate(row, default_props, result_units, dome)
+            error = None
+        except (KeyError, ValueError, TypeError) as e:
+            values = {}
+            error = f"{type(e).__name__}: {e}"
+        missing = [x for x in values if writer is not None and x not in out_fields]
+        if missing:
+            # the CSV header is already written, so these have nowhere to go
+            values = {}
+            error = f"No output column for {', '.join(missing)}; add it to --properties."
+        if writer is None:
+            record = dict(row)
+            record["results"] = values
+            if error:
+                record["error"] = error
+            out.write(json.dumps(record) + "\n")
+        else:
+            record = dict(row)
+            record.update({k: ("" if v is None else v) for (k, v) in values.items()})
+            record["error"] = error or ""
+            writer.writerow(record)
+    return out.getvalue()
+
+def chunked(lines, size: int):
+    lines = iter(lines)
+    while True:
+        chunk = list(islice(lines, size))
+        if not chunk:
+            return
+        yield chunk
+
+def ordered_results(chunks, config: tuple, workers: int, work=process_chunk, start_method: str = None):
+    # yields work((chunk, config)) for each chunk in input order, with at most
+    # a few chunks in flight
+    if workers <= 1:
+        for chunk in chunks:
+            yield work((chunk, config))
+        return
+    import multiprocessing
+    from shared_tables import SharedTables, attach
+    context = multiprocessing.get_context(start_method)
+    # workers share one copy of the tables instead of loading their own
+    with SharedTables() as shared, context.Pool(workers, initializer=attach, initargs=(shared.handle,)) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.apply_async(work, ((chunk, config),)))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+
+def guess_format(path: str, fmt: str) -> str:
+    if fmt:
+        return fmt
+    return "jsonl" if path.endswith((".jsonl", ".json", ".ndjson")) else "csv"
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Look up steam properties for a file of states.")
+    parser.add_argument("input", help="CSV or JSON Lines file of states, - for stdin")
+    parser.add_argument("-o", "--output", default="-", help="output file, - for stdout (default)")
+    parser.add_argument("--input-format", choices=["csv", "jsonl"], help="default: from the file extension")
+    parser.add_argument("--output-format", choices=["csv", "jsonl"], help="default: same as the input")
+    parser.add_argument("--properties", default="", help="';'-separated Property names for rows that don't list any")
+    parser.add_argument("--unit", action="append", default=[], metavar="PROPERTY=SYMBOL",
+                        help="output unit for a property (repeatable), default is the table unit")
+    parser.add_argument("--dome", action="store_true",
+                        help="classify T_AND_P phases against the saturation dome and reject states interpolated across it")
+    parser.add_argument("--chunk-size", type=int, default=10000, help="rows per chunk (default 10000)")
+    parser.add_argument("-j", "--workers", type=int, default=1, help="worker processes (default 1)")
+    args = parser.parse_args(argv)
+
+    default_props = parse_properties(args.properties)
+    result_units = {}
+    for x in args.unit:
+        try:
+            (prop, symbol) = x.split("=", 1)
+            result_units.update(result_converters({prop: symbol}))
+        except (KeyError, ValueError, AttributeError):
+            parser.error(f"bad --unit {x!r}")
+    in_fmt = guess_format(args.input, args.input_format)
+    out_fmt = args.output_format or in_fmt
+
+    fin = sys.stdin if args.input == "-" else open(args.input, newline="", encoding="utf-8-sig")
+    fout = sys.stdout if args.output == "-" else open(args.output, "w", newline="", encoding="utf-8")
+    try:
+        in_fields = None
+        out_fields = None
+        if in_fmt == "csv":
+            in_fields = next(csv.reader([fin.readline()]), [])
+        if out_fmt == "csv":
+            # CSV needs its columns up front: the input's, then every
+            # property that could be asked for
+            props = default_props or [x for x in Property]
+            out_fields = (in_fields or ["mode", "T", "T_unit", "P", "P_unit", "properties"])
+            out_fields = out_fields + [x.name for x in props if x.name not in out_fields] + ["error"]
+            csv.writer(fout).writerow(out_fields)
+        # rows are one line each, so chunks can be cut without parsing
+        config = (in_fmt, out_fmt, in_fields, out_fields, default_props, result_units, args.dome)
+        for block in ordered_results(chunked(fin, args.chunk_size), config, args.workers):
+            fout.write(block)
+    finally:
+        if fin is not sys.stdin:
+            fin.close()
+        if fout is not sys.stdout:
+            fout.close()
+
+if __name__ == "__main__":
+    main()
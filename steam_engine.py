@@ -0,0 +1,1249 @@
+import os
+from enum import Enum
+from math import nan, inf
+from array import array
+from itertools import count, chain
+from bisect import bisect_left, bisect_right
+import Units
+
+# this doesn't work if the working directory has been changed
+# so it's at the beginning just in case
+dir_path = os.path.dirname(os.path.realpath(__file__))
+
+sat_by_P_file = os.path.join(dir_path, "saturated_by_pressure_V1.4.csv")
+sat_by_T_file = os.path.join(dir_path, "saturated_by_temperature_V1.5.csv")
+comp_sup_file = os.path.join(dir_path, "compressed_liquid_and_superheated_steam_V1.3.csv")
+unit_config_file = os.path.join(dir_path, "unit_config.json")
+
+class PropType(Enum):
+    SAT = "sat"
+    P_T = "p_t"
+    SEARCH = "search"
+class Property(Enum):
+    TEMP = 'T (°C)', Units.Type.TEMPERATURE, "Temperature", PropType.SEARCH
+    PRESSURE = 'P (MPa)', Units.Type.PRESSURE, "Pressure", PropType.SEARCH
+
+    VOLUME_LIQUID = 'Specific Volume Liquid (m^3/kg)', Units.Type.SPECIFIC_VOLUME, "Specific Volume (liquid)", PropType.SAT
+    VOLUME_VAPOR = 'Specific Volume Vapor (m^3/kg)', Units.Type.SPECIFIC_VOLUME, "Specific Volume (vapor)", PropType.SAT
+    VOLUME = 'Specific Volume (m^3/kg)', Units.Type.SPECIFIC_VOLUME, "Specific Volume", PropType.P_T
+    DENSITY = 'Density (kg/m^3)', Units.Type.DENSITY, "Density", PropType.P_T
+
+    ENERGY_LIQUID = 'Internal Energy Liquid (kJ/kg)', Units.Type.SPECIFIC_ENERGY, "Internal Energy (liquid)", PropType.SAT
+    ENERGY_VAPOR = 'Internal Energy Vapor (kJ/kg)', Units.Type.SPECIFIC_ENERGY, "Internal Energy (vapor)", PropType.SAT
+    ENERGY_VAPORIZATION = 'Internal Energy of Vaporization (kJ/kg)', Units.Type.SPECIFIC_ENERGY, "Internal Energy of Vaporization", PropType.SAT
+    ENERGY = 'Specific Internal Energy (kJ/kg)', Units.Type.SPECIFIC_ENERGY, "Internal Energy", PropType.P_T
+
+    ENTHALPY_LIQUID = 'Enthalpy Liquid (kJ/kg)', Units.Type.SPECIFIC_ENERGY, "Enthalpy (liquid)", PropType.SAT
+    ENTHALPY_VAPOR = 'Enthalpy Vapor (kJ/kg)', Units.Type.SPECIFIC_ENERGY, "Enthalpy (vapor)", PropType.SAT
+    ENTHALPY_VAPORIZATION = 'Enthalpy of Vaporization (kJ/kg)', Units.Type.SPECIFIC_ENERGY, "Enthalpy of Vaporization", PropType.SAT
+    ENTHALPY = 'Specific Enthalpy (kJ/kg)', Units.Type.SPECIFIC_ENERGY, "Enthalpy", PropType.P_T
+
+    ENTROPY_LIQUID = 'Entropy Liquid [kJ/(kg K)]', Units.Type.SPECIFIC_ENTROPY, "Entropy (liquid)", PropType.SAT
+    ENTROPY_VAPOR = 'Entropy Vapor [kJ/(kg K)]', Units.Type.SPECIFIC_ENTROPY, "Entropy (vapor)", PropType.SAT
+    ENTROPY_VAPORIZATION = 'Entropy of Vaporization [kJ/(kg K)]', Units.Type.SPECIFIC_ENTROPY, "Entropy of Vaporization", PropType.SAT
+    ENTROPY = 'Specific Entropy [kJ/(kg K)]', Units.Type.SPECIFIC_ENTROPY, "Entropy", PropType.P_T
+
+    PHASE = 'Phase', None, "Phase", PropType.P_T
+
+    def __new__(cls, table_name, unit_type, disp_name, type):
+        obj = object.__new__(cls)
+        obj._value_ = table_name
+        obj.unit_type = unit_type
+        obj.disp_name = disp_name
+        obj.type = type
+        return obj
+class Phase(Enum):
+    VAPOR = 'vapor'
+    SATURATED_VAPOR = 'saturated vapor'
+    LIQUID = 'liquid'
+    SATURATED_LIQUID = 'saturated liquid'
+    SUPERCRITICAL_FLUID = 'supercritical fluid'
+class SearchMode(Enum):
+    SAT_BY_T = 0
+    SAT_BY_P = 1
+    T_AND_P = 2
+
+# phases are stored as their position in this tuple
+PHASES = tuple(Phase)
+
+_table_versions = count()
+
+class Table():
+    def __init__(self, columns: dict, phases: array = None):
+        """
+        Creates a column-wise steam table
+
+        :param columns: Numeric columns, as float64 arrays keyed by ``Property``
+        :type columns: dict[Property, array]
+        :param phases: Phase of each row, as indices into ``PHASES``
+        :type phases: array
+        """
+        self.columns = columns
+        self.phases = phases
+        # distinguishes this table from any earlier load of the same file
+        self.version = next(_table_versions)
+        self._indexes = {}
+        self._grid = None
+
+    @classmethod
+    def from_rows(cls, rows: list[dict]) -> "Table":
+        """
+        Builds a table from rows keyed by column header, as ``DictReader`` produces
+
+        :param rows: Table rows
+        :type rows: list[dict]
+        :return: Column-wise copy of ``rows``
+        :rtype: Table
+        """
+        columns = {}
+        phases = None
+        for key in (rows[0].keys() if rows else ()):
+            try:
+                prop = Property(key)
+            except ValueError:
+                continue
+            if prop == Property.PHASE:
+                phases = array("b", [PHASES.index(Phase(x[key])) for x in rows])
+            else:
+                # blank cells become NaN
+                columns[prop] = array("d", [float(x[key]) if x[key] != "" else nan for x in rows])
+        return cls(columns, phases)
+
+    def __len__(self):
+        return len(next(iter(self.columns.values())))
+
+    def properties(self) -> list:
+        # every property this table has a column for
+        return list(self.columns.keys()) + ([Property.PHASE] if self.phases is not None else [])
+
+    def value(self, prop: Property, row: int):
+        try:
+            if prop == Property.PHASE:
+                return PHASES[self.phases[row]].value
+            return self.columns[prop][row]
+        except (KeyError, TypeError):
+            if prop in self.properties():
+                raise
+            # e.g. a table loaded with only some of its columns
+            raise KeyError(f"{prop.disp_name} was not loaded into this table.") from None
+
+    def index(self, key: Property) -> "SortedIndex":
+        if key not in self._indexes:
+            self._indexes[key] = SortedIndex(self, key)
+        return self._indexes[key]
+
+    def grid(self) -> "Grid":
+        if self._grid is None:
+            self._grid = Grid(self)
+        return self._grid
+
+def bisect_from(keys, value: float, hint: int = None) -> int:
+    # same as bisect_left, but tries hint and the positions either side of it
+    # first, which is all a slowly moving value ever needs
+    if hint is not None:
+        n = len(keys)
+        if 0 < hint < n and keys[hint - 1] < value <= keys[hint]:
+            return hint
+        for i in (hint + 1, hint - 1):
+            if 0 <= i <= n and (i == 0 or keys[i - 1] < value) and (i == n or value <= keys[i]):
+                return i
+    return bisect_left(keys, value)
+
+class SortedIndex():
+    def __init__(self, table: Table, key: Property, rows=None):
+        """
+        Creates a sorted view of ``table`` that can be bracketed by binary search
+
+        Rows with equal keys keep their original order, so the first match
+        found here is the same row a front-to-back scan would find.
+
+        :param table: Table to index
+        :type table: Table
+        :param key: Column to sort and search by
+        :type key: Property
+        :param rows: Row numbers to include, defaults to the whole table
+        :type rows: list[int]
+        """
+        column = table.columns[key]
+        if rows is None:
+            rows = range(len(column))
+        self.table = table
+        self.rows = array("q", sorted(rows, key=column.__getitem__))
+        self.keys = array("d", [column[i] for i in self.rows])
+
+    @classmethod
+    def presorted(cls, table: Table, keys, rows) -> "SortedIndex":
+        # wraps keys and row numbers that are already in sorted order
+        index = cls.__new__(cls)
+        index.table = table
+        index.keys = keys
+        index.rows = rows
+        return index
+
+    def bracket(self, value: float, hint: int = None) -> tuple:
+        """
+        Finds the rows on either side of ``value``.
+
+        :param value: Value to search for
+        :type value: float
+        :param hint: ``exact`` or ``high`` from an earlier call, to check
+            around before searching the whole index
+        :type hint: int
+        :return: ``(exact, low, high)`` positions in ``self.keys``; ``exact``
+            is set on an exact match, otherwise ``low`` and ``high`` are set
+            unless ``value`` is outside the table
+        :rtype: tuple
+        """
+        keys = self.keys
+        i = bisect_from(keys, value, hint)
+        if i < len(keys) and keys[i] == value:
+            return i, None, None
+        if i == 0 or i == len(keys):
+            return None, None, None
+        # step back to the first row sharing the low key
+        low = i - 1
+        if low > 0 and keys[low - 1] == keys[low]:
+            low = bisect_left(keys, keys[low], 0, low)
+        return None, low, i
+
+class Grid():
+    def __init__(self, table: Table):
+        """
+        Splits a temperature and pressure table into isotherms and isobars
+
+        :param table: Table with both T and P columns
+        :type table: Table
+        """
+        isotherms = {}
+        isobars = {}
+        temps = table.columns[Property.TEMP]
+        pressures = table.columns[Property.PRESSURE]
+        for i in range(len(table)):
+            isotherms.setdefault(temps[i], []).append(i)
+            isobars.setdefault(pressures[i], []).append(i)
+        # sorted distinct temperatures and pressures, for bracketing T and P
+        self.temps = sorted(isotherms.keys())
+        self.pressures = sorted(isobars.keys())
+        # each isotherm is indexed by pressure, each isobar by temperature
+        self.isotherms = {T: SortedIndex(table, Property.PRESSURE, x) for (T, x) in isotherms.items()}
+        self.isobars = {P: SortedIndex(table, Property.TEMP, x) for (P, x) in isobars.items()}
+        self.table = table
+        self._cells = {}
+        self._cells_version = table.version
+
+    @classmethod
+    def from_indexes(cls, isotherms: dict, isobars: dict) -> "Grid":
+        # reassembles a grid from isotherm and isobar indexes built earlier
+        grid = cls.__new__(cls)
+        grid.temps = sorted(isotherms.keys())
+        grid.pressures = sorted(isobars.keys())
+        grid.isotherms = isotherms
+        grid.isobars = isobars
+        grid.table = next(iter(isotherms.values())).table
+        grid._cells = {}
+        grid._cells_version = grid.table.version
+        return grid
+
+    def cells(self, P: float, prop: Property):
+        """
+        Returns the cells the forward lookup interpolates ``prop`` across at
+        pressure ``P``, built on first use for each isobar, or each gap
+        between two neighbouring isobars, since every pressure in a gap
+        brackets the same rows.
+
+        :param P: Pressure, in MPa
+        :type P: float
+        :param prop: Property the cells are for
+        :type prop: Property
+        :return: ``(cells, start)``, where each cell is ``(low_T, high_T,
+            low_bracket, high_bracket)`` in rising temperature, the brackets
+            giving ``prop`` at ``P`` with ``bracket_value``, and from
+            ``start`` up ``prop`` never falls with temperature. None outside
+            the table.
+        :rtype: tuple
+        """
+        if P in self.isobars:
+            (low_P, high_P) = (P, P)
+        else:
+            i = bisect_left(self.pressures, P)
+            if i == 0 or i == len(self.pressures):
+                return None
+            (low_P, high_P) = (self.pressures[i - 1], self.pressures[i])
+        if self._cells_version != self.table.version:
+            self._cells = {}
+            self._cells_version = self.table.version
+        key = (low_P, high_P, prop)
+        if key not in self._cells:
+            self._cells[key] = self.build_cells(low_P, high_P, prop)
+        return self._cells[key]
+
+    def build_cells(self, low_P: float, high_P: float, prop: Property) -> tuple:
+        cells = []
+        if low_P == high_P:
+            isobar = self.isobars[low_P]
+            temps = sorted(set(isobar.keys))
+            for i in range(1, len(temps)):
+                # a temperature can have two rows, saturated liquid and vapor; the
+                # middle of the cell brackets the same pair the forward lookup does
+                (low_T, high_T, low_row, high_row) = index_bracket(isobar, (temps[i - 1] + temps[i]) / 2)
+                cells.append((low_T, high_T, (low_P, low_P, low_row, low_row), (low_P, low_P, high_row, high_row)))
+        else:
+            middle = (low_P + high_P) / 2
+            brackets = [index_bracket(self.isotherms[T], middle) for T in self.temps]
+            for i in range(1, len(self.temps)):
+                # both isotherms have to reach the gap, as in grid_bracket
+                if brackets[i - 1] is not None and brackets[i] is not None:
+                    cells.append((self.temps[i - 1], self.temps[i], brackets[i - 1], brackets[i]))
+        # Within a gap each end of a cell is linear in P, so if prop doesn't
+        # fall with temperature at either edge it doesn't anywhere between.
+        # NaN fails the comparison and ends the run.
+        start = len(cells)
+        above = (inf, inf)
+        while start > 0:
+            (low_T, high_T, low_bracket, high_bracket) = cells[start - 1]
+            low = tuple(bracket_value(self.table, prop, x, low_bracket) for x in (low_P, high_P))
+            high = tuple(bracket_value(self.table, prop, x, high_bracket) for x in (low_P, high_P))
+            if not all(a <= b <= c for (a, b, c) in zip(low, high, above)):
+                break
+            above = low
+            start -= 1
+        return cells, start
+
+# which side of the saturation dome each phase code is on: -1 liquid, 1 vapor,
+# 0 for supercritical fluid, which joins both sides without crossing the dome
+DOME_SIDES = array("b", [
+    {Phase.LIQUID: -1, Phase.SATURATED_LIQUID: -1, Phase.VAPOR: 1, Phase.SATURATED_VAPOR: 1}.get(x, 0)
+    for x in PHASES
+])
+
+class SaturationDome():
+    def __init__(self, T_P_table: Table, *sat_tables: Table):
+        """
+        Builds the saturation curve from the temperature and pressure columns of tables
+
+        The saturated rows of ``T_P_table`` and every row of the saturation
+        tables are points on the curve. Points from earlier tables take
+        precedence, and a later point is only added if it keeps the curve
+        rising, so the rows of ``T_P_table`` classify exactly.
+
+        :param T_P_table: Table searched by temperature and pressure, loaded with its phases
+        :type T_P_table: Table
+        :param sat_tables: Saturation tables to fill in the curve, most trusted first
+        :type sat_tables: Table
+        :raises ValueError: If ``T_P_table`` was loaded without its phases
+        """
+        if T_P_table.phases is None:
+            raise ValueError("The saturation dome needs the phases of the temperature and pressure table!")
+        self.temps = array("d")
+        self.pressures = array("d")
+        saturated = {PHASES.index(Phase.SATURATED_LIQUID), PHASES.index(Phase.SATURATED_VAPOR)}
+        for (n, table) in enumerate((T_P_table,) + sat_tables):
+            temps = table.columns[Property.TEMP]
+            pressures = table.columns[Property.PRESSURE]
+            for i in range(len(temps)):
+                if n == 0 and table.phases[i] not in saturated:
+                    continue
+                (T, P) = (temps[i], pressures[i])
+                j = bisect_left(self.temps, T)
+                if j < len(self.temps) and self.temps[j] == T:
+                    continue
+                if not (j == 0 or self.pressures[j - 1] < P) or not (j == len(self.temps) or P < self.pressures[j]):
+                    continue
+                self.temps.insert(j, T)
+                self.pressures.insert(j, P)
+        self.critical_T = self.temps[-1]
+        self.critical_P = self.pressures[-1]
+
+    def pressure(self, T: float) -> float:
+        """
+        Returns the saturation pressure at ``T``, or None above the critical point.
+
+        Below the triple point the triple point pressure is returned.
+        """
+        i = bisect_left(self.temps, T)
+        if i == len(self.temps):
+            return None
+        if self.temps[i] == T or i == 0:
+            return self.pressures[i]
+        return lin_interpolate(T, self.temps[i - 1], self.temps[i], self.pressures[i - 1], self.pressures[i])
+
+    def classify(self, T: float, P: float):
+        """
+        Classifies a temperature and pressure against the saturation curve.
+
+        :param T: Temperature, in °C
+        :type T: float
+        :param P: Pressure, in MPa
+        :type P: float
+        :return: ``Phase.LIQUID``, ``Phase.VAPOR`` or ``Phase.SUPERCRITICAL_FLUID``,
+            or None on the saturation curve itself, where T and P don't fix the phase
+        :rtype: Phase
+        """
+        saturation = self.pressure(T)
+        if saturation is None:
+            return Phase.SUPERCRITICAL_FLUID if P > self.critical_P else Phase.VAPOR
+        if P > saturation:
+            return Phase.LIQUID
+        if P < saturation:
+            return Phase.VAPOR
+        return None
+
+    def same_side(self, T: float, P: float, table: Table, rows) -> bool:
+        # True unless interpolating between rows would cross the dome, either
+        # between the rows themselves or between the rows and (T, P)
+        phase = self.classify(T, P)
+        sides = {DOME_SIDES[table.phases[i]] for i in rows}
+        if phase is not None:
+            sides.add(DOME_SIDES[PHASES.index(phase)])
+        return not (-1 in sides and 1 in sides)
+
+class TableSchema():
+    def __init__(self, keys: tuple, columns: tuple):
+        """
+        Describes a table file: the columns it has to have and the order of its rows
+
+        :param keys: Columns the rows are sorted by, most significant first;
+            always loaded, since lookups search by them
+        :type keys: tuple[Property]
+        :param columns: Every column the file has to have
+        :type columns: tuple[Property]
+        """
+        self.keys = keys
+        self.columns = columns
+
+def schema_columns(prop_type: PropType) -> tuple:
+    # the search columns and every property of the type, in Property order
+    return tuple(x for x in Property if x.type in (PropType.SEARCH, prop_type))
+
+# the header row is found by its column names, so these are all there is to
+# know about each file
+TABLE_SCHEMAS = {
+    "sat_by_T": TableSchema((Property.TEMP,), schema_columns(PropType.SAT)),
+    "sat_by_P": TableSchema((Property.PRESSURE,), schema_columns(PropType.SAT)),
+    "comp_sup": TableSchema((Property.PRESSURE, Property.TEMP), schema_columns(PropType.P_T)),
+}
+
+def parse_column(cells: list) -> array:
+    if "" in cells:
+        # blank cells become NaN
+        cells = [x if x != "" else "nan" for x in cells]
+    return array("d", map(float, cells))
+
+def read_csv(filepath, schema: TableSchema = None, props: list = None) -> Table:
+    """
+    Reads a table file.
+
+    Whatever is above the header row (title block, blank lines) is skipped;
+    the header is the first row naming a ``Property`` column. Each column is
+    converted in one pass and phases are encoded as they are read.
+
+    :param filepath: CSV file
+    :type filepath: str
+    :param schema: Columns the file has to have and the order of its rows;
+        not checked if None
+    :type schema: TableSchema
+    :param props: Columns to load, defaults to all; the schema's keys are
+        always loaded
+    :type props: list[Property]
+    :raises ValueError: If there is no header row, a column is unknown,
+        repeated or missing, a row is the wrong length, a cell isn't a
+        number or phase, or the rows are out of order
+    :return: The table
+    :rtype: Table
+    """
+    # csv pulls in re, which is most of this module's import time
+    from csv import reader
+    from operator import itemgetter, le
+    names = {x.value for x in Property}
+    with open(filepath, "r", encoding="utf-8-sig", newline="") as f:
+        lines = reader(f)
+        header = next((x for x in lines if any(y.strip() in names for y in x)), None)
+        if header is None:
+            raise ValueError(f"{filepath}: No header row naming a table column.")
+        header_line = lines.line_num
+        rows = [x for x in lines if any(x)]
+
+    header = [x.strip() for x in header]
+    while header and not header[-1]:
+        header.pop()
+    columns = {}
+    for (i, name) in enumerate(header):
+        if name not in names:
+            raise ValueError(f"{filepath}: Unknown column {name!r}.")
+        if Property(name) in columns:
+            raise ValueError(f"{filepath}: Column {name!r} appears twice.")
+        columns[Property(name)] = i
+    if schema is not None:
+        missing = [x.value for x in schema.columns if x not in columns]
+        if missing:
+            raise ValueError(f"{filepath}: Missing columns {', '.join(missing)}.")
+    width = len(header)
+    for (i, row) in (enumerate(rows) if set(map(len, rows)) - {width} else ()):
+        if len(row) < width or any(row[width:]):
+            raise ValueError(f"{filepath}: Row {i + 1} after the header (line {header_line + i + 1} or later) "
+                             f"has {len(row)} cells, not {width}.")
+
+    wanted = set(columns) if props is None else set(props) | set(schema.keys if schema is not None else ())
+    data = {}
+    phases = None
+    for (prop, i) in columns.items():
+        if prop not in wanted:
+            continue
+        cells = list(map(itemgetter(i), rows))
+        if prop == Property.PHASE:
+            codes = {x.value: j for (j, x) in enumerate(PHASES)}
+            try:
+                phases = array("b", map(codes.__getitem__, cells))
+            except KeyError as e:
+                raise ValueError(f"{filepath}: Unknown phase {e.args[0]!r}.") from None
+            continue
+        try:
+            data[prop] = parse_column(cells)
+        except ValueError as e:
+            raise ValueError(f"{filepath}: Column {prop.value!r}: {e}") from None
+
+    if schema is not None and rows:
+        keys = [data[x] for x in schema.keys]
+        keys = keys[0] if len(keys) == 1 else list(zip(*keys))
+        if not all(map(le, keys, keys[1:])):
+            i = next(i for i in range(len(keys) - 1) if not keys[i] <= keys[i + 1])
+            raise ValueError(f"{filepath}: Rows are not sorted by {', '.join(x.value for x in schema.keys)} "
+                             f"(row {i + 2} after the header).")
+    return Table(data, phases)
+    
+def lin_interpolate(x, x_min, x_max, y_min, y_max):
+    if x_min == x_max:
+        raise ArithmeticError("Divide by Zero when interpolating!")
+    return y_min + ((x - x_min) * (y_max - y_min)) / (x_max - x_min)
+
+def combine(prop: Property, x: float, x_min: float, x_max: float, y_min, y_max):
+    # interpolates one property between two bracketing values
+    if x_min == x_max:
+        return y_min
+    # special case to deal with phase string values
+    if prop == Property.PHASE:
+        if y_min == y_max:
+            return y_min
+        return f"{y_min} or {y_max}"
+    return lin_interpolate(x, x_min, x_max, y_min, y_max)
+
+def index_bracket(index: SortedIndex, value: float, hints: dict = None):
+    """
+    Finds the rows to interpolate between for ``value``.
+
+    :param index: Index to search
+    :type index: SortedIndex
+    :param value: Value to search for
+    :type value: float
+    :param hints: Where the last search of each index ended, read and
+        updated here so the next nearby search can skip the binary search
+    :type hints: dict
+    :return: ``(low_x, high_x, low_row, high_row)``, with both rows the same
+        on an exact match, or None if ``value`` is outside the table
+    :rtype: tuple
+    """
+    if hints is None:
+        (exact, low, high) = index.bracket(value)
+    else:
+        (hint, cell) = hints.get(index, (None, None))
+        # still strictly inside the last cell: same answer without searching
+        if cell is not None and cell[0] < value < cell[1]:
+            return cell
+        (exact, low, high) = index.bracket(value, hint)
+        if exact is not None:
+            hints[index] = (exact, None)
+        elif low is not None:
+            hints[index] = (high, (index.keys[low], index.keys[high], index.rows[low], index.rows[high]))
+            return hints[index][1]
+    if exact is not None:
+        return index.keys[exact], index.keys[exact], index.rows[exact], index.rows[exact]
+    if low is None:
+        return None
+    return index.keys[low], index.keys[high], index.rows[low], index.rows[high]
+
+def bracket_value(table: Table, prop: Property, value: float, bracket: tuple):
+    (low_x, high_x, low_row, high_row) = bracket
+    if low_row == high_row:
+        return table.value(prop, low_row)
+    return combine(prop, value, low_x, high_x, table.value(prop, low_row), table.value(prop, high_row))
+
+def index_interpolate(index: SortedIndex, search_by_value: float, search_for: Property):
+    """
+    Same as ``search_interpolate``, on an already built index.
+    """
+    bracket = index_bracket(index, search_by_value)
+    if bracket is None:
+        return None, None, None
+    return bracket[0], bracket[1], bracket_value(index.table, search_for, search_by_value, bracket)
+
+def search_interpolate(search_by: Property, search_by_value: float, search_for: Property, table: Table):
+    if not isinstance(table, Table):
+        table = Table.from_rows(table)
+    return index_interpolate(table.index(search_by), search_by_value, search_for)
+
+def search_state(search_by: Property, search_by_value: float, table: Table, props: list = None):
+    """
+    Looks up every property of ``table`` at once, bracketing only once.
+
+    :param search_by: Column to search by
+    :type search_by: Property
+    :param search_by_value: Value to search for
+    :type search_by_value: float
+    :param table: Table to search
+    :type table: Table
+    :param props: Properties to look up, defaults to all of them
+    :type props: list[Property]
+    :return: Value of each property, or None if outside the table
+    :rtype: dict[Property, float | str]
+    """
+    if not isinstance(table, Table):
+        table = Table.from_rows(table)
+    bracket = index_bracket(table.index(search_by), search_by_value)
+    if bracket is None:
+        return None
+    if props is None:
+        props = table.properties()
+    return {x: bracket_value(table, x, search_by_value, bracket) for x in props}
+
+def bracket_T_P(T: float, P: float, T_P_table: Table, dome: SaturationDome = None, hints: dict = None):
+    """
+    Finds the rows to interpolate between for a temperature and pressure.
+
+    :param dome: If given, brackets that would interpolate across the
+        saturation dome are rejected as outside the table
+    :type dome: SaturationDome
+    :param hints: As for ``index_bracket``
+    :type hints: dict
+    :return: ``(low_T, high_T, low_P, high_P, low_bracket, high_bracket)``, where
+        the brackets are ``index_bracket`` results across pressure at ``low_T``
+        and ``high_T``, or None if outside the table
+    :rtype: tuple
+    """
+    bracket = grid_bracket(T, P, T_P_table, hints)
+    if bracket is None or dome is None:
+        return bracket
+    if not dome.same_side(T, P, T_P_table, bracket[4][2:] + bracket[5][2:]):
+        return None
+    return bracket
+
+def grid_bracket(T: float, P: float, T_P_table: Table, hints: dict = None):
+    grid = T_P_table.grid()
+    if hints is not None:
+        # still strictly inside the last cell: same answer without searching
+        last = hints.get(T_P_table)
+        if (last is not None and last[0] < T < last[1] and last[4][0] < P < last[4][1]
+                and last[5][0] < P < last[5][1] and P not in grid.isobars):
+            return last
+        hints[T_P_table] = None
+
+    # Check if T matches exactly; this also covers T and P both matching,
+    # which the isotherm's own index returns as an exact hit
+    isotherm = grid.isotherms.get(T)
+    if isotherm is not None:
+        bracket = index_bracket(isotherm, P, hints)
+        if bracket is None:
+            return None
+        return (T, T) + bracket[:2] + (bracket, bracket)
+    
+    # Check if P matches exactly but T doesn't
+    isobar = grid.isobars.get(P)
+    if isobar is not None:
+        bracket = index_bracket(isobar, T, hints)
+        if bracket is None:
+            return None
+        (low_T, high_T, low_row, high_row) = bracket
+        return low_T, high_T, P, P, (P, P, low_row, low_row), (P, P, high_row, high_row)
+    
+    # At this point we have a guarantee that neither temperature nor pressure exactly matches the table
+    if hints is None:
+        i = bisect_left(grid.temps, T)
+    else:
+        i = hints[grid] = bisect_from(grid.temps, T, hints.get(grid))
+    if i == 0 or i == len(grid.temps):
+        return None
+    low_temp = grid.temps[i - 1]
+    high_temp = grid.temps[i]
+    low_bracket = index_bracket(grid.isotherms[low_temp], P, hints)
+    high_bracket = index_bracket(grid.isotherms[high_temp], P, hints)
+    if low_bracket is None or high_bracket is None:
+        return None
+    bracket = (low_temp, high_temp) + low_bracket[:2] + (low_bracket, high_bracket)
+    if hints is not None:
+        hints[T_P_table] = bracket
+    return bracket
+
+def T_P_value(T: float, P: float, prop: Property, T_P_table: Table, bracket: tuple):
+    (low_T, high_T, low_P, high_P, low_bracket, high_bracket) = bracket
+    low_result = bracket_value(T_P_table, prop, P, low_bracket)
+    if low_bracket is high_bracket:
+        return low_result
+    high_result = bracket_value(T_P_table, prop, P, high_bracket)
+    return combine(prop, T, low_T, high_T, low_result, high_result)
+
+def dome_value(T: float, P: float, prop: Property, T_P_table: Table, bracket: tuple, dome: SaturationDome):
+    # the phase comes from the saturation curve where it can, rather than
+    # from interpolating between rows
+    if prop == Property.PHASE and dome is not None:
+        phase = dome.classify(T, P)
+        if phase is not None:
+            return phase.value
+    return T_P_value(T, P, prop, T_P_table, bracket)
+
+def find_value_T_P(T: float, P: float, search_for: Property, T_P_table: Table, dome: SaturationDome = None):
+    if not isinstance(T_P_table, Table):
+        T_P_table = Table.from_rows(T_P_table)
+    bracket = bracket_T_P(T, P, T_P_table, dome)
+    if bracket is None:
+        return None, None, None, None, None
+    return bracket[:4] + (dome_value(T, P, search_for, T_P_table, bracket, dome),)
+
+def find_state_T_P(T: float, P: float, T_P_table: Table, props: list = None, dome: SaturationDome = None):
+    """
+    Looks up every property of ``T_P_table`` at once, bracketing only once.
+
+    :param T: Temperature, in °C
+    :type T: float
+    :param P: Pressure, in MPa
+    :type P: float
+    :param T_P_table: Table to search
+    :type T_P_table: Table
+    :param props: Properties to look up, defaults to all of them
+    :type props: list[Property]
+    :param dome: If given, the phase is classified against it and states
+        whose brackets cross the saturation dome are treated as outside the table
+    :type dome: SaturationDome
+    :return: Value of each property, including the phase, or None if
+        outside the table
+    :rtype: dict[Property, float | str]
+    """
+    if not isinstance(T_P_table, Table):
+        T_P_table = Table.from_rows(T_P_table)
+    bracket = bracket_T_P(T, P, T_P_table, dome)
+    if bracket is None:
+        return None
+    if props is None:
+        props = T_P_table.properties()
+    return {x: dome_value(T, P, x, T_P_table, bracket, dome) for x in props}
+
+def index_cell(index: SortedIndex, value: float):
+    """
+    Finds the segment of an index whose slope applies at ``value``.
+
+    Inside a segment this is the same as ``index_bracket``. On a row, where
+    the slope changes, it is the segment above the row, or below it for the
+    last row.
+
+    :return: ``(low_x, high_x, low_row, high_row)`` with ``low_x < high_x``,
+        or None if ``value`` is outside the index
+    :rtype: tuple
+    """
+    keys = index.keys
+    n = len(keys)
+    i = bisect_left(keys, value)
+    if i < n and keys[i] == value:
+        high = bisect_right(keys, value, i)
+        if high < n:
+            return keys[i], keys[high], index.rows[i], index.rows[high]
+        # the last row: use the segment below it
+    elif i == n:
+        return None
+    if i == 0:
+        return None
+    low = bisect_left(keys, keys[i - 1], 0, i)
+    return keys[low], keys[i], index.rows[low], index.rows[i]
+
+def cell_slope(table: Table, prop: Property, value: float, cell: tuple) -> tuple:
+    # (value, slope) of prop along an index_cell
+    (low_x, high_x, low_row, high_row) = cell
+    column = table.columns[prop]
+    slope = (column[high_row] - column[low_row]) / (high_x - low_x)
+    return column[low_row] + (value - low_x) * slope, slope
+
+def T_P_slopes(T: float, P: float, prop: Property, T_P_table: Table) -> tuple:
+    """
+    Finds the partial derivatives of the ``find_value_T_P`` surface.
+
+    These are exact for the cell the state is in. Where the surface has a
+    crease (on an isotherm, or on a row of one) the slope of the cell on the
+    high side is used, or the low side at the edge of the table.
+
+    :return: ``(d_dT, d_dP)`` in table units per °C and per MPa, either None
+        where the table doesn't have the rows to find it
+    :rtype: tuple
+    """
+    grid = T_P_table.grid()
+    temps = grid.temps
+
+    def on_isotherm(T_iso):
+        # (value, slope in P) along an isotherm
+        cell = index_cell(grid.isotherms[T_iso], P)
+        return None if cell is None else cell_slope(T_P_table, prop, P, cell)
+
+    k = bisect_left(temps, T)
+    exact_T = k < len(temps) and temps[k] == T
+    isobar = grid.isobars.get(P)
+    if isobar is not None:
+        # the lookup runs along the isobar, whose rows are all on isotherms that reach P
+        cell = index_cell(isobar, T)
+        if cell is None:
+            return None, None
+        d_dT = cell_slope(T_P_table, prop, T, cell)[1]
+        (low_T, high_T) = cell[:2]
+    elif exact_T:
+        here = on_isotherm(T)
+        if here is None:
+            return None, None
+        # the nearest isotherm either side that reaches P, high side first
+        for j in list(range(k + 1, len(temps))) + list(range(k - 1, -1, -1)):
+            other = on_isotherm(temps[j])
+            if other is not None:
+                return (other[0] - here[0]) / (temps[j] - T), here[1]
+        return None, here[1]
+    elif k == 0 or k == len(temps):
+        return None, None
+    else:
+        (low_T, high_T) = (temps[k - 1], temps[k])
+        d_dT = None
+
+    if exact_T:
+        here = on_isotherm(T)
+        return d_dT, here[1] if here is not None else None
+    (low, high) = (on_isotherm(low_T), on_isotherm(high_T))
+    if low is None or high is None:
+        return d_dT, None
+    if d_dT is None:
+        d_dT = (high[0] - low[0]) / (high_T - low_T)
+    weight = (T - low_T) / (high_T - low_T)
+    return d_dT, (1 - weight) * low[1] + weight * high[1]
+
+def find_derivatives_T_P(
+        T: float,
+        P: float,
+        search_for: Property,
+        T_P_table: Table,
+        temp_unit: Units.Unit = None,
+        pres_unit: Units.Unit = None,
+        result_unit: Units.Unit = None,
+        ):
+    """
+    Looks up a property and its partial derivatives in one call.
+
+    :param T: Temperature
+    :type T: float
+    :param P: Pressure
+    :type P: float
+    :param search_for: Property to look up; anything but the phase
+    :type search_for: Property
+    :param T_P_table: Table to search
+    :type T_P_table: Table
+    :param temp_unit: Unit of ``T``, defaults to °C
+    :type temp_unit: Units.Unit
+    :param pres_unit: Unit of ``P``, defaults to MPa
+    :type pres_unit: Units.Unit
+    :param result_unit: Unit of the result, defaults to the table's unit
+    :type result_unit: Units.Unit
+    :return: ``(value, d_dT, d_dP)``, the derivatives in result units per
+        ``temp_unit`` and per ``pres_unit`` (see ``T_P_slopes``); all None if
+        outside the table
+    :rtype: tuple
+    """
+    if search_for == Property.PHASE:
+        raise ValueError("Phase has no derivatives!")
+    (T_scale, P_scale, result_scale) = (1.0, 1.0, 1.0)
+    if temp_unit is not None:
+        to_table = Units.converter(temp_unit, table_unit(Property.TEMP))
+        (T, T_scale) = (to_table(T), to_table.slope)
+    if pres_unit is not None:
+        to_table = Units.converter(pres_unit, table_unit(Property.PRESSURE))
+        (P, P_scale) = (to_table(P), to_table.slope)
+    value = find_value_T_P(T, P, search_for, T_P_table)[4]
+    if value is None:
+        return None, None, None
+    (d_dT, d_dP) = T_P_slopes(T, P, search_for, T_P_table)
+    if result_unit is not None:
+        from_table = Units.converter(table_unit(search_for), result_unit)
+        (value, result_scale) = (from_table(value), from_table.slope)
+    if d_dT is not None:
+        d_dT *= result_scale * T_scale
+    if d_dP is not None:
+        d_dP *= result_scale * P_scale
+    return value, d_dT, d_dP
+
+# saturated liquid and vapor columns for each property an inverse lookup can start from
+SAT_COLUMNS = {
+    Property.VOLUME: (Property.VOLUME_LIQUID, Property.VOLUME_VAPOR),
+    Property.ENERGY: (Property.ENERGY_LIQUID, Property.ENERGY_VAPOR),
+    Property.ENTHALPY: (Property.ENTHALPY_LIQUID, Property.ENTHALPY_VAPOR),
+    Property.ENTROPY: (Property.ENTROPY_LIQUID, Property.ENTROPY_VAPOR),
+}
+
+def find_quality_P(P: float, search_by: Property, value: float, sat_table: Table):
+    """
+    Checks whether a pressure and property value fall inside the saturation dome.
+
+    :param P: Pressure, in MPa
+    :type P: float
+    :param search_by: One of the keys of ``SAT_COLUMNS``
+    :type search_by: Property
+    :param value: Value of ``search_by``, in table units
+    :type value: float
+    :param sat_table: Saturation table with a pressure column
+    :type sat_table: Table
+    :return: ``(quality, bracket)``; ``quality`` is None outside the dome,
+        ``bracket`` is the ``index_bracket`` of ``P`` in ``sat_table``, or
+        None above the critical point
+    :rtype: tuple
+    """
+    bracket = index_bracket(sat_table.index(Property.PRESSURE), P)
+    if bracket is None:
+        return None, None
+    return bracket_quality(sat_table, P, bracket, search_by, value), bracket
+
+def bracket_quality(sat_table: Table, search_by_value: float, bracket: tuple, prop: Property, value: float):
+    # quality at which prop has value, or None outside the dome
+    (liquid, vapor) = SAT_COLUMNS[prop]
+    liquid = bracket_value(sat_table, liquid, search_by_value, bracket)
+    vapor = bracket_value(sat_table, vapor, search_by_value, bracket)
+    if not liquid <= value <= vapor:
+        return None
+    if liquid == vapor:
+        return 0.0
+    return (value - liquid) / (vapor - liquid)
+
+def find_quality(search_by: Property, search_by_value: float, prop: Property, value: float, sat_table: Table):
+    """
+    Finds the quality of a saturated mixture from one of its properties.
+
+    :param search_by: ``Property.TEMP`` or ``Property.PRESSURE``
+    :type search_by: Property
+    :param search_by_value: Saturation temperature or pressure, in table units
+    :type search_by_value: float
+    :param prop: ``Property.VOLUME``, ``ENERGY``, ``ENTHALPY`` or ``ENTROPY``
+    :type prop: Property
+    :param value: Value of ``prop`` for the mixture, in table units
+    :type value: float
+    :param sat_table: Saturation table to search
+    :type sat_table: Table
+    :return: Quality (vapor mass fraction), or None if the state isn't a
+        saturated mixture or is outside the table
+    :rtype: float
+    """
+    if prop not in SAT_COLUMNS:
+        raise ValueError(f"Can't find quality from {prop.disp_name}!")
+    bracket = index_bracket(sat_table.index(search_by), search_by_value)
+    if bracket is None:
+        return None
+    return bracket_quality(sat_table, search_by_value, bracket, prop, value)
+
+# properties of a saturated mixture
+MIXTURE_PROPS = (
+    Property.TEMP,
+    Property.PRESSURE,
+    Property.VOLUME,
+    Property.DENSITY,
+    Property.ENERGY,
+    Property.ENTHALPY,
+    Property.ENTROPY,
+)
+
+def mixture_value(sat_table: Table, search_by_value: float, bracket: tuple, prop: Property, quality: float) -> float:
+    if prop == Property.DENSITY:
+        return 1 / mixture_value(sat_table, search_by_value, bracket, Property.VOLUME, quality)
+    if prop not in SAT_COLUMNS:
+        return bracket_value(sat_table, prop, search_by_value, bracket)
+    (liquid, vapor) = SAT_COLUMNS[prop]
+    liquid = bracket_value(sat_table, liquid, search_by_value, bracket)
+    vapor = bracket_value(sat_table, vapor, search_by_value, bracket)
+    return liquid + quality * (vapor - liquid)
+
+def find_mixture(search_by: Property, search_by_value: float, quality: float, sat_table: Table, props: list = None):
+    """
+    Looks up a saturated mixture of liquid and vapor, bracketing only once.
+
+    :param search_by: ``Property.TEMP`` or ``Property.PRESSURE``
+    :type search_by: Property
+    :param search_by_value: Saturation temperature or pressure, in table units
+    :type search_by_value: float
+    :param quality: Vapor mass fraction, from 0 to 1
+    :type quality: float
+    :param sat_table: Saturation table to search
+    :type sat_table: Table
+    :param props: Properties to look up, defaults to ``MIXTURE_PROPS``
+    :type props: list[Property]
+    :return: Value of each property, or None if outside the table
+    :rtype: dict[Property, float]
+    """
+    if not 0 <= quality <= 1:
+        raise ValueError("Quality must be between 0 and 1!")
+    bracket = index_bracket(sat_table.index(search_by), search_by_value)
+    if bracket is None:
+        return None
+    if props is None:
+        props = MIXTURE_PROPS
+    return {x: mixture_value(sat_table, search_by_value, bracket, x, quality) for x in props}
+
+def isobar_T(grid: Grid, P: float, search_by: Property, value: float):
+    # warmest temperature at which the forward lookup at P gives value
+    found = grid.cells(P, search_by)
+    if found is None:
+        return None
+    (cells, start) = found
+    table = grid.table
+    # bisect the steadily rising cells for the last one starting at or below value
+    (low, high) = (start, len(cells))
+    while low < high:
+        middle = (low + high) // 2
+        if bracket_value(table, search_by, P, cells[middle][2]) <= value:
+            low = middle + 1
+        else:
+            high = middle
+    # failing that, search the colder cells from the warmest down
+    order = range(start - 1, -1, -1)
+    if low > start:
+        order = chain((low - 1,), order)
+    for i in order:
+        (low_T, high_T, low_bracket, high_bracket) = cells[i]
+        low_x = bracket_value(table, search_by, P, low_bracket)
+        high_x = bracket_value(table, search_by, P, high_bracket)
+        if low_x <= value <= high_x or high_x <= value <= low_x:
+            return combine(Property.TEMP, value, low_x, high_x, low_T, high_T)
+    return None
+
+def find_T_P_inverse(P: float, search_by: Property, value: float, T_P_table: Table, sat_table: Table = None):
+    """
+    Finds the temperature at which ``search_by`` has ``value`` at pressure ``P``.
+
+    Inside the saturation dome the temperature is the saturation temperature
+    and the quality is returned as well. Elsewhere this inverts
+    ``find_value_T_P``: the value is bracketed between the isotherms
+    interpolated to ``P`` and the temperature is interpolated between them.
+    Where a value is found at more than one temperature, as for the volume of
+    cold liquid (water is densest near 4 °C), the warmest one is returned.
+
+    :param P: Pressure, in MPa
+    :type P: float
+    :param search_by: ``Property.VOLUME``, ``ENERGY``, ``ENTHALPY`` or ``ENTROPY``
+    :type search_by: Property
+    :param value: Value of ``search_by``, in table units
+    :type value: float
+    :param T_P_table: Compressed liquid and superheated steam table
+    :type T_P_table: Table
+    :param sat_table: Saturation table to check for two-phase states,
+        defaults to skipping the check
+    :type sat_table: Table
+    :return: ``(T, quality)``; ``quality`` is None outside the dome, and both
+        are None if the state is outside the tables
+    :rtype: tuple
+    """
+    if search_by not in SAT_COLUMNS:
+        raise ValueError(f"Can't look up temperature from {search_by.disp_name}!")
+    if sat_table is not None:
+        (quality, bracket) = find_quality_P(P, search_by, value, sat_table)
+        if quality is not None:
+            return bracket_value(sat_table, Property.TEMP, P, bracket), quality
+
+    T = isobar_T(T_P_table.grid(), P, search_by, value)
+    if T is None:
+        return None, None
+    return T, None
+
+def find_state_P_inverse(P: float, search_by: Property, value: float, T_P_table: Table, sat_table: Table, props: list = None):
+    """
+    Looks up a whole state from its pressure and one of ``SAT_COLUMNS``.
+
+    :return: ``(quality, state)``; inside the dome ``state`` is the saturated
+        state from ``sat_table`` and ``quality`` is set, otherwise ``state``
+        comes from ``T_P_table`` at the temperature found and ``quality`` is
+        None. Both are None if the state is outside the tables.
+    :rtype: tuple
+    """
+    (T, quality) = find_T_P_inverse(P, search_by, value, T_P_table, sat_table)
+    if T is None:
+        return None, None
+    if quality is not None:
+        return quality, search_state(Property.PRESSURE, P, sat_table, props)
+    return None, find_state_T_P(T, P, T_P_table, props)
+    
+# tables are parsed the first time a lookup asks for them, so importing
+# this module stays cheap for callers that never touch a table
+TABLE_FILES = {
+    "sat_by_T": sat_by_T_file,
+    "sat_by_P": sat_by_P_file,
+    "comp_sup": comp_sup_file,
+}
+# column each saturation table is searched by; indexed as soon as it loads
+TABLE_SEARCH_BY = {
+    "sat_by_T": Property.TEMP,
+    "sat_by_P": Property.PRESSURE,
+}
+# parsed and indexed tables are kept in binary files next to the CSVs (see
+# table_cache.py) and only rebuilt when a CSV or unit_config.json changes
+USE_TABLE_CACHE = True
+_tables = {}
+
+def get_table(name: str, reload: bool = False, props: list = None) -> Table:
+    """
+    Returns the named table, reading it from disk on first use.
+
+    :param name: One of ``"sat_by_T"``, ``"sat_by_P"`` or ``"comp_sup"``
+    :type name: str
+    :param reload: Read the table again even if it is already loaded
+    :type reload: bool
+    :param props: Columns the caller will use. Unless there is a current
+        cache file to map (which only reads what lookups touch anyway), only
+        these and the columns the table is searched by are parsed, and the
+        partial table isn't cached. The partial table is also what the module
+        attribute (e.g. ``steam_engine.comp_sup``) returns from then on, so
+        lookups of other columns, by anyone, raise KeyError until it is loaded
+        again with them, or in full with ``reload``. Defaults to every
+        column, or to what is already loaded.
+    :type props: list[Property]
+    :return: Table rows
+    :rtype: Table
+    """
+    loaded = _tables.get(name)
+    if loaded is not None and not reload and (props is None or set(props) <= set(loaded.properties())):
+        return loaded
+    table = None
+    if USE_TABLE_CACHE:
+        import table_cache
+        table = table_cache.load(TABLE_FILES[name])
+    if table is None:
+        if props is not None and loaded is not None and not reload:
+            props = set(props) | set(loaded.properties())
+        table = read_csv(TABLE_FILES[name], TABLE_SCHEMAS[name], props)
+        if name in TABLE_SEARCH_BY:
+            table.index(TABLE_SEARCH_BY[name])
+        else:
+            table.grid()
+        if USE_TABLE_CACHE and props is None:
+            table_cache.save(table, TABLE_FILES[name], TABLE_SEARCH_BY.get(name))
+    _tables[name] = table
+    return table
+
+_domes = {}
+
+def saturation_dome() -> SaturationDome:
+    """
+    Returns the saturation dome of the loaded tables, building it on first use.
+    """
+    # classifying states needs comp_sup's phases even if it was loaded without them
+    tables = (get_table("comp_sup", props=[Property.PHASE]), get_table("sat_by_P"), get_table("sat_by_T"))
+    key = tuple(x.version for x in tables)
+    if key not in _domes:
+        _domes.clear()
+        _domes[key] = SaturationDome(*tables)
+    return _domes[key]
+
+def __getattr__(name):
+    # lets ``steam_engine.sat_by_T`` etc. keep working as plain module
+    # attributes, and likewise the units
+    if name in TABLE_FILES:
+        return get_table(name)
+    if name in UNIT_NAMES:
+        return load_units()[name]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def assemble_unit(unit_json: dict) -> Units.Unit:
+    if "native_shift" in unit_json.keys():
+        native_shift = unit_json["native_shift"]
+    else:
+        native_shift = 0
+    if "si_shift" in unit_json.keys():
+        si_shift = unit_json["si_shift"]
+    else:
+        si_shift = 0
+    unit_type = [x for x in Units.Type if x.value == unit_json["type"]][0]
+    return Units.Unit(unit_json["symbol"], unit_json["conversion"], unit_type, native_shift, si_shift)
+
+# The units are read from unit_config.json on first use of any of these
+# module attributes (through __getattr__, which also covers ``from
+# steam_engine import CELSIUS``), so importing this module doesn't load json
+# and the re it imports.
+UNIT_NAMES = ("CELSIUS", "MPA", "TABLE_UNITS", "ALL_UNITS", "UNITS", "TABLE_UNIT_BY_TYPE")
+_units = None
+
+def load_units() -> dict:
+    """
+    Reads unit_config.json, the first time it is called.
+
+    :return: The attributes named in ``UNIT_NAMES``
+    :rtype: dict
+    """
+    global _units
+    if _units is not None:
+        return _units
+    import json
+    with open(unit_config_file, encoding="utf-8-sig") as f:
+        units_data = json.loads(f.read())
+
+    CELSIUS = None
+    MPA = None
+    TABLE_UNITS = []
+    if "table_units" in units_data.keys() :
+        for unit_data in units_data["table_units"]:
+            unit = assemble_unit(unit_data)
+            TABLE_UNITS.append(unit)
+            if unit.symbol == "°C":
+                CELSIUS = unit
+            elif unit.symbol == "MPa":
+                MPA = unit
+    else:
+        raise RuntimeError("Table units must be provided in unit_config.json!")
+    if CELSIUS is None or MPA is None:
+        raise RuntimeError("Table unit config must include Celsius and MPa!")
+
+    ALL_UNITS = list(TABLE_UNITS)
+    if "other_units" in units_data.keys():
+        for unit_data in units_data["other_units"]:
+            unit = assemble_unit(unit_data)
+            ALL_UNITS.append(unit)
+
+    _units = {
+        "CELSIUS": CELSIUS,
+        "MPA": MPA,
+        "TABLE_UNITS": TABLE_UNITS,
+        "ALL_UNITS": ALL_UNITS,
+        # symbol and type lookups, instead of scanning the lists above
+        "UNITS": Units.Registry(ALL_UNITS),
+        "TABLE_UNIT_BY_TYPE": {x.type: x for x in TABLE_UNITS},
+    }
+    # plain module attributes from now on
+    globals().update(_units)
+    return _units
+
+def table_unit(prop: Property) -> Units.Unit:
+    """
+    Returns the unit ``prop`` is stored in, or None for the phase.
+    """
+    return load_units()["TABLE_UNIT_BY_TYPE"].get(prop.unit_type)
+        
+#CELSIUS = Units.Unit("°C", 1, Units.Type.TEMPERATURE, 273.15)
+#MPA = Units.Unit("MPa", 1e6, Units.Type.PRESSURE)
+#M3_PER_KG = Units.Unit("m^3/kg", 1, Units.Type.SPECIFIC_VOLUME)
+#KG_PER_M3 = Units.Unit("kg/m^3", 1, Units.Type.DENSITY)
+#KJ_PER_KG = Units.Unit("kJ/kg", 1000, Units.Type.SPECIFIC_ENERGY)
+#KJ_PER_KG_K = Units.Unit("kJ/(kg*K)", 1000, Units.Type.SPECIFIC_ENTROPY)
+#ALL_UNITS = [
+#    Units.Unit("K", 1, Units.Type.TEMPERATURE),
+#    CELSIUS,
+#    Units.Unit("°F", 5/9, Units.Type.TEMPERATURE, -32, 273.15),
+#    Units.Unit("°R", 5/9, Units.Type.TEMPERATURE),
+#    MPA,
+#    Units.Unit("kPa", 1e3, Units.Type.PRESSURE),
+#    Units.Unit("Pa", 1, Units.Type.PRESSURE),
+#    Units.Unit("bar", 1e5, Units.Type.PRESSURE),
+#    Units.Unit("atm", 101325, Units.Type.PRESSURE),
+#    M3_PER_KG,
+#    KG_PER_M3,
+#    KJ_PER_KG,
+#    KJ_PER_KG_K
+#]
+#TABLE_UNITS = [
+#    CELSIUS,
+#    MPA,
+#    M3_PER_KG,
+#    KG_PER_M3,
+#    KJ_PER_KG,
+#    KJ_PER_KG_K
+#]
@@ -0,0 +1,222 @@
+import functools
+import importlib
+import json
+import os
+import sys
+import time
+from bisect import bisect_left
+
+# Optional instrumentation of the lookup path.
+#
+#   import steam_profile
+#   steam_profile.enable()
+#   ...lookups...
+#   steam_profile.stats()            # or steam_profile.dump("profile.json")
+#
+# enable() swaps each instrumented function for a timing wrapper everywhere it
+# is bound, including modules that imported it by name, and disable() puts the
+# originals back, so there is no cost at all while disabled. Stages nest: a
+# find_value_T_P call includes its grid_bracket call, and a GUI handler
+# includes the lookups and conversions it makes. Conversions are timed both
+# as Units.convert and, since the batch paths convert whole arrays through a
+# cached Converter, as each Converter call; a convert call includes one. The
+# GUI records a profile when started with STEAM_PROFILE=<file.json> in the
+# environment.
+
+# upper bounds of the latency histogram buckets, in seconds; slower calls go
+# in a last open-ended bucket
+BUCKETS = tuple(m * 10.0 ** e for e in range(-6, 1) for m in (1, 2, 5))
+
+def out_of_range(result) -> bool:
+    # lookups return a tuple of Nones, or None, when a state isn't in the table
+    return result is None or (isinstance(result, tuple) and result[-1] is None)
+
+def first_file(args: tuple, kwargs: dict) -> str:
+    path = args[0] if args else next(iter(kwargs.values()), "")
+    return os.path.basename(str(path))
+
+# name: (module, attribute, counts None results, labels calls by input file)
+STAGES = {
+    "read_csv": ("steam_engine", "read_csv", False, True),
+    "table_cache.load": ("table_cache", "load", False, True),
+    "index_bracket": ("steam_engine", "index_bracket", False, False),
+    "grid_bracket": ("steam_engine", "grid_bracket", False, False),
+    "search_interpolate": ("steam_engine", "search_interpolate", True, False),
+    "find_value_T_P": ("steam_engine", "find_value_T_P", True, False),
+    "Units.convert": ("Units", "convert", False, False),
+    # conversions through a cached Converter, as the batch paths make
+    "Units.Converter": ("Units", "Converter.__call__", False, False),
+}
+
+class Stage():
+    def __init__(self, name: str, count_none: bool = False, by_file: bool = False):
+        """
+        Creates the counters for one instrumented function
+
+        :param name: Stage name in the stats
+        :type name: str
+        :param count_none: Count out-of-range (None) results
+        :type count_none: bool
+        :param by_file: Also total calls by the file passed as the first argument,
+            for table loads
+        :type by_file: bool
+        """
+        self.name = name
+        self.count_none = count_none
+        self.by_file = by_file
+        self.reset()
+
+    def reset(self) -> None:
+        self.calls = 0
+        self.errors = 0
+        self.none = 0
+        self.total_seconds = 0.0
+        self.min_seconds = None
+        self.max_seconds = 0.0
+        self.histogram = [0] * (len(BUCKETS) + 1)
+        self.files = {}
+
+    def record(self, seconds: float, result=None, args: tuple = (), kwargs: dict = None, error: bool = False) -> None:
+        self.calls += 1
+        self.total_seconds += seconds
+        if self.min_seconds is None or seconds < self.min_seconds:
+            self.min_seconds = seconds
+        if seconds > self.max_seconds:
+            self.max_seconds = seconds
+        self.histogram[bisect_left(BUCKETS, seconds)] += 1
+        if error:
+            self.errors += 1
+        elif self.count_none and out_of_range(result):
+            self.none += 1
+        if self.by_file:
+            entry = self.files.setdefault(first_file(args, kwargs or {}), {"calls": 0, "total_seconds": 0.0})
+            entry["calls"] += 1
+            entry["total_seconds"] += seconds
+
+    def snapshot(self) -> dict:
+        labels = [f"<={x:g}s" for x in BUCKETS] + [f">{BUCKETS[-1]:g}s"]
+        stats = {
+            "calls": self.calls,
+            "errors": self.errors,
+            "total_seconds": self.total_seconds,
+            "mean_seconds": self.total_seconds / self.calls if self.calls else None,
+            "min_seconds": self.min_seconds,
+            "max_seconds": self.max_seconds,
+            "histogram": {label: n for (label, n) in zip(labels, self.histogram) if n},
+        }
+        if self.count_none:
+            stats["out_of_range"] = self.none
+            stats["out_of_range_rate"] = self.none / self.calls if self.calls else None
+        if self.by_file:
+            stats["files"] = {name: dict(x) for (name, x) in self.files.items()}
+        return stats
+
+_stages = {}
+# (namespace or class, attribute, original) for every binding enable() replaced
+_patched = []
+
+def wrap(stage: Stage, func):
+    clock = time.perf_counter
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = clock()
+        try:
+            result = func(*args, **kwargs)
+        except BaseException:
+            stage.record(clock() - start, None, args, kwargs, True)
+            raise
+        stage.record(clock() - start, result, args, kwargs)
+        return result
+    wrapper.__wrapped_stage__ = stage
+    return wrapper
+
+def rebind(original, replacement) -> None:
+    # every loaded module that holds ``original``, under any name
+    for module in list(sys.modules.values()):
+        namespace = getattr(module, "__dict__", None)
+        if namespace is None:
+            continue
+        for (attr, value) in list(namespace.items()):
+            if value is original:
+                namespace[attr] = replacement
+                _patched.append((namespace, attr, original))
+
+def instrument(module, name: str, stage_name: str = None, count_none: bool = False, by_file: bool = False) -> None:
+    """
+    Starts timing ``module.name`` as a stage.
+
+    Used by ``enable`` for the engine's stages, and by callers with their
+    own hot spots, such as the GUI handlers. Has no effect if the function is
+    already instrumented.
+
+    :param module: Module defining the function
+    :param name: Function name, or ``Class.method`` for a method, which is
+        replaced on the class
+    :type name: str
+    :param stage_name: Name in the stats, defaults to ``name``
+    :type stage_name: str
+    :param count_none: Count out-of-range (None) results
+    :type count_none: bool
+    :param by_file: Also total calls by their first argument's file name
+    :type by_file: bool
+    """
+    owner = module
+    (*path, attr) = name.split(".")
+    for x in path:
+        owner = getattr(owner, x)
+    original = getattr(owner, attr)
+    if hasattr(original, "__wrapped_stage__"):
+        return
+    stage_name = stage_name or name
+    if stage_name not in _stages:
+        _stages[stage_name] = Stage(stage_name, count_none, by_file)
+    replacement = wrap(_stages[stage_name], original)
+    if path:
+        setattr(owner, attr, replacement)
+        _patched.append((owner, attr, original))
+    else:
+        rebind(original, replacement)
+
+def enable() -> None:
+    """
+    Starts recording every stage in ``STAGES``. Counts carry on from any earlier run until ``reset``.
+    """
+    for (stage_name, (module_name, name, count_none, by_file)) in STAGES.items():
+        instrument(importlib.import_module(module_name), name, stage_name, count_none, by_file)
+
+def disable() -> None:
+    """
+    Puts back every original function. The counts are kept.
+    """
+    while _patched:
+        (namespace, attr, original) = _patched.pop()
+        if isinstance(namespace, type):
+            if getattr(namespace.__dict__.get(attr), "__wrapped__", None) is original:
+                setattr(namespace, attr, original)
+        elif getattr(namespace.get(attr), "__wrapped__", None) is original:
+            namespace[attr] = original
+
+def enabled() -> bool:
+    return bool(_patched)
+
+def reset() -> None:
+    for stage in _stages.values():
+        stage.reset()
+
+def stats() -> dict:
+    """
+    Returns the counts so far.
+
+    :return: ``{"enabled": bool, "stages": {stage name: counts}}``
+    :rtype: dict
+    """
+    return {"enabled": enabled(), "stages": {name: x.snapshot() for (name, x) in _stages.items()}}
+
+def dump(path: str) -> None:
+    """
+    Writes ``stats()`` to ``path`` as JSON.
+    """
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(stats(), f, indent=2)
+        f.write("\n")
@@ -0,0 +1,272 @@
+import argparse
+import asyncio
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from shared_tables import SharedTables, attach
+import steam_engine
+from steam_engine import Property, SearchMode, PHASES, UNITS
+from steam_cli import evaluate, parse_properties, result_converters
+try:
+    import numpy as np
+    import steam_batch
+except ImportError:
+    # without NumPy, batches are looked up a row at a time
+    np = steam_batch = None
+
+# Local HTTP/JSON front-end for the lookup engine, on asyncio with no
+# dependencies outside the standard library (NumPy, if installed, speeds up
+# batches).
+#
+#   POST /lookup   one state, in the same shape as a steam_cli.py JSON Lines
+#                  row, plus optional "units": {property: symbol} and
+#                  "dome": true (as steam_cli.py --dome)
+#                  -> {"results": {property: value}}
+#   POST /batch    "mode", "properties", "units" and "dome" as above, with "T" and/or
+#                  "P" as lists (a single number is repeated)
+#                  -> {"results": {property: [value, ...]}}
+#   GET  /health   liveness, loaded tables and per-endpoint metrics
+#
+# Out-of-range values come back as null. "properties" is required. Batches
+# are looked up with steam_batch, a whole array at a time, and those bigger
+# than INLINE_BATCH_SIZE (about a millisecond's work) go to a process pool so
+# the event loop keeps serving single lookups while they run. Without NumPy
+# every batch of more than one row goes to the pool.
+
+ENDPOINTS = ("/lookup", "/batch", "/health")
+INLINE_BATCH_SIZE = 256
+MAX_BODY = 64 * 1024 * 1024
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+               413: "Payload Too Large", 500: "Internal Server Error"}
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+def load_tables() -> None:
+    for name in steam_engine.TABLE_FILES:
+        steam_engine.get_table(name)
+
+def request_props(request: dict) -> list:
+    props = parse_properties(request.get("properties") or [])
+    if not props:
+        raise ValueError("properties must name at least one Property.")
+    return props
+
+def lookup_one(request: dict) -> dict:
+    units = result_converters(request.get("units") or {})
+    return {"results": evaluate(request, request_props(request), units, bool(request.get("dome")))}
+
+def lookup_batch(request: dict) -> dict:
+    """
+    Looks up every state in a batch request.
+
+    :param request: Batch request body
+    :type request: dict
+    :return: ``{"results": {property: [value, ...]}}``
+    :rtype: dict
+    """
+    units = result_converters(request.get("units") or {})
+    props = request_props(request)
+    mode = SearchMode[str(request.get("mode")).strip()]
+    columns = {x: request.get(x) for x in ("T", "P") if request.get(x) is not None}
+    for name in ("T", "P"):
+        if name not in columns and mode != (SearchMode.SAT_BY_P if name == "T" else SearchMode.SAT_BY_T):
+            raise ValueError(f"{name} is required for mode {mode.name}.")
+    lengths = {len(x) for x in columns.values() if isinstance(x, list)}
+    if len(lengths) > 1:
+        raise ValueError("T and P must be the same length.")
+    size = lengths.pop() if lengths else 1
+    if steam_batch is None:
+        return {"results": lookup_rows(request, mode, columns, size, props, units)}
+    inputs = {x: np.broadcast_to(np.asarray(y, dtype=float), (size,)) for (x, y) in columns.items()}
+    states = batch_states(mode, inputs, request, props, bool(request.get("dome")))
+    results = {}
+    for prop in props:
+        values = states.get(prop)
+        if values is None:
+            results[prop.name] = [None] * size
+        elif prop == Property.PHASE:
+            results[prop.name] = [PHASES[x].value if x >= 0 else None for x in values.tolist()]
+        else:
+            if prop in units:
+                values = units[prop](values)
+            # NaN is outside the table, or a blank table cell
+            results[prop.name] = [x if x == x else None for x in values.tolist()]
+    return {"results": results}
+
+def batch_states(mode: SearchMode, inputs: dict, request: dict, props: list, dome: bool) -> dict:
+    # every property the mode's table has, looked up for the whole batch at once
+    units = {x: UNITS[request[f"{x}_unit"]] if request.get(f"{x}_unit") else None for x in ("T", "P")}
+    match mode:
+        case SearchMode.SAT_BY_T:
+            table = steam_engine.sat_by_T
+            wanted = [x for x in props if x in table.properties()]
+            return steam_batch.sat_state(Property.TEMP, inputs["T"], units["T"], wanted, table)
+        case SearchMode.SAT_BY_P:
+            table = steam_engine.sat_by_P
+            wanted = [x for x in props if x in table.properties()]
+            return steam_batch.sat_state(Property.PRESSURE, inputs["P"], units["P"], wanted, table)
+        case SearchMode.T_AND_P:
+            table = steam_engine.comp_sup
+            wanted = [x for x in props if x in table.properties()]
+            return steam_batch.T_P_state(inputs["T"], inputs["P"], units["T"], units["P"], wanted, table,
+                                         steam_engine.saturation_dome() if dome else None)
+
+def lookup_rows(request: dict, mode: SearchMode, columns: dict, size: int, props: list, units: dict) -> dict:
+    # a batch as one scalar lookup per row
+    row = {"mode": mode.name, "T_unit": request.get("T_unit"), "P_unit": request.get("P_unit")}
+    results = {x.name: [] for x in props}
+    for i in range(size):
+        for (name, values) in columns.items():
+            row[name] = values[i] if isinstance(values, list) else values
+        for (name, value) in evaluate(row, props, units, bool(request.get("dome"))).items():
+            results[name].append(value)
+    return results
+
+class Metrics():
+    def __init__(self):
+        self.started = time.time()
+        self.endpoints = {}
+
+    def record(self, endpoint: str, seconds: float, status: int) -> None:
+        entry = self.endpoints.setdefault(endpoint, {"requests": 0, "errors": 0, "total_seconds": 0.0, "max_seconds": 0.0})
+        entry["requests"] += 1
+        if status != 200:
+            entry["errors"] += 1
+        entry["total_seconds"] += seconds
+        entry["max_seconds"] = max(entry["max_seconds"], seconds)
+
+    def snapshot(self) -> dict:
+        endpoints = {}
+        for (name, x) in self.endpoints.items():
+            endpoints[name] = dict(x, mean_seconds=x["total_seconds"] / x["requests"])
+        return {
+            "status": "ok",
+            "uptime_seconds": time.time() - self.started,
+            "tables": sorted(steam_engine._tables.keys()),
+            "endpoints": endpoints,
+        }
+
+class SteamServer():
+    def __init__(self, workers: int = None):
+        """
+        Creates the lookup service
+
+        :param workers: Processes for large batches, defaults to one per core
+        :type workers: int
+        """
+        load_tables()
+        # batch workers attach to one shared copy of the tables
+        self.shared = SharedTables()
+        self.pool = ProcessPoolExecutor(workers, initializer=attach, initargs=(self.shared.handle,))
+        self.metrics = Metrics()
+
+    def close(self) -> None:
+        self.pool.shutdown()
+        self.shared.close()
+
+    async def handle(self, method: str, path: str, body: bytes) -> dict:
+        if path == "/health":
+            if method != "GET":
+                raise HTTPError(405, "Use GET.")
+            return self.metrics.snapshot()
+        if path not in ENDPOINTS:
+            raise HTTPError(404, f"No such endpoint {path}.")
+        if method != "POST":
+            raise HTTPError(405, "Use POST.")
+        try:
+            request = json.loads(body)
+        except ValueError:
+            raise HTTPError(400, "Body must be JSON.")
+        if not isinstance(request, dict):
+            raise HTTPError(400, "Body must be a JSON object.")
+        try:
+            if path == "/lookup":
+                return lookup_one(request)
+            size = max([len(request[x]) for x in ("T", "P") if isinstance(request.get(x), list)], default=1)
+            if size <= (INLINE_BATCH_SIZE if steam_batch is not None else 1):
+                return lookup_batch(request)
+            return await asyncio.get_running_loop().run_in_executor(self.pool, lookup_batch, request)
+        except (KeyError, ValueError, TypeError, AttributeError) as e:
+            raise HTTPError(400, f"{type(e).__name__}: {e}")
+
+    async def serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    return
+                lines = head.decode("latin-1").split("\r\n")
+                try:
+                    (method, target, version) = lines[0].split(" ", 2)
+                except ValueError:
+                    return
+                headers = {}
+                for line in lines[1:]:
+                    if ":" in line:
+                        (key, value) = line.split(":", 1)
+                        headers[key.strip().lower()] = value.strip()
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection == "keep-alive" or (version == "HTTP/1.1" and connection != "close")
+                path = target.split("?", 1)[0]
+
+                start = time.perf_counter()
+                try:
+                    try:
+                        length = int(headers.get("content-length", 0))
+                        if length < 0:
+                            raise ValueError(length)
+                    except ValueError:
+                        keep_alive = False
+                        raise HTTPError(400, "Bad Content-Length.")
+                    if length > MAX_BODY:
+                        keep_alive = False
+                        raise HTTPError(413, "Request body too large.")
+                    body = await reader.readexactly(length) if length else b""
+                    status = 200
+                    response = await self.handle(method, path, body)
+                except HTTPError as e:
+                    (status, response) = (e.status, {"error": str(e)})
+                except asyncio.IncompleteReadError:
+                    return
+                except Exception as e:
+                    (status, response) = (500, {"error": f"{type(e).__name__}: {e}"})
+                self.metrics.record(path if path in ENDPOINTS else "other", time.perf_counter() - start, status)
+
+                payload = json.dumps(response).encode("utf-8")
+                writer.write(
+                    f"HTTP/1.1 {status} {STATUS_TEXT[status]}\r\n"
+                    f"Content-Type: application/json\r\n"
+                    f"Content-Length: {len(payload)}\r\n"
+                    f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + payload
+                )
+                await writer.drain()
+                if not keep_alive:
+                    return
+        finally:
+            writer.close()
+
+    async def serve(self, host: str, port: int) -> None:
+        server = await asyncio.start_server(self.serve_connection, host, port)
+        async with server:
+            await server.serve_forever()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Serve steam table lookups over HTTP/JSON.")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on (default 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8750, help="port to listen on (default 8750)")
+    parser.add_argument("-j", "--workers", type=int, default=None, help="batch worker processes (default: one per core)")
+    args = parser.parse_args(argv)
+    server = SteamServer(args.workers)
+    try:
+        asyncio.run(server.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.close()
+
+if __name__ == "__main__":
+    main()
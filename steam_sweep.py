@@ -0,0 +1,244 @@
+import argparse
+import csv
+import sys
+from itertools import islice
+import Units
+import steam_engine
+from steam_engine import SearchMode, CELSIUS, MPA
+from steam_cli import lookup, ordered_results, parse_properties, result_converters
+
+# Tabulates properties over ranges of states, e.g. enthalpy against
+# temperature along several isobars, or the saturation curve in fine steps.
+#
+#   python steam_sweep.py T_AND_P --T 100:600:5 --P 0.1,1,10 \
+#       --properties ENTHALPY;ENTROPY -o h_s.csv -j 4
+#
+# Ranges are start:stop:step (stop included when the steps land on it) or a
+# ","-separated list. SAT_BY_T sweeps T, SAT_BY_P sweeps P and T_AND_P sweeps
+# every T along each P in turn. Points are evaluated in chunks, across worker
+# processes with --workers, and written out as they come back, so memory
+# stays flat however big the sweep is.
+
+def value_range(start: float, stop: float, step: float) -> list:
+    """
+    Evenly spaced values from ``start`` to ``stop``.
+
+    :param start: First value
+    :type start: float
+    :param stop: Last value, included if the steps land on it
+    :type stop: float
+    :param step: Spacing, negative to count down
+    :type step: float
+    :return: The values
+    :rtype: list[float]
+    """
+    if step == 0 or (stop - start) * step < 0:
+        raise ValueError("Sweep step must move from start towards stop!")
+    # multiplying rather than accumulating keeps rounding from drifting, the
+    # slack keeps a stop that is a whole number of steps away, and rounding to
+    # 12 digits gives 1.0 rather than 0.9999999999999999
+    count = int((stop - start) / step * (1 + 1e-12) + 1e-9) + 1
+    return [float(f"{start + i * step:.12g}") for i in range(count)]
+
+def parse_values(raw: str) -> list:
+    """
+    Reads a sweep axis: ``start:stop:step`` or a ``,``-separated list.
+    """
+    if ":" in raw:
+        parts = raw.split(":")
+        if len(parts) != 3:
+            raise ValueError(f"Expected start:stop:step, got {raw!r}.")
+        return value_range(*(float(x) for x in parts))
+    return [float(x) for x in raw.split(",") if x.strip()]
+
+def sweep_inputs(mode: SearchMode) -> tuple:
+    # the input columns a mode sweeps over
+    match mode:
+        case SearchMode.SAT_BY_T:
+            return ("T",)
+        case SearchMode.SAT_BY_P:
+            return ("P",)
+        case SearchMode.T_AND_P:
+            return ("T", "P")
+
+def check_inputs(mode: SearchMode, temps: list, pressures: list) -> None:
+    for name in sweep_inputs(mode):
+        if not (temps if name == "T" else pressures):
+            raise ValueError(f"{name} values are required for mode {mode.name}.")
+
+def sweep_points(mode: SearchMode, temps: list = None, pressures: list = None):
+    """
+    Yields the ``(T, P)`` points of a sweep, with None for an input the mode doesn't use.
+
+    ``T_AND_P`` sweeps every temperature along each pressure in turn.
+    """
+    match mode:
+        case SearchMode.SAT_BY_T:
+            for T in temps:
+                yield (T, None)
+        case SearchMode.SAT_BY_P:
+            for P in pressures:
+                yield (None, P)
+        case SearchMode.T_AND_P:
+            for P in pressures:
+                for T in temps:
+                    yield (T, P)
+
+def sweep_size(mode: SearchMode, temps: list = None, pressures: list = None) -> int:
+    size = 1
+    for name in sweep_inputs(mode):
+        size *= len(temps if name == "T" else pressures)
+    return size
+
+def sweep_chunk(args: tuple) -> list:
+    """
+    Looks up a chunk of sweep points.
+
+    :return: ``(T, P, {property name: value})`` for each point, in order
+    :rtype: list[tuple]
+    """
+    (points, config) = args
+    (mode, props, result_units, dome, T_unit, P_unit) = config
+    to_celsius = Units.converter(steam_engine.UNITS[T_unit], CELSIUS)
+    to_mpa = Units.converter(steam_engine.UNITS[P_unit], MPA)
+    results = []
+    for (T, P) in points:
+        values = lookup(
+            mode,
+            to_celsius(T) if T is not None else None,
+            to_mpa(P) if P is not None else None,
+            props, result_units, dome,
+        )
+        results.append((T, P, values))
+    return results
+
+def sweep_chunks(
+        mode: SearchMode,
+        props: list,
+        temps: list = None,
+        pressures: list = None,
+        T_unit: str = None,
+        P_unit: str = None,
+        result_units: dict = None,
+        dome: bool = False,
+        workers: int = 1,
+        chunk_size: int = 2000,
+        start_method: str = None,
+        ):
+    """
+    Evaluates a sweep, yielding results a chunk at a time in sweep order.
+
+    :param mode: Which table to sweep
+    :type mode: SearchMode
+    :param props: Properties to look up at each point
+    :type props: list[Property]
+    :param temps: Temperatures, for ``SAT_BY_T`` and ``T_AND_P``
+    :type temps: list[float]
+    :param pressures: Pressures, for ``SAT_BY_P`` and ``T_AND_P``
+    :type pressures: list[float]
+    :param T_unit: Symbol of the temperatures' unit, default °C
+    :type T_unit: str
+    :param P_unit: Symbol of the pressures' unit, default MPa
+    :type P_unit: str
+    :param result_units: Converter to the output unit for each property, as
+        from ``steam_cli.result_converters``; others stay in table units
+    :type result_units: dict[Property, Units.Converter]
+    :param dome: Classify ``T_AND_P`` phases against the saturation dome
+    :type dome: bool
+    :param workers: Processes to evaluate chunks in
+    :type workers: int
+    :param chunk_size: Points per chunk
+    :type chunk_size: int
+    :param start_method: ``multiprocessing`` start method for the workers;
+        callers running other threads, such as a GUI, should use "spawn"
+    :type start_method: str
+    :return: Lists of ``(T, P, {property name: value})``, None where a value
+        is outside the table
+    :rtype: Iterator[list[tuple]]
+    """
+    check_inputs(mode, temps, pressures)
+    points = sweep_points(mode, temps, pressures)
+    chunks = iter(lambda: list(islice(points, chunk_size)), [])
+    config = (mode, list(props), result_units or {}, dome, T_unit or CELSIUS.symbol, P_unit or MPA.symbol)
+    return ordered_results(chunks, config, workers, sweep_chunk, start_method)
+
+def sweep(*args, **kwargs):
+    """
+    As ``sweep_chunks``, but yields ``(T, P, {property name: value})`` one point at a time.
+    """
+    for chunk in sweep_chunks(*args, **kwargs):
+        yield from chunk
+
+def write_csv(out, mode: SearchMode, props: list, chunks) -> int:
+    """
+    Writes sweep results as they arrive.
+
+    :param out: Text file to write to
+    :param mode: Mode the sweep was run in, for the input columns
+    :type mode: SearchMode
+    :param props: Properties looked up
+    :type props: list[Property]
+    :param chunks: Output of ``sweep_chunks``
+    :return: Number of rows written
+    :rtype: int
+    """
+    inputs = sweep_inputs(mode)
+    writer = csv.writer(out)
+    writer.writerow(list(inputs) + [x.name for x in props])
+    count = 0
+    for chunk in chunks:
+        for (T, P, values) in chunk:
+            row = [T if name == "T" else P for name in inputs]
+            row += ["" if values[x.name] is None else values[x.name] for x in props]
+            writer.writerow(row)
+        count += len(chunk)
+    return count
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tabulate steam properties over ranges of states.")
+    parser.add_argument("mode", choices=[x.name for x in SearchMode], help="table to sweep")
+    parser.add_argument("--T", help="temperatures: start:stop:step or a ','-separated list")
+    parser.add_argument("--P", help="pressures: start:stop:step or a ','-separated list")
+    parser.add_argument("--T-unit", default=CELSIUS.symbol, help=f"unit of --T (default {CELSIUS.symbol})")
+    parser.add_argument("--P-unit", default=MPA.symbol, help=f"unit of --P (default {MPA.symbol})")
+    parser.add_argument("--properties", required=True, help="';'-separated Property names to look up")
+    parser.add_argument("--unit", action="append", default=[], metavar="PROPERTY=SYMBOL",
+                        help="output unit for a property (repeatable), default is the table unit")
+    parser.add_argument("--dome", action="store_true",
+                        help="classify T_AND_P phases against the saturation dome and reject states interpolated across it")
+    parser.add_argument("-o", "--output", default="-", help="output CSV, - for stdout (default)")
+    parser.add_argument("--chunk-size", type=int, default=2000, help="points per chunk (default 2000)")
+    parser.add_argument("-j", "--workers", type=int, default=1, help="worker processes (default 1)")
+    args = parser.parse_args(argv)
+
+    mode = SearchMode[args.mode]
+    try:
+        props = parse_properties(args.properties)
+        temps = parse_values(args.T) if args.T else None
+        pressures = parse_values(args.P) if args.P else None
+        steam_engine.UNITS[args.T_unit]
+        steam_engine.UNITS[args.P_unit]
+    except (KeyError, ValueError) as e:
+        parser.error(str(e))
+    result_units = {}
+    for x in args.unit:
+        try:
+            (prop, symbol) = x.split("=", 1)
+            result_units.update(result_converters({prop: symbol}))
+        except (KeyError, ValueError, AttributeError):
+            parser.error(f"bad --unit {x!r}")
+
+    fout = sys.stdout if args.output == "-" else open(args.output, "w", newline="", encoding="utf-8")
+    try:
+        try:
+            chunks = sweep_chunks(mode, props, temps, pressures, args.T_unit, args.P_unit, result_units,
+                                  args.dome, args.workers, args.chunk_size)
+        except ValueError as e:
+            parser.error(str(e))
+        write_csv(fout, mode, props, chunks)
+    finally:
+        if fout is not sys.stdout:
+            fout.close()
+
+if __name__ == "__main__":
+    main()
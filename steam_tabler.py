@@ -1,244 +1,15 @@
-from csv import DictReader
 import os
-from enum import Enum
-from math import inf
+import sys
 import tkinter as tk
 from tkinter import ttk
 import Units
-import json
+import steam_engine
+from steam_engine import Property, PropType, SearchMode, search_interpolate, find_value_T_P
+from steam_engine import CELSIUS, MPA, UNITS
+from sweep_panel import SweepPanel
 
-# this doesn't work if the working directory has been changed
-# so it's at the beginning just in case
-dir_path = os.path.dirname(os.path.realpath(__file__))
-
-sat_by_P_file = os.path.join(dir_path, "saturated_by_pressure_V1.4.csv")
-sat_by_T_file = os.path.join(dir_path, "saturated_by_temperature_V1.5.csv")
-comp_sup_file = os.path.join(dir_path, "compressed_liquid_and_superheated_steam_V1.3.csv")
-unit_config_file = os.path.join(dir_path, "unit_config.json")
-
-class PropType(Enum):
-    SAT = "sat"
-    P_T = "p_t"
-    SEARCH = "search"
-class Property(Enum):
-    TEMP = 'T (°C)', Units.Type.TEMPERATURE, "Temperature", PropType.SEARCH
-    PRESSURE = 'P (MPa)', Units.Type.PRESSURE, "Pressure", PropType.SEARCH
-
-    VOLUME_LIQUID = 'Specific Volume Liquid (m^3/kg)', Units.Type.SPECIFIC_VOLUME, "Specific Volume (liquid)", PropType.SAT
-    VOLUME_VAPOR = 'Specific Volume Vapor (m^3/kg)', Units.Type.SPECIFIC_VOLUME, "Specific Volume (vapor)", PropType.SAT
-    VOLUME = 'Specific Volume (m^3/kg)', Units.Type.SPECIFIC_VOLUME, "Specific Volume", PropType.P_T
-    DENSITY = 'Density (kg/m^3)', Units.Type.DENSITY, "Density", PropType.P_T
-
-    ENERGY_LIQUID = 'Internal Energy Liquid (kJ/kg)', Units.Type.SPECIFIC_ENERGY, "Internal Energy (liquid)", PropType.SAT
-    ENERGY_VAPOR = 'Internal Energy Vapor (kJ/kg)', Units.Type.SPECIFIC_ENERGY, "Internal Energy (vapor)", PropType.SAT
-    ENERGY_VAPORIZATION = 'Internal Energy of Vaporization (kJ/kg)', Units.Type.SPECIFIC_ENERGY, "Internal Energy of Vaporization", PropType.SAT
-    ENERGY = 'Specific Internal Energy (kJ/kg)', Units.Type.SPECIFIC_ENERGY, "Internal Energy", PropType.P_T
-
-    ENTHALPY_LIQUID = 'Enthalpy Liquid (kJ/kg)', Units.Type.SPECIFIC_ENERGY, "Enthalpy (liquid)", PropType.SAT
-    ENTHALPY_VAPOR = 'Enthalpy Vapor (kJ/kg)', Units.Type.SPECIFIC_ENERGY, "Enthalpy (vapor)", PropType.SAT
-    ENTHALPY_VAPORIZATION = 'Enthalpy of Vaporization (kJ/kg)', Units.Type.SPECIFIC_ENERGY, "Enthalpy of Vaporization", PropType.SAT
-    ENTHALPY = 'Specific Enthalpy (kJ/kg)', Units.Type.SPECIFIC_ENERGY, "Enthalpy", PropType.P_T
-
-    ENTROPY_LIQUID = 'Entropy Liquid [kJ/(kg K)]', Units.Type.SPECIFIC_ENTROPY, "Entropy (liquid)", PropType.SAT
-    ENTROPY_VAPOR = 'Entropy Vapor [kJ/(kg K)]', Units.Type.SPECIFIC_ENTROPY, "Entropy (vapor)", PropType.SAT
-    ENTROPY_VAPORIZATION = 'Entropy of Vaporization [kJ/(kg K)]', Units.Type.SPECIFIC_ENTROPY, "Entropy of Vaporization", PropType.SAT
-    ENTROPY = 'Specific Entropy [kJ/(kg K)]', Units.Type.SPECIFIC_ENTROPY, "Entropy", PropType.P_T
-
-    PHASE = 'Phase', None, "Phase", PropType.P_T
-
-    def __new__(cls, table_name, unit_type, disp_name, type):
-        obj = object.__new__(cls)
-        obj._value_ = table_name
-        obj.unit_type = unit_type
-        obj.disp_name = disp_name
-        obj.type = type
-        return obj
-class Phase(Enum):
-    VAPOR = 'vapor'
-    SATURATED_VAPOR = 'saturated vapor'
-    LIQUID = 'liquid'
-    SATURATED_LIQUID = 'saturated liquid'
-    SUPERCRITICAL_FLUID = 'supercritical fluid'
-class SearchMode(Enum):
-    SAT_BY_T = 0
-    SAT_BY_P = 1
-    T_AND_P = 2
-
-def read_csv(filepath):
-    title_block_num_lines = 6
-    # load CSV data into lists of dictionaries
-    with open(filepath, "r", encoding="utf-8-sig") as f:
-        # throw away non-data lines
-        for i in range(title_block_num_lines):
-            next(f)
-        dict_list = list(DictReader(f))
-        for x in dict_list:
-            for key in x.keys():
-                try:
-                    x[key] = float(x[key])
-                except ValueError:
-                    continue
-        return dict_list
-    
-def lin_interpolate(x, x_min, x_max, y_min, y_max):
-    if x_min == x_max:
-        raise ArithmeticError("Divide by Zero when interpolating!")
-    return y_min + ((x - x_min) * (y_max - y_min)) / (x_max - x_min)
-
-def search_interpolate(search_by: Property, search_by_value: float, search_for: Property, table: list[dict]):
-    low_x = -inf
-    high_x = inf
-    low_result = None
-    high_result = None
-    for x in table:
-        current_x = x[search_by.value]
-        if current_x == search_by_value:
-            return current_x, current_x, x[search_for.value]
-        elif current_x > low_x and current_x < search_by_value:
-            low_x = current_x
-            low_result = x[search_for.value]
-        elif current_x < high_x and current_x > search_by_value:
-            high_x = current_x
-            high_result = x[search_for.value]
-    if low_result == None or high_result == None:
-        return None, None, None
-    # special case to deal with phase string values
-    if search_for == Property.PHASE:
-        if low_result == high_result:
-            result = low_result
-        else:
-            result = f"{low_result} or {high_result}"
-    else:
-        result = lin_interpolate(search_by_value, low_x, high_x, low_result, high_result)
-    return low_x, high_x, result
-
-def find_value_T_P(T: float, P: float, search_for: Property, T_P_table: list[dict]):
-    # Check if both T and P match exactly
-    for x in T_P_table:
-        if x[Property.TEMP.value] == T and x[Property.PRESSURE.value] == P:
-            return T, T, P, P, x[search_for.value]
-        
-    # Check if T matches exactly but P doesn't
-    matches_T = [x for x in T_P_table if x[Property.TEMP.value] == T]
-    if matches_T:
-        result = search_interpolate(Property.PRESSURE, P, search_for, matches_T)
-        if result[2]:
-            return (T, T) + result
-        else:
-            return None, None, None, None, None
-    
-    # Check if P matches exactly but T doesn't
-    matches_P = [x for x in T_P_table if x[Property.PRESSURE.value] == P]
-    if matches_P:
-        result = search_interpolate(Property.TEMP, T, search_for, matches_P)
-        if result[2]:
-            return result[:2] + (P, P) + result[2:]
-        else:
-            return None, None, None, None, None
-    
-    # At this point we have a guarantee that neither temperature nor pressure exactly matches the table
-    # Get unique pressure and temperature values
-    unique_temps = sorted(list(set([x[Property.TEMP.value] for x in T_P_table])))
-    
-    last_temp = unique_temps[0]
-    low_temp = None
-    high_temp = None
-    for temp in unique_temps:
-        if temp > T and last_temp < T:
-            low_temp = last_temp
-            high_temp = temp
-        last_temp = temp
-    if not low_temp:
-        return None, None, None, None, None
-    
-    low_temp_entries = [x for x in T_P_table if x[Property.TEMP.value] == low_temp]
-    high_temp_entries = [x for x in T_P_table if x[Property.TEMP.value] == high_temp]
-    low_temp_result = search_interpolate(Property.PRESSURE, P, search_for, low_temp_entries)
-    high_temp_result = search_interpolate(Property.PRESSURE, P, search_for, high_temp_entries)
-    if low_temp_result[2] is None or high_temp_result[2] is None:
-        return None, None, None, None, None
-    # special case to deal with phase string values
-    if search_for == Property.PHASE:
-        if low_temp_result[2] == high_temp_result[2]:
-            result = low_temp_result[2]
-        else:
-            result = f"{low_temp_result[2]} or {high_temp_result[2]}"
-    else:
-        result = lin_interpolate(T, low_temp, high_temp, low_temp_result[2], high_temp_result[2])
-    return low_temp, high_temp, low_temp_result[0], low_temp_result[1], result
-    
-sat_by_T = read_csv(sat_by_T_file)
-sat_by_P = read_csv(sat_by_P_file)
-comp_sup = read_csv(comp_sup_file)
-
-def assemble_unit(unit_json: dict) -> Units.Unit:
-    if "native_shift" in unit_json.keys():
-        native_shift = unit_json["native_shift"]
-    else:
-        native_shift = 0
-    if "si_shift" in unit_json.keys():
-        si_shift = unit_json["si_shift"]
-    else:
-        si_shift = 0
-    unit_type = [x for x in Units.Type if x.value == unit_json["type"]][0]
-    return Units.Unit(unit_json["symbol"], unit_json["conversion"], unit_type, native_shift, si_shift)
-
-with open(unit_config_file, encoding="utf-8-sig") as f:
-    units_data = json.loads(f.read())
-
-CELSIUS = None
-MPA = None
-TABLE_UNITS = []
-if "table_units" in units_data.keys() :
-    for unit_data in units_data["table_units"]:
-        unit = assemble_unit(unit_data)
-        TABLE_UNITS.append(unit)
-        if unit.symbol == "°C":
-            CELSIUS = unit
-        elif unit.symbol == "MPa":
-            MPA = unit
-else:
-    raise RuntimeError("Table units must be provided in unit_config.json!")
-if CELSIUS is None or MPA is None:
-    raise RuntimeError("Table unit config must include Celsius and MPa!")
-
-ALL_UNITS = TABLE_UNITS
-if "other_units" in units_data.keys():
-    for unit_data in units_data["other_units"]:
-        unit = assemble_unit(unit_data)
-        ALL_UNITS.append(unit)
-        
-#CELSIUS = Units.Unit("°C", 1, Units.Type.TEMPERATURE, 273.15)
-#MPA = Units.Unit("MPa", 1e6, Units.Type.PRESSURE)
-#M3_PER_KG = Units.Unit("m^3/kg", 1, Units.Type.SPECIFIC_VOLUME)
-#KG_PER_M3 = Units.Unit("kg/m^3", 1, Units.Type.DENSITY)
-#KJ_PER_KG = Units.Unit("kJ/kg", 1000, Units.Type.SPECIFIC_ENERGY)
-#KJ_PER_KG_K = Units.Unit("kJ/(kg*K)", 1000, Units.Type.SPECIFIC_ENTROPY)
-#ALL_UNITS = [
-#    Units.Unit("K", 1, Units.Type.TEMPERATURE),
-#    CELSIUS,
-#    Units.Unit("°F", 5/9, Units.Type.TEMPERATURE, -32, 273.15),
-#    Units.Unit("°R", 5/9, Units.Type.TEMPERATURE),
-#    MPA,
-#    Units.Unit("kPa", 1e3, Units.Type.PRESSURE),
-#    Units.Unit("Pa", 1, Units.Type.PRESSURE),
-#    Units.Unit("bar", 1e5, Units.Type.PRESSURE),
-#    Units.Unit("atm", 101325, Units.Type.PRESSURE),
-#    M3_PER_KG,
-#    KG_PER_M3,
-#    KJ_PER_KG,
-#    KJ_PER_KG_K
-#]
-#TABLE_UNITS = [
-#    CELSIUS,
-#    MPA,
-#    M3_PER_KG,
-#    KG_PER_M3,
-#    KJ_PER_KG,
-#    KJ_PER_KG_K
-#]
-temp_unit_symbols = sorted([x.symbol for x in ALL_UNITS if x.type == Units.Type.TEMPERATURE], key=lambda x: x.strip("°"))
-pres_unit_symbols = sorted([x.symbol for x in ALL_UNITS if x.type == Units.Type.PRESSURE], key=lambda x: x.lower())
+temp_unit_symbols = sorted([x.symbol for x in UNITS.of_type(Units.Type.TEMPERATURE)], key=lambda x: x.strip("°"))
+pres_unit_symbols = sorted([x.symbol for x in UNITS.of_type(Units.Type.PRESSURE)], key=lambda x: x.lower())
 
 def search_mode_change():
     mode = search_mode.get()
@@ -277,7 +48,7 @@ def update_units(event):
         new_units = ["N/A"]
     else:
         new_type = [x.unit_type for x in Property if x.disp_name == current_result_type][0]
-        new_units = sorted([x.symbol for x in ALL_UNITS if x.type == new_type], key=lambda x: x.strip("°").lower())
+        new_units = sorted([x.symbol for x in UNITS.of_type(new_type)], key=lambda x: x.strip("°").lower())
     result_unit_sel["values"] = new_units
     if len(new_units) == 1:
         result_unit_sel.set(new_units[0])
@@ -305,20 +76,20 @@ def one_var_lookup(
     if not unit_raw:
         result_string.set(f"ERROR: Select a {search_prop.disp_name.lower()} unit.")
         return
-    inp_unit = [x for x in ALL_UNITS if x.symbol == unit_raw][0]
+    inp_unit = UNITS[unit_raw]
 
     result_type_raw = result_type.get()
     if not result_type_raw:
         result_string.set("ERROR: Select a property to look up.")
         return
     table_var = [x for x in Property if x.disp_name == result_type_raw][0]
-    table_unit = [x for x in TABLE_UNITS if x.type == table_var.unit_type][0]
+    table_unit = steam_engine.table_unit(table_var)
 
     result_unit_raw = result_unit_sel.get()
     if not result_unit_raw:
         result_string.set("ERROR: Select an output unit.")
         return
-    result_unit = [x for x in ALL_UNITS if x.symbol == result_unit_raw][0]
+    result_unit = UNITS[result_unit_raw]
 
     table_inp = Units.convert(entry_raw, inp_unit, table_base_unit)
     (x_low, x_high, output) = search_interpolate(
@@ -354,7 +125,7 @@ def run_search():
                 result_type,
                 result_unit_sel,
                 CELSIUS,
-                sat_by_T
+                steam_engine.sat_by_T
             )
         case SearchMode.SAT_BY_P.value:
             one_var_lookup(
@@ -365,7 +136,7 @@ def run_search():
                 result_type,
                 result_unit_sel,
                 MPA,
-                sat_by_T
+                steam_engine.sat_by_P
             )       
         case SearchMode.T_AND_P.value:
             try:
@@ -378,7 +149,7 @@ def run_search():
             if not temp_unit_raw:
                 result_string.set(f"ERROR: Select a temperature unit.")
                 return
-            temp_unit = [x for x in ALL_UNITS if x.symbol == temp_unit_raw][0]
+            temp_unit = UNITS[temp_unit_raw]
             
             table_temp = Units.convert(temp_raw, temp_unit, CELSIUS)
 
@@ -392,7 +163,7 @@ def run_search():
             if not pres_unit_raw:
                 result_string.set(f"ERROR: Select a pressure unit.")
                 return
-            pres_unit = [x for x in ALL_UNITS if x.symbol == pres_unit_raw][0]
+            pres_unit = UNITS[pres_unit_raw]
 
             table_pres = Units.convert(pres_raw, pres_unit, MPA)
             
@@ -404,7 +175,7 @@ def run_search():
             if table_var == Property.PHASE:
                 table_unit = None
             else:
-                table_unit = [x for x in TABLE_UNITS if x.type == table_var.unit_type][0]
+                table_unit = steam_engine.table_unit(table_var)
 
             result_unit_raw = result_unit_sel.get()
             if not result_unit_raw:
@@ -414,10 +185,10 @@ def run_search():
                 result_unit_raw = ""
                 result_unit = None
             else:
-                result_unit = [x for x in ALL_UNITS if x.symbol == result_unit_raw][0]
+                result_unit = UNITS[result_unit_raw]
                 result_unit_raw = " " + result_unit_raw
 
-            (low_T, high_T, low_P, high_P, table_result) = find_value_T_P(table_temp, table_pres, table_var, comp_sup)
+            (low_T, high_T, low_P, high_P, table_result) = find_value_T_P(table_temp, table_pres, table_var, steam_engine.comp_sup)
             if low_T and high_T and low_P and high_P and table_result:
                 disp_low_T = Units.convert(low_T, CELSIUS, temp_unit)
                 disp_high_T = Units.convert(high_T, CELSIUS, temp_unit)
@@ -450,47 +221,60 @@ def run_search():
                 result_string.set(f"ERROR: Combination of {temp_raw} {temp_unit_raw} and {pres_raw} {pres_unit_raw} outside of table range.")
 
 
-root = tk.Tk()
-root.title("SteamTabler")
-search_mode = tk.IntVar()
-input_temp = tk.DoubleVar()
-input_pres = tk.DoubleVar()
-
-tk.Label(root, text="Reference state of zero enthalpy, entropy, and internal energy is saturated liquid at the triple point.").grid(row=0,column=0,columnspan=3)
-tk.Label(root, text="Look up by:").grid(row=1,column=0,sticky='W')
-tk.Radiobutton(root, command=search_mode_change, text="Saturation Temperature", variable=search_mode, value=SearchMode.SAT_BY_T.value).grid(row=2,column=0,sticky='W')
-tk.Radiobutton(root, command=search_mode_change, text="Saturation Pressure", variable=search_mode, value=SearchMode.SAT_BY_P.value).grid(row=3,column=0,sticky='W')
-tk.Radiobutton(root, command=search_mode_change, text="Temperature and Pressure", variable=search_mode, value=SearchMode.T_AND_P.value).grid(row=4,column=0,sticky='W')
-
-temp_label = tk.Label(root, text="Temperature:")
-temp_label.grid(row=6,column=0)
-temp_entry = tk.Entry(root)
-temp_entry.grid(row=6,column=1)
-temp_unit_sel = ttk.Combobox(root, values=temp_unit_symbols, state="readonly")
-temp_unit_sel.grid(row=6,column=2)
-
-pres_label = tk.Label(root, text="Pressure:")
-pres_label.grid(row=7,column=0)
-pres_entry = tk.Entry(root)
-pres_entry.grid(row=7,column=1)
-pres_unit_sel = ttk.Combobox(root, values=pres_unit_symbols, state="readonly")
-pres_unit_sel.grid(row=7,column=2)
-
-tk.Label(root, text="Property to look up:").grid(row=9,column=0)
-result_type = ttk.Combobox(root, state="readonly")
-result_type.grid(row=9,column=1,columnspan=2,sticky="EW")
-result_type.bind("<<ComboboxSelected>>", update_units)
-
-tk.Label(root, text="Output Units:").grid(row=10,column=0)
-result_unit_sel = ttk.Combobox(root, state="readonly")
-result_unit_sel.grid(row=10, column= 1)
-
-tk.Button(root, command=run_search, text="Go!").grid(row=11,column=0,columnspan=3,sticky="EW")
-
-result_string = tk.StringVar()
-result = tk.Label(root, textvariable=result_string)
-result_string.set("No search results yet.")
-result.grid(row=12, column=0, columnspan=3)
-
-search_mode_change()
-root.mainloop()
\ No newline at end of file
+if __name__ == "__main__":
+    # STEAM_PROFILE=<file.json> records lookup and handler timings to that file on exit
+    profile_path = os.environ.get("STEAM_PROFILE")
+    if profile_path:
+        import steam_profile
+        steam_profile.enable()
+        steam_profile.instrument(sys.modules[__name__], "one_var_lookup")
+        steam_profile.instrument(sys.modules[__name__], "run_search")
+
+    root = tk.Tk()
+    root.title("SteamTabler")
+    search_mode = tk.IntVar()
+    input_temp = tk.DoubleVar()
+    input_pres = tk.DoubleVar()
+
+    tk.Label(root, text="Reference state of zero enthalpy, entropy, and internal energy is saturated liquid at the triple point.").grid(row=0,column=0,columnspan=3)
+    tk.Label(root, text="Look up by:").grid(row=1,column=0,sticky='W')
+    tk.Radiobutton(root, command=search_mode_change, text="Saturation Temperature", variable=search_mode, value=SearchMode.SAT_BY_T.value).grid(row=2,column=0,sticky='W')
+    tk.Radiobutton(root, command=search_mode_change, text="Saturation Pressure", variable=search_mode, value=SearchMode.SAT_BY_P.value).grid(row=3,column=0,sticky='W')
+    tk.Radiobutton(root, command=search_mode_change, text="Temperature and Pressure", variable=search_mode, value=SearchMode.T_AND_P.value).grid(row=4,column=0,sticky='W')
+
+    temp_label = tk.Label(root, text="Temperature:")
+    temp_label.grid(row=6,column=0)
+    temp_entry = tk.Entry(root)
+    temp_entry.grid(row=6,column=1)
+    temp_unit_sel = ttk.Combobox(root, values=temp_unit_symbols, state="readonly")
+    temp_unit_sel.grid(row=6,column=2)
+
+    pres_label = tk.Label(root, text="Pressure:")
+    pres_label.grid(row=7,column=0)
+    pres_entry = tk.Entry(root)
+    pres_entry.grid(row=7,column=1)
+    pres_unit_sel = ttk.Combobox(root, values=pres_unit_symbols, state="readonly")
+    pres_unit_sel.grid(row=7,column=2)
+
+    tk.Label(root, text="Property to look up:").grid(row=9,column=0)
+    result_type = ttk.Combobox(root, state="readonly")
+    result_type.grid(row=9,column=1,columnspan=2,sticky="EW")
+    result_type.bind("<<ComboboxSelected>>", update_units)
+
+    tk.Label(root, text="Output Units:").grid(row=10,column=0)
+    result_unit_sel = ttk.Combobox(root, state="readonly")
+    result_unit_sel.grid(row=10, column= 1)
+
+    tk.Button(root, command=run_search, text="Go!").grid(row=11,column=0,columnspan=3,sticky="EW")
+
+    result_string = tk.StringVar()
+    result = tk.Label(root, textvariable=result_string)
+    result_string.set("No search results yet.")
+    result.grid(row=12, column=0, columnspan=3)
+
+    tk.Button(root, command=lambda: SweepPanel(root), text="Sweep...").grid(row=13,column=0,columnspan=3,sticky="EW")
+
+    search_mode_change()
+    root.mainloop()
+    if profile_path:
+        steam_profile.dump(profile_path)
\ No newline at end of file
@@ -0,0 +1,297 @@
+import os
+import queue
+import threading
+import tkinter as tk
+from tkinter import ttk, filedialog
+import Units
+import steam_sweep
+from steam_engine import Property, PropType, SearchMode, UNITS, CELSIUS, MPA, table_unit
+
+# Sweep window for the GUI. The sweep runs on a background thread (and, with
+# more than one worker, in worker processes) and hands finished chunks to the
+# Tk main loop through a queue, so the window stays responsive however long
+# the sweep takes. Results are held as plain rows; the table only ever has as
+# many Treeview items as fit on screen and refills them as it scrolls.
+
+POLL_MS = 50
+
+def mode_properties(mode: SearchMode) -> list:
+    # same choices as the main window offers for each mode
+    match mode:
+        case SearchMode.SAT_BY_T:
+            return [x for x in Property if x.type == PropType.SAT] + [Property.PRESSURE]
+        case SearchMode.SAT_BY_P:
+            return [x for x in Property if x.type == PropType.SAT] + [Property.TEMP]
+        case SearchMode.T_AND_P:
+            return [x for x in Property if x.type == PropType.P_T]
+
+def format_value(value) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        return f"{value:.6g}"
+    return str(value)
+
+class VirtualTable(ttk.Frame):
+    def __init__(self, master, **kwargs):
+        """
+        Creates a table view that scrolls through any number of rows
+
+        A Treeview slows down badly with hundreds of thousands of items, so
+        this keeps one item per visible line and rewrites their values from
+        ``rows`` as the view scrolls.
+        """
+        super().__init__(master, **kwargs)
+        self.rows = []
+        self.top = 0
+        self.items = []
+        self.tree = ttk.Treeview(self, show="headings", selectmode="none")
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.scroll)
+        self.tree.grid(row=0, column=0, sticky="NSEW")
+        self.scrollbar.grid(row=0, column=1, sticky="NS")
+        self.rowconfigure(0, weight=1)
+        self.columnconfigure(0, weight=1)
+        self.tree.bind("<Configure>", self.resize)
+        self.tree.bind("<MouseWheel>", lambda e: self.scroll("scroll", -1 if e.delta > 0 else 1, "units"))
+        self.tree.bind("<Button-4>", lambda e: self.scroll("scroll", -1, "units"))
+        self.tree.bind("<Button-5>", lambda e: self.scroll("scroll", 1, "units"))
+        self.row_height = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+
+    def set_columns(self, headings: list) -> None:
+        self.tree["columns"] = [str(i) for i in range(len(headings))]
+        for (i, heading) in enumerate(headings):
+            self.tree.heading(str(i), text=heading)
+            self.tree.column(str(i), width=110, anchor=tk.E, stretch=True)
+        self.clear()
+
+    def clear(self) -> None:
+        self.rows = []
+        self.top = 0
+        self.refresh()
+
+    def extend(self, rows: list) -> None:
+        self.rows.extend(rows)
+        self.refresh()
+
+    def visible_count(self) -> int:
+        # the heading takes about one row
+        return max(1, self.tree.winfo_height() // self.row_height - 1)
+
+    def resize(self, event=None) -> None:
+        count = self.visible_count()
+        while len(self.items) < count:
+            self.items.append(self.tree.insert("", tk.END))
+        while len(self.items) > count:
+            self.tree.delete(self.items.pop())
+        self.refresh()
+
+    def scroll(self, action: str, amount, what: str = None) -> None:
+        # Scrollbar command protocol: ("moveto", fraction) or ("scroll", n, "units"/"pages")
+        page = len(self.items)
+        if action == "moveto":
+            self.top = int(float(amount) * len(self.rows))
+        elif what == "pages":
+            self.top += int(amount) * page
+        else:
+            self.top += int(amount)
+        self.refresh()
+
+    def refresh(self) -> None:
+        page = len(self.items)
+        self.top = max(0, min(self.top, len(self.rows) - page))
+        for (i, item) in enumerate(self.items):
+            position = self.top + i
+            values = self.rows[position] if position < len(self.rows) else ()
+            self.tree.item(item, values=values)
+        if self.rows:
+            self.scrollbar.set(self.top / len(self.rows), min(1.0, (self.top + page) / len(self.rows)))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+class SweepPanel(tk.Toplevel):
+    def __init__(self, master=None):
+        """
+        Creates the sweep window: ranges of T and/or P in, a scrollable table
+        and CSV export out.
+        """
+        super().__init__(master)
+        self.title("SteamTabler Sweep")
+        self.results = []
+        self.props = []
+        self.sweep_mode = None
+        self.inputs = ()
+        self.polling = None
+        self.worker = None
+        self.chunks = queue.Queue()
+        self.cancelled = threading.Event()
+
+        self.mode = tk.IntVar(value=SearchMode.T_AND_P.value)
+        modes = ttk.Frame(self)
+        modes.grid(row=0, column=0, columnspan=4, sticky="W")
+        for (text, mode) in (("Saturation Temperature", SearchMode.SAT_BY_T),
+                             ("Saturation Pressure", SearchMode.SAT_BY_P),
+                             ("Temperature and Pressure", SearchMode.T_AND_P)):
+            tk.Radiobutton(modes, command=self.mode_change, text=text, variable=self.mode,
+                           value=mode.value).pack(side=tk.LEFT)
+
+        tk.Label(self, text="Values are start:stop:step or a comma-separated list.").grid(row=1, column=0, columnspan=4, sticky="W")
+        self.temp_entry = tk.Entry(self)
+        self.temp_unit_sel = ttk.Combobox(self, state="readonly",
+                                          values=[x.symbol for x in UNITS.of_type(Units.Type.TEMPERATURE)])
+        self.temp_unit_sel.set(CELSIUS.symbol)
+        self.pres_entry = tk.Entry(self)
+        self.pres_unit_sel = ttk.Combobox(self, state="readonly",
+                                          values=[x.symbol for x in UNITS.of_type(Units.Type.PRESSURE)])
+        self.pres_unit_sel.set(MPA.symbol)
+        tk.Label(self, text="Temperature:").grid(row=2, column=0, sticky="W")
+        self.temp_entry.grid(row=2, column=1, sticky="EW")
+        self.temp_unit_sel.grid(row=2, column=2)
+        tk.Label(self, text="Pressure:").grid(row=3, column=0, sticky="W")
+        self.pres_entry.grid(row=3, column=1, sticky="EW")
+        self.pres_unit_sel.grid(row=3, column=2)
+
+        tk.Label(self, text="Properties:").grid(row=4, column=0, sticky="NW")
+        self.prop_list = tk.Listbox(self, selectmode=tk.MULTIPLE, height=6, exportselection=False)
+        self.prop_list.grid(row=4, column=1, columnspan=2, sticky="EW")
+
+        tk.Label(self, text="Workers:").grid(row=5, column=0, sticky="W")
+        self.workers = tk.Spinbox(self, from_=1, to=os.cpu_count() or 1, width=5)
+        self.workers.grid(row=5, column=1, sticky="W")
+
+        buttons = ttk.Frame(self)
+        buttons.grid(row=6, column=0, columnspan=4, sticky="EW")
+        self.run_button = tk.Button(buttons, text="Run", command=self.run)
+        self.run_button.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.cancel_button = tk.Button(buttons, text="Cancel", command=self.cancel, state=tk.DISABLED)
+        self.cancel_button.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        self.save_button = tk.Button(buttons, text="Save CSV...", command=self.save, state=tk.DISABLED)
+        self.save_button.pack(side=tk.LEFT, fill=tk.X, expand=True)
+
+        self.status = tk.StringVar(value="No sweep yet.")
+        tk.Label(self, textvariable=self.status).grid(row=7, column=0, columnspan=4, sticky="W")
+
+        self.table = VirtualTable(self)
+        self.table.grid(row=8, column=0, columnspan=4, sticky="NSEW")
+        self.rowconfigure(8, weight=1)
+        self.columnconfigure(1, weight=1)
+
+        self.protocol("WM_DELETE_WINDOW", self.close)
+        self.mode_change()
+
+    def mode_change(self) -> None:
+        mode = SearchMode(self.mode.get())
+        self.mode_props = sorted(mode_properties(mode), key=lambda x: x.disp_name)
+        self.prop_list.delete(0, tk.END)
+        for prop in self.mode_props:
+            self.prop_list.insert(tk.END, prop.disp_name)
+        inputs = steam_sweep.sweep_inputs(mode)
+        self.temp_entry.configure(state=(tk.NORMAL if "T" in inputs else tk.DISABLED))
+        self.pres_entry.configure(state=(tk.NORMAL if "P" in inputs else tk.DISABLED))
+        self.temp_unit_sel.configure(state=("readonly" if "T" in inputs else tk.DISABLED))
+        self.pres_unit_sel.configure(state=("readonly" if "P" in inputs else tk.DISABLED))
+
+    def run(self) -> None:
+        mode = SearchMode(self.mode.get())
+        inputs = steam_sweep.sweep_inputs(mode)
+        props = [self.mode_props[i] for i in self.prop_list.curselection()]
+        if not props:
+            self.status.set("ERROR: Select at least one property.")
+            return
+        try:
+            temps = steam_sweep.parse_values(self.temp_entry.get()) if "T" in inputs else None
+            pressures = steam_sweep.parse_values(self.pres_entry.get()) if "P" in inputs else None
+            steam_sweep.check_inputs(mode, temps, pressures)
+            workers = max(1, int(self.workers.get()))
+        except ValueError as e:
+            self.status.set(f"ERROR: {e}")
+            return
+        (T_unit, P_unit) = (self.temp_unit_sel.get(), self.pres_unit_sel.get())
+
+        (self.sweep_mode, self.inputs, self.props) = (mode, inputs, props)
+        self.results = []
+        self.total = steam_sweep.sweep_size(mode, temps, pressures)
+        units = {"T": T_unit, "P": P_unit}
+        headings = [f"{'Temperature' if x == 'T' else 'Pressure'} ({units[x]})" for x in self.inputs]
+        headings += [x.disp_name if x == Property.PHASE else f"{x.disp_name} ({table_unit(x).symbol})" for x in props]
+        self.table.set_columns(headings)
+        self.status.set(f"0 of {self.total} points.")
+        self.run_button.configure(state=tk.DISABLED)
+        self.save_button.configure(state=tk.DISABLED)
+        self.cancel_button.configure(state=tk.NORMAL)
+
+        self.cancelled.clear()
+        # the worker processes are started from the sweep thread, so they
+        # must not be forked from this multithreaded Tk process
+        args = (mode, props, temps, pressures, T_unit, P_unit, None, False, workers)
+        self.worker = threading.Thread(target=self.work, args=args, kwargs={"start_method": "spawn"}, daemon=True)
+        self.worker.start()
+        self.polling = self.after(POLL_MS, self.poll)
+
+    def work(self, *args, **kwargs) -> None:
+        # background thread: never touches Tk, only the queue
+        chunks = None
+        try:
+            chunks = steam_sweep.sweep_chunks(*args, **kwargs)
+            for chunk in chunks:
+                if self.cancelled.is_set():
+                    break
+                self.chunks.put(chunk)
+        except Exception as e:
+            self.chunks.put(e)
+        finally:
+            if chunks is not None:
+                chunks.close()
+            self.chunks.put(None)
+
+    def poll(self) -> None:
+        rows = []
+        finished = False
+        error = None
+        while True:
+            try:
+                chunk = self.chunks.get_nowait()
+            except queue.Empty:
+                break
+            if chunk is None:
+                finished = True
+                break
+            if isinstance(chunk, Exception):
+                error = chunk
+                continue
+            self.results.extend(chunk)
+            for (T, P, values) in chunk:
+                row = [format_value(T if x == "T" else P) for x in self.inputs]
+                rows.append(row + [format_value(values[x.name]) for x in self.props])
+        if rows:
+            self.table.extend(rows)
+        self.status.set(f"{len(self.results)} of {self.total} points.")
+        if error is not None:
+            self.status.set(f"ERROR: {type(error).__name__}: {error}")
+        if not finished:
+            self.polling = self.after(POLL_MS, self.poll)
+            return
+        (self.worker, self.polling) = (None, None)
+        if self.cancelled.is_set():
+            self.status.set(f"Cancelled after {len(self.results)} of {self.total} points.")
+        self.run_button.configure(state=tk.NORMAL)
+        self.cancel_button.configure(state=tk.DISABLED)
+        self.save_button.configure(state=(tk.NORMAL if self.results else tk.DISABLED))
+
+    def cancel(self) -> None:
+        self.cancelled.set()
+
+    def save(self) -> None:
+        path = filedialog.asksaveasfilename(parent=self, defaultextension=".csv",
+                                            filetypes=[("CSV files", "*.csv"), ("All files", "*")])
+        if not path:
+            return
+        with open(path, "w", newline="", encoding="utf-8") as f:
+            steam_sweep.write_csv(f, self.sweep_mode, self.props, [self.results])
+        self.status.set(f"Saved {len(self.results)} points to {path}.")
+
+    def close(self) -> None:
+        # the sweep thread stops at its next chunk and shuts its workers down
+        self.cancelled.set()
+        if self.polling is not None:
+            self.after_cancel(self.polling)
+        self.destroy()
@@ -0,0 +1,254 @@
+import hashlib
+import json
+import mmap
+import os
+import struct
+from array import array
+import steam_engine
+from steam_engine import Property, Table, SortedIndex, Grid
+
+# Parsed tables, with their indexes, are saved next to the CSVs as
+#   MAGIC | header length (u64) | JSON header | padding | raw arrays
+# The header records where each array starts, so a cached table is a set of
+# memoryviews over an mmap of the file and nothing has to be parsed or sorted.
+MAGIC = b"STCACHE1"
+CACHE_VERSION = 1
+ALIGN = 8
+
+def cache_path(csv_path: str) -> str:
+    return os.path.splitext(csv_path)[0] + ".cache"
+
+def file_hash(path: str) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def stamp(path: str) -> list:
+    """
+    Records what a cache was built from.
+
+    :param path: Source file
+    :type path: str
+    :return: ``[path, size, mtime_ns, sha256]``
+    :rtype: list
+    """
+    path = os.path.realpath(path)
+    st = os.stat(path)
+    return [path, st.st_size, st.st_mtime_ns, file_hash(path)]
+
+def stamp_matches(saved: list) -> bool:
+    (path, size, mtime_ns, digest) = saved
+    try:
+        st = os.stat(path)
+    except OSError:
+        return False
+    if st.st_size != size:
+        return False
+    # a touched but unchanged file still counts as current
+    return st.st_mtime_ns == mtime_ns or file_hash(path) == digest
+
+def sources(csv_path: str) -> list:
+    return [csv_path, steam_engine.unit_config_file]
+
+def flatten(indexes: dict) -> tuple:
+    # concatenates sorted indexes in key order, with start offsets for each
+    values = sorted(indexes.keys())
+    keys = array("d")
+    rows = array("q")
+    starts = array("q", [0])
+    for x in values:
+        keys.extend(indexes[x].keys)
+        rows.extend(indexes[x].rows)
+        starts.append(len(keys))
+    return array("d", values), keys, rows, starts
+
+def unflatten(table: Table, values, keys, rows, starts) -> dict:
+    return {
+        values[i]: SortedIndex.presorted(table, keys[starts[i]:starts[i + 1]], rows[starts[i]:starts[i + 1]])
+        for i in range(len(values))
+    }
+
+def to_bytes(table: Table, search_by: Property = None, header_extra: dict = None, indexed: bool = True) -> bytes:
+    """
+    Serializes ``table`` and its indexes in the cache file layout.
+
+    :param table: Table to serialize
+    :type table: Table
+    :param search_by: Column the table is searched by, or None for a table
+        searched by both temperature and pressure
+    :type search_by: Property
+    :param header_extra: Extra entries for the header
+    :type header_extra: dict
+    :param indexed: Whether to include the indexes
+    :type indexed: bool
+    :return: Serialized table
+    :rtype: bytes
+    """
+    arrays = {}
+    for (prop, column) in table.columns.items():
+        arrays["column:" + prop.name] = column
+    if table.phases is not None:
+        arrays["phases"] = table.phases
+    if indexed and search_by is not None:
+        index = table.index(search_by)
+        arrays["index:keys"] = index.keys
+        arrays["index:rows"] = index.rows
+    elif indexed:
+        grid = table.grid()
+        for (name, indexes) in (("isotherms", grid.isotherms), ("isobars", grid.isobars)):
+            (values, keys, rows, starts) = flatten(indexes)
+            arrays[name + ":values"] = values
+            arrays[name + ":keys"] = keys
+            arrays[name + ":rows"] = rows
+            arrays[name + ":starts"] = starts
+
+    layout = {}
+    offset = 0
+    for (name, data) in arrays.items():
+        if not isinstance(data, array):
+            # columns of a table that was itself loaded from a cache
+            data = array(data.format, data)
+        arrays[name] = data
+        layout[name] = [data.typecode, offset, len(data)]
+        offset += -(-len(data) * data.itemsize // ALIGN) * ALIGN
+    header = dict(header_extra or {})
+    header.update({
+        "version": CACHE_VERSION,
+        "search_by": search_by.name if search_by is not None else None,
+        "indexed": indexed,
+        "arrays": layout,
+    })
+    header = json.dumps(header).encode("utf-8")
+    start = data_start(len(header))
+
+    out = bytearray(start + offset)
+    out[:len(MAGIC)] = MAGIC
+    struct.pack_into("<Q", out, len(MAGIC), len(header))
+    out[len(MAGIC) + 8:len(MAGIC) + 8 + len(header)] = header
+    for (name, data) in arrays.items():
+        position = start + layout[name][1]
+        out[position:position + len(data) * data.itemsize] = data.tobytes()
+    return bytes(out)
+
+def data_start(header_len: int) -> int:
+    return -(-(len(MAGIC) + 8 + header_len) // ALIGN) * ALIGN
+
+def read_header(buffer) -> dict:
+    """
+    Reads the header of a serialized table.
+
+    :param buffer: Serialized table, e.g. an mmap or shared memory buffer
+    :return: The header, or None if ``buffer`` isn't a current serialized table
+    :rtype: dict
+    """
+    try:
+        if bytes(buffer[:len(MAGIC)]) != MAGIC:
+            return None
+        (header_len,) = struct.unpack_from("<Q", buffer, len(MAGIC))
+        header = json.loads(bytes(buffer[len(MAGIC) + 8:len(MAGIC) + 8 + header_len]))
+        if header["version"] != CACHE_VERSION:
+            return None
+        header["start"] = data_start(header_len)
+        # a truncated file would otherwise map as shorter arrays
+        for (typecode, offset, count) in header["arrays"].values():
+            if header["start"] + offset + count * array(typecode).itemsize > len(buffer):
+                return None
+        return header
+    except (ValueError, KeyError, TypeError, struct.error):
+        return None
+
+def from_buffer(buffer, header: dict) -> Table:
+    """
+    Builds a table whose columns and indexes are views into ``buffer``; nothing is copied.
+
+    :param buffer: Serialized table
+    :param header: Its header, from ``read_header``
+    :type header: dict
+    :return: The table
+    :rtype: Table
+    """
+    start = header["start"]
+    view = memoryview(buffer)
+    arrays = {}
+    for (name, (typecode, offset, count)) in header["arrays"].items():
+        size = array(typecode).itemsize
+        arrays[name] = view[start + offset:start + offset + count * size].cast(typecode)
+
+    columns = {Property[name[len("column:"):]]: x for (name, x) in arrays.items() if name.startswith("column:")}
+    table = Table(columns, arrays.get("phases"))
+    indexed = header.get("indexed", True)
+    if indexed and header["search_by"] is not None:
+        search_by = Property[header["search_by"]]
+        table._indexes[search_by] = SortedIndex.presorted(table, arrays["index:keys"], arrays["index:rows"])
+    elif indexed:
+        (isotherms, isobars) = (
+            unflatten(table, *(arrays[f"{name}:{x}"] for x in ("values", "keys", "rows", "starts")))
+            for name in ("isotherms", "isobars")
+        )
+        table._grid = Grid.from_indexes(isotherms, isobars)
+    return table
+
+def save(table: Table, csv_path: str, search_by: Property = None) -> None:
+    """
+    Writes ``table`` and its indexes to the cache file for ``csv_path``.
+
+    :param table: Table read from ``csv_path``
+    :type table: Table
+    :param csv_path: CSV the table was read from
+    :type csv_path: str
+    :param search_by: Column the table is searched by, or None for a table
+        searched by both temperature and pressure
+    :type search_by: Property
+    """
+    data = to_bytes(table, search_by, {"sources": [stamp(x) for x in sources(csv_path)]})
+    write_file(cache_path(csv_path), data)
+
+def write_file(path: str, data: bytes) -> None:
+    # readers either see the old file or the whole new one
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+    except OSError:
+        # a read-only install just goes without a cache
+        try:
+            os.remove(temp_path)
+        except OSError:
+            pass
+
+def load(csv_path: str):
+    """
+    Maps the cached table for ``csv_path``, if there is a current one.
+
+    :param csv_path: CSV the table was read from
+    :type csv_path: str
+    :return: The cached table, or None if there is no cache or it is stale
+    :rtype: Table
+    """
+    mapped = map_file(cache_path(csv_path), csv_path)
+    return mapped[1] if mapped is not None else None
+
+def map_file(path: str, csv_path: str):
+    """
+    Maps a serialized table file, if it is current with respect to ``csv_path``.
+
+    :param path: File written by ``save`` or ``write_file``
+    :type path: str
+    :param csv_path: CSV the file was built from
+    :type csv_path: str
+    :return: ``(header, table)``, or None if there is no file or it is stale
+    :rtype: tuple
+    """
+    try:
+        with open(path, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    header = read_header(data)
+    if header is None or "sources" not in header:
+        return None
+    if [x[0] for x in header["sources"]] != [os.path.realpath(x) for x in sources(csv_path)]:
+        return None
+    if not all(stamp_matches(x) for x in header["sources"]):
+        return None
+    return header, from_buffer(data, header)
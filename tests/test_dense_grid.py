@@ -0,0 +1,43 @@
+import pytest
+import steam_engine
+from steam_engine import Property
+import dense_grid
+from dense_grid import DenseGrid, DenseLine
+
+def test_grid_nodes_next_to_blank_cells():
+    table = steam_engine.comp_sup
+    dense = DenseGrid.build(table, 20.0, 0.1)
+    column = dense.table.columns[Property.ENTHALPY]
+    n = dense.n_P
+    checked = 0
+    for i in range(dense.n_T):
+        for j in range(n):
+            if column[i * n + j] != column[i * n + j]:
+                continue
+            T = dense.T_start + i * dense.T_step
+            P = 10 ** (dense.log_P_start + j * dense.log_P_step)
+            expected = steam_engine.find_value_T_P(T, P, Property.ENTHALPY, table)[-1]
+            assert dense.value(T, P, Property.ENTHALPY) == pytest.approx(expected)
+            checked += 1
+    # the table isn't rectangular, so some valid nodes border blank ones
+    assert checked < dense.n_T * n
+
+def test_line_last_valid_node():
+    sat = steam_engine.sat_by_T
+    dense = DenseLine.build(sat, Property.TEMP, 10.0)
+    column = dense.table.columns[Property.PRESSURE]
+    for i in range(dense.count):
+        if column[i] == column[i]:
+            key = dense.start + i * dense.step
+            assert dense.value(key, Property.PRESSURE) == pytest.approx(column[i])
+
+@pytest.mark.parametrize("dome", [False, True])
+def test_saved_grid_keeps_dome_flag(tmp_path, dome):
+    table = steam_engine.comp_sup
+    dense = DenseGrid.build(table, 50.0, 0.5, steam_engine.saturation_dome() if dome else None)
+    assert dense.dome == dome
+    path = str(tmp_path / "comp_sup.dense.cache")
+    dense_grid.save(dense, path, steam_engine.TABLE_FILES["comp_sup"])
+    loaded = dense_grid.load(path, steam_engine.TABLE_FILES["comp_sup"])
+    assert loaded.dome == dome
+    assert loaded.value(212.5, 1.5, Property.ENTHALPY) == dense.value(212.5, 1.5, Property.ENTHALPY)
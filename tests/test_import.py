@@ -0,0 +1,17 @@
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def run(code: str) -> str:
+    return subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=ROOT, check=True).stdout.split()
+
+def test_import_defers_json_and_units():
+    assert run("import sys, steam_engine; print('json' in sys.modules, 're' in sys.modules, "
+               "'CELSIUS' in vars(steam_engine))") == ["False", "False", "False"]
+
+def test_units_load_on_first_use():
+    assert run("import sys; from steam_engine import CELSIUS, MPA; import steam_engine; "
+               "print(CELSIUS.symbol, MPA.symbol, steam_engine.UNITS['K'].symbol, 'json' in sys.modules)") == \
+        ["°C", "MPa", "K", "True"]
@@ -0,0 +1,64 @@
+import random
+import pytest
+import steam_engine
+from steam_engine import Property
+
+def random_states(table, prop, count, seed=0):
+    # (T, P, forward value) at random points of the grid, a fifth of them on isobars
+    grid = table.grid()
+    rng = random.Random(seed)
+    states = []
+    while len(states) < count:
+        T = rng.uniform(grid.temps[0], grid.temps[-1])
+        if rng.random() < 0.2:
+            P = rng.choice(grid.pressures)
+        else:
+            P = rng.uniform(grid.pressures[0], grid.pressures[-1])
+        value = steam_engine.find_value_T_P(T, P, prop, table)[-1]
+        if value is not None and value == value:
+            states.append((T, P, value))
+    return states
+
+@pytest.mark.parametrize("prop", [Property.ENTHALPY, Property.ENTROPY, Property.ENERGY])
+def test_round_trip(prop):
+    table = steam_engine.comp_sup
+    for (T, P, value) in random_states(table, prop, 500):
+        (found, quality) = steam_engine.find_T_P_inverse(P, prop, value, table)
+        assert quality is None
+        assert found == pytest.approx(T, abs=1e-6)
+
+def test_round_trip_volume():
+    # cold liquid volumes have two temperatures, so compare the volume at the
+    # temperature found instead
+    table = steam_engine.comp_sup
+    for (T, P, value) in random_states(table, Property.VOLUME, 500):
+        (found, quality) = steam_engine.find_T_P_inverse(P, Property.VOLUME, value, table)
+        assert found >= T - 1e-6
+        assert steam_engine.find_value_T_P(found, P, Property.VOLUME, table)[-1] == pytest.approx(value)
+
+def test_inside_dome():
+    table = steam_engine.comp_sup
+    sat = steam_engine.sat_by_P
+    mixture = steam_engine.find_mixture(Property.PRESSURE, 1.0, 0.5, sat, [Property.ENTHALPY, Property.TEMP])
+    (T, quality) = steam_engine.find_T_P_inverse(1.0, Property.ENTHALPY, mixture[Property.ENTHALPY], table, sat)
+    assert quality == pytest.approx(0.5)
+    assert T == pytest.approx(mixture[Property.TEMP])
+
+def test_outside_table():
+    table = steam_engine.comp_sup
+    assert steam_engine.find_T_P_inverse(1.0, Property.ENTHALPY, 1e6, table) == (None, None)
+
+def test_cells_cached_by_version():
+    table = steam_engine.comp_sup
+    grid = table.grid()
+    P = (grid.pressures[10] + grid.pressures[11]) / 2
+    cells = grid.cells(P, Property.ENTHALPY)
+    # every pressure between the same two isobars shares the cells
+    assert grid.cells(grid.pressures[10] * 0.25 + grid.pressures[11] * 0.75, Property.ENTHALPY) is cells
+    assert grid.cells(grid.pressures[0] / 2, Property.ENTHALPY) is None
+    version = table.version
+    try:
+        table.version = -1
+        assert grid.cells(P, Property.ENTHALPY) is not cells
+    finally:
+        table.version = version
@@ -0,0 +1,65 @@
+import pytest
+import steam_engine
+from steam_engine import Property
+from lookup_cache import LookupCache
+
+def test_hits_and_misses():
+    cache = LookupCache()
+    table = steam_engine.comp_sup
+    first = cache.find_value_T_P(250, 1.0, Property.ENTHALPY, table)
+    assert cache.find_value_T_P(250, 1.0, Property.ENTHALPY, table) == first
+    assert first == steam_engine.find_value_T_P(250, 1.0, Property.ENTHALPY, table)
+    cache.find_value_T_P(250, 1.0, Property.ENTROPY, table)
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["size"]) == (1, 2, 2)
+
+def test_evicts_least_recently_used():
+    cache = LookupCache(maxsize=2)
+    table = steam_engine.sat_by_T
+    for T in (50, 60):
+        cache.search_interpolate(Property.TEMP, T, Property.PRESSURE, table)
+    # touching 50 leaves 60 as the oldest
+    cache.search_interpolate(Property.TEMP, 50, Property.PRESSURE, table)
+    cache.search_interpolate(Property.TEMP, 70, Property.PRESSURE, table)
+    assert cache.stats()["evictions"] == 1
+    keys = [x[3] for x in cache._entries]
+    assert keys == [50, 70]
+    cache.search_interpolate(Property.TEMP, 60, Property.PRESSURE, table)
+    assert cache.stats()["misses"] == 4
+
+def test_quantized_inputs_share_an_entry():
+    cache = LookupCache(tolerance=0.5)
+    table = steam_engine.comp_sup
+    first = cache.find_value_T_P(250.1, 1.0, Property.ENTHALPY, table)
+    assert cache.find_value_T_P(249.9, 1.0, Property.ENTHALPY, table) == first
+    assert first == steam_engine.find_value_T_P(250.0, 1.0, Property.ENTHALPY, table)
+    assert cache.stats()["hits"] == 1
+
+def test_new_table_version_misses(monkeypatch):
+    cache = LookupCache()
+    table = steam_engine.comp_sup
+    cache.find_state_T_P(250, 1.0, table)
+    monkeypatch.setattr(table, "version", -1)
+    cache.find_state_T_P(250, 1.0, table)
+    assert cache.stats()["misses"] == 2
+
+def test_dome_is_part_of_the_key():
+    cache = LookupCache()
+    table = steam_engine.comp_sup
+    dome = steam_engine.saturation_dome()
+    # this state's bracket crosses the saturation curve
+    assert cache.find_value_T_P(112, 0.15, Property.ENTHALPY, table)[-1] is not None
+    assert cache.find_value_T_P(112, 0.15, Property.ENTHALPY, table, dome)[-1] is None
+    assert cache.find_state_T_P(112, 0.15, table) is not None
+    assert cache.find_state_T_P(112, 0.15, table, dome) is None
+    assert cache.stats()["misses"] == 4
+
+def test_states_are_copies():
+    cache = LookupCache()
+    state = cache.find_state_T_P(250, 1.0, steam_engine.comp_sup)
+    state[Property.ENTHALPY] = 0
+    assert cache.find_state_T_P(250, 1.0, steam_engine.comp_sup)[Property.ENTHALPY] != 0
+
+def test_maxsize_must_be_positive():
+    with pytest.raises(ValueError):
+        LookupCache(maxsize=0)
@@ -0,0 +1,64 @@
+import random
+import pytest
+import steam_engine
+from steam_engine import Property
+from lookup_cursor import LookupCursor
+
+def same(a, b) -> bool:
+    # equal, counting NaN (a blank cell) as equal to itself
+    if isinstance(a, dict) and isinstance(b, dict):
+        return a.keys() == b.keys() and all(same(a[x], b[x]) for x in a)
+    if isinstance(a, tuple) and isinstance(b, tuple):
+        return len(a) == len(b) and all(same(x, y) for (x, y) in zip(a, b))
+    return a == b or (a != a and b != b)
+
+def walk(rng, value, step, low, high, nodes):
+    # small steps that keep crossing table lines, with the odd jump, exact
+    # node and excursion out of the table
+    r = rng.random()
+    if r < 0.05:
+        return rng.choice(nodes)
+    if r < 0.07:
+        return rng.uniform(low, high)
+    if r < 0.08:
+        return high + step
+    value += rng.gauss(0, step)
+    return min(max(value, low - step), high + step)
+
+@pytest.mark.parametrize("use_dome", [False, True])
+def test_T_P_walk_matches_plain_lookups(use_dome):
+    table = steam_engine.comp_sup
+    dome = steam_engine.saturation_dome() if use_dome else None
+    grid = table.grid()
+    cursor = LookupCursor()
+    rng = random.Random(7)
+    (T, P) = (200.0, 1.0)
+    for i in range(20000):
+        T = walk(rng, T, 3.0, grid.temps[0], grid.temps[-1], grid.temps)
+        P = walk(rng, P, 0.05 * P + 0.01, grid.pressures[0], grid.pressures[-1], grid.pressures)
+        prop = (Property.ENTHALPY, Property.VOLUME, Property.PHASE)[i % 3]
+        assert same(cursor.find_value_T_P(T, P, prop, table, dome), steam_engine.find_value_T_P(T, P, prop, table, dome))
+        if i % 50 == 0:
+            assert same(cursor.find_state_T_P(T, P, table, None, dome), steam_engine.find_state_T_P(T, P, table, None, dome))
+
+@pytest.mark.parametrize("name", ["sat_by_T", "sat_by_P"])
+def test_saturation_walk_matches_plain_lookups(name):
+    table = steam_engine.get_table(name)
+    search_by = steam_engine.TABLE_SEARCH_BY[name]
+    keys = list(table.index(search_by).keys)
+    cursor = LookupCursor()
+    rng = random.Random(11)
+    x = keys[len(keys) // 2]
+    for i in range(20000):
+        x = walk(rng, x, (keys[-1] - keys[0]) / 500, keys[0], keys[-1], keys)
+        assert same(cursor.search_interpolate(search_by, x, Property.ENTHALPY_VAPOR, table),
+                    steam_engine.search_interpolate(search_by, x, Property.ENTHALPY_VAPOR, table))
+        if i % 50 == 0:
+            assert same(cursor.search_state(search_by, x, table), steam_engine.search_state(search_by, x, table))
+
+def test_reset_forgets_positions():
+    cursor = LookupCursor()
+    cursor.find_value_T_P(200, 1.0, Property.ENTHALPY, steam_engine.comp_sup)
+    assert cursor._hints
+    cursor.reset()
+    assert not cursor._hints
@@ -0,0 +1,76 @@
+import pytest
+import steam_engine
+from steam_engine import Property, Phase, TableSchema
+
+SCHEMA = TableSchema((Property.PRESSURE, Property.TEMP),
+                     (Property.PRESSURE, Property.TEMP, Property.ENTHALPY, Property.PHASE))
+HEADER = "P (MPa),T (°C),Specific Enthalpy (kJ/kg),Phase"
+ROWS = ["0.1,50,209.3,liquid", "0.1,150,2776.6,vapor", "1.0,50,210.2,liquid"]
+
+def write(tmp_path, header=HEADER, rows=ROWS):
+    path = tmp_path / "table.csv"
+    path.write_text("\n".join(["version,1", "", header] + rows) + "\n", encoding="utf-8")
+    return str(path)
+
+def test_reads_table(tmp_path):
+    table = steam_engine.read_csv(write(tmp_path), SCHEMA)
+    assert list(table.columns[Property.ENTHALPY]) == [209.3, 2776.6, 210.2]
+    assert table.value(Property.PHASE, 1) == Phase.VAPOR.value
+
+def test_missing_column(tmp_path):
+    path = write(tmp_path, "P (MPa),T (°C),Phase", ["0.1,50,liquid"])
+    with pytest.raises(ValueError, match="Missing columns Specific Enthalpy"):
+        steam_engine.read_csv(path, SCHEMA)
+
+def test_unknown_column(tmp_path):
+    path = write(tmp_path, HEADER + ",Colour", [x + ",blue" for x in ROWS])
+    with pytest.raises(ValueError, match="Unknown column 'Colour'"):
+        steam_engine.read_csv(path, SCHEMA)
+
+def test_repeated_column(tmp_path):
+    path = write(tmp_path, HEADER + ",T (°C)", [x + ",50" for x in ROWS])
+    with pytest.raises(ValueError, match="appears twice"):
+        steam_engine.read_csv(path, SCHEMA)
+
+def test_bad_row_width(tmp_path):
+    path = write(tmp_path, rows=ROWS[:1] + ["0.1,150,2776.6"] + ROWS[2:])
+    with pytest.raises(ValueError, match="Row 2 after the header .* has 3 cells, not 4"):
+        steam_engine.read_csv(path, SCHEMA)
+
+def test_trailing_blank_cells_are_allowed(tmp_path):
+    table = steam_engine.read_csv(write(tmp_path, HEADER + ",", [x + "," for x in ROWS]), SCHEMA)
+    assert len(table) == 3
+
+def test_unsorted_rows(tmp_path):
+    path = write(tmp_path, rows=[ROWS[1], ROWS[0], ROWS[2]])
+    with pytest.raises(ValueError, match=r"not sorted by P \(MPa\), T \(°C\) \(row 2 after the header\)"):
+        steam_engine.read_csv(path, SCHEMA)
+
+def test_unknown_phase(tmp_path):
+    path = write(tmp_path, rows=ROWS[:2] + ["1.0,50,210.2,plasma"])
+    with pytest.raises(ValueError, match="Unknown phase 'plasma'"):
+        steam_engine.read_csv(path, SCHEMA)
+
+def test_bad_number(tmp_path):
+    path = write(tmp_path, rows=ROWS[:2] + ["1.0,50,lots,liquid"])
+    with pytest.raises(ValueError, match="Column 'Specific Enthalpy"):
+        steam_engine.read_csv(path, SCHEMA)
+
+def test_props_subset(tmp_path):
+    table = steam_engine.read_csv(write(tmp_path), SCHEMA, [Property.ENTHALPY])
+    # the schema's keys come along, other columns don't
+    assert set(table.columns) == {Property.PRESSURE, Property.TEMP, Property.ENTHALPY}
+    assert table.phases is None
+    with pytest.raises(KeyError, match="not loaded"):
+        table.value(Property.ENTROPY, 0)
+
+def test_partial_load_is_what_the_module_returns(monkeypatch):
+    monkeypatch.setattr(steam_engine, "USE_TABLE_CACHE", False)
+    monkeypatch.setattr(steam_engine, "_tables", {})
+    table = steam_engine.get_table("comp_sup", props=[Property.ENTHALPY])
+    assert steam_engine.comp_sup is table
+    assert steam_engine.find_value_T_P(250, 1.0, Property.ENTHALPY, table)[-1] == pytest.approx(2943.1)
+    with pytest.raises(KeyError, match="not loaded"):
+        steam_engine.find_value_T_P(250, 1.0, Property.ENTROPY, table)
+    assert Property.ENTROPY in steam_engine.get_table("comp_sup", props=[Property.ENTROPY]).columns
+    assert Property.ENERGY in steam_engine.get_table("comp_sup", reload=True).columns
@@ -0,0 +1,30 @@
+import pytest
+import steam_engine
+from steam_engine import Property, Phase, SaturationDome
+
+@pytest.fixture
+def no_cache(monkeypatch):
+    monkeypatch.setattr(steam_engine, "USE_TABLE_CACHE", False)
+    monkeypatch.setattr(steam_engine, "_tables", {})
+    monkeypatch.setattr(steam_engine, "_domes", {})
+
+def test_dome_after_partial_load(no_cache):
+    steam_engine.get_table("comp_sup", props=[Property.ENTHALPY])
+    dome = steam_engine.saturation_dome()
+    assert dome.critical_T == pytest.approx(373.946, abs=0.1)
+    assert dome.critical_P == pytest.approx(22.064, abs=0.01)
+    table = steam_engine.comp_sup
+    assert table.phases is not None
+    result = steam_engine.find_value_T_P(250, 1.0, Property.ENTHALPY, table, dome)
+    assert result[-1] == pytest.approx(2943.1)
+
+def test_dome_needs_phases(no_cache):
+    table = steam_engine.get_table("comp_sup", props=[Property.ENTHALPY])
+    with pytest.raises(ValueError):
+        SaturationDome(table, steam_engine.sat_by_P)
+
+def test_classify():
+    dome = steam_engine.saturation_dome()
+    assert dome.classify(100, 1.0) == Phase.LIQUID
+    assert dome.classify(200, 0.1) == Phase.VAPOR
+    assert dome.classify(500, 30.0) == Phase.SUPERCRITICAL_FLUID
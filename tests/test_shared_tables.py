@@ -0,0 +1,37 @@
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import pytest
+import steam_engine
+from steam_engine import Property
+from shared_tables import SharedTables, attach
+
+STATES = [(250.0, 1.0), (25.0, 0.1), (612.3, 7.7), (374.0, 22.1), (1e4, 1.0)]
+
+def lookups() -> list:
+    results = [steam_engine.find_value_T_P(T, P, Property.ENTHALPY, steam_engine.comp_sup) for (T, P) in STATES]
+    results += [steam_engine.search_interpolate(Property.TEMP, T, Property.PRESSURE, steam_engine.sat_by_T)
+                for (T, P) in STATES]
+    results += [steam_engine.search_state(Property.PRESSURE, P, steam_engine.sat_by_P) for (T, P) in STATES]
+    return results
+
+def worker_lookups() -> tuple:
+    # whether the worker is reading the shared blocks, and what it finds there
+    shared = all(isinstance(x.columns[Property.TEMP], memoryview) for x in steam_engine._tables.values())
+    return shared, sorted(steam_engine._tables), lookups()
+
+def test_worker_lookups_match_parent():
+    with SharedTables() as shared:
+        with ProcessPoolExecutor(1, initializer=attach, initargs=(shared.handle,)) as pool:
+            (attached, names, results) = pool.submit(worker_lookups).result()
+    assert attached
+    assert names == sorted(steam_engine.TABLE_FILES)
+    assert results == lookups()
+
+def test_close_unlinks_blocks():
+    shared = SharedTables(["sat_by_T"])
+    names = list(shared.handle.values())
+    shared.close()
+    assert shared.handle == {}
+    for name in names:
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name)
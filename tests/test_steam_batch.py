@@ -0,0 +1,68 @@
+import math
+import pytest
+
+np = pytest.importorskip("numpy")
+import steam_batch
+import steam_engine
+from steam_engine import Property, PHASES
+
+def close(got, expected):
+    if expected is None:
+        return math.isnan(got)
+    return got == pytest.approx(expected)
+
+def test_sat_lookup_scalar():
+    result = steam_batch.sat_lookup(Property.TEMP, 100.5, Property.PRESSURE)
+    assert np.ndim(result) == 0
+    assert close(result, steam_engine.search_interpolate(Property.TEMP, 100.5, Property.PRESSURE, steam_engine.sat_by_T)[2])
+    assert math.isnan(steam_batch.sat_lookup(Property.PRESSURE, 1e6, Property.TEMP))
+
+def test_sat_state_scalar():
+    state = steam_batch.sat_state(Property.PRESSURE, 1.05)
+    expected = steam_engine.search_state(Property.PRESSURE, 1.05, steam_engine.sat_by_P)
+    assert state.keys() == expected.keys()
+    for (prop, value) in state.items():
+        assert np.ndim(value) == 0
+        assert close(value, expected[prop])
+
+def test_mixture_state_scalar():
+    state = steam_batch.mixture_state(Property.TEMP, 120.5, 0.25)
+    expected = steam_engine.find_mixture(Property.TEMP, 120.5, 0.25, steam_engine.sat_by_T)
+    for (prop, value) in state.items():
+        assert np.ndim(value) == 0
+        assert close(value, expected[prop])
+    assert math.isnan(steam_batch.mixture_state(Property.TEMP, 120.5, 1.5)[Property.ENTHALPY])
+
+def test_mixture_quality_scalar():
+    h = steam_engine.find_mixture(Property.PRESSURE, 0.5, 0.4, steam_engine.sat_by_P)[Property.ENTHALPY]
+    quality = steam_batch.mixture_quality(Property.PRESSURE, 0.5, Property.ENTHALPY, h)
+    assert np.ndim(quality) == 0
+    assert quality == pytest.approx(0.4)
+    assert math.isnan(steam_batch.mixture_quality(Property.PRESSURE, 0.5, Property.ENTHALPY, 1e5))
+
+def test_T_P_lookup_scalar():
+    result = steam_batch.T_P_lookup(252.5, 1.1, Property.ENTHALPY)
+    assert np.ndim(result) == 0
+    assert close(result, steam_engine.find_value_T_P(252.5, 1.1, Property.ENTHALPY, steam_engine.comp_sup)[4])
+    phase = steam_batch.T_P_lookup(250, 1.0, Property.PHASE)
+    assert PHASES[int(phase)].value == steam_engine.find_value_T_P(250, 1.0, Property.PHASE, steam_engine.comp_sup)[4]
+
+def test_T_P_state_scalar():
+    state = steam_batch.T_P_state(252.5, 1.1)
+    expected = steam_engine.find_state_T_P(252.5, 1.1, steam_engine.comp_sup)
+    for (prop, value) in state.items():
+        assert np.ndim(value) == 0
+        if prop != Property.PHASE:
+            assert close(value, expected[prop])
+
+def test_T_P_derivatives_scalar():
+    (value, d_dT, d_dP) = steam_batch.T_P_derivatives(252.5, 1.1, Property.ENTHALPY)
+    expected = steam_engine.find_derivatives_T_P(252.5, 1.1, Property.ENTHALPY, steam_engine.comp_sup)
+    for (got, want) in zip((value, d_dT, d_dP), expected):
+        assert np.ndim(got) == 0
+        assert close(got, want)
+
+def test_array_shapes_kept():
+    values = np.array([[100.5, 120.5], [150.5, 1e6]])
+    assert steam_batch.sat_lookup(Property.TEMP, values, Property.PRESSURE).shape == (2, 2)
+    assert steam_batch.mixture_state(Property.TEMP, values, 0.5)[Property.VOLUME].shape == (2, 2)
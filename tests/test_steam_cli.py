@@ -0,0 +1,28 @@
+import csv
+import io
+import json
+import steam_cli
+
+def run(argv, text, monkeypatch, capsys):
+    monkeypatch.setattr("sys.stdin", io.StringIO(text))
+    steam_cli.main(argv)
+    return capsys.readouterr().out
+
+def test_csv_row_property_outside_header_is_an_error(monkeypatch, capsys):
+    text = "mode,T,P,properties\nT_AND_P,250,1,ENTHALPY\nT_AND_P,250,1,ENTROPY\n"
+    rows = list(csv.DictReader(io.StringIO(run(["-", "--properties", "ENTHALPY"], text, monkeypatch, capsys))))
+    assert float(rows[0]["ENTHALPY"]) == 2943.1
+    assert rows[0]["error"] == ""
+    assert rows[1]["ENTHALPY"] == ""
+    assert "ENTROPY" in rows[1]["error"]
+
+def test_csv_every_property_without_default(monkeypatch, capsys):
+    text = "mode,T,P,properties\nT_AND_P,250,1,ENTROPY\n"
+    rows = list(csv.DictReader(io.StringIO(run(["-"], text, monkeypatch, capsys))))
+    assert rows[0]["ENTROPY"] != ""
+    assert rows[0]["error"] == ""
+
+def test_jsonl_keeps_row_properties(monkeypatch, capsys):
+    text = json.dumps({"mode": "SAT_BY_T", "T": 100, "properties": ["PRESSURE"]}) + "\n"
+    out = run(["-", "--input-format", "jsonl", "--properties", "TEMP"], text, monkeypatch, capsys)
+    assert json.loads(out)["results"] == {"PRESSURE": 0.10142}
@@ -0,0 +1,76 @@
+import json
+import sys
+import types
+import pytest
+import Units
+import steam_engine
+import steam_profile
+from steam_engine import Property, CELSIUS
+
+@pytest.fixture
+def profile():
+    steam_profile.reset()
+    steam_profile.enable()
+    yield steam_profile
+    steam_profile.disable()
+    steam_profile.reset()
+
+@pytest.fixture
+def importer(monkeypatch):
+    # a module holding engine functions under its own names, as after
+    # ``from steam_engine import find_value_T_P``
+    module = types.ModuleType("profile_importer")
+    module.find_value_T_P = steam_engine.find_value_T_P
+    module.interpolate = steam_engine.search_interpolate
+    monkeypatch.setitem(sys.modules, module.__name__, module)
+    return module
+
+def test_enable_and_disable_rebind_everywhere(importer):
+    originals = (steam_engine.find_value_T_P, steam_engine.search_interpolate, Units.Converter.__call__)
+    steam_profile.enable()
+    try:
+        assert steam_profile.enabled()
+        assert importer.find_value_T_P is steam_engine.find_value_T_P
+        assert importer.find_value_T_P is not originals[0]
+        assert importer.interpolate.__wrapped__ is originals[1]
+        assert Units.Converter.__call__.__wrapped__ is originals[2]
+        # enabling twice doesn't wrap twice
+        steam_profile.enable()
+        assert importer.find_value_T_P.__wrapped__ is originals[0]
+    finally:
+        steam_profile.disable()
+    assert not steam_profile.enabled()
+    assert (importer.find_value_T_P, importer.interpolate) == originals[:2]
+    assert (steam_engine.find_value_T_P, steam_engine.search_interpolate, Units.Converter.__call__) == originals
+
+def test_counts_out_of_range(profile):
+    table = steam_engine.comp_sup
+    steam_engine.find_value_T_P(250, 1.0, Property.ENTHALPY, table)
+    steam_engine.find_value_T_P(1e4, 1.0, Property.ENTHALPY, table)
+    steam_engine.search_interpolate(Property.TEMP, -50, Property.PRESSURE, steam_engine.sat_by_T)
+    stages = profile.stats()["stages"]
+    assert stages["find_value_T_P"]["calls"] == 2
+    assert stages["find_value_T_P"]["out_of_range"] == 1
+    assert stages["find_value_T_P"]["out_of_range_rate"] == 0.5
+    assert stages["search_interpolate"]["out_of_range"] == 1
+    assert stages["grid_bracket"]["calls"] >= 1
+    assert "out_of_range" not in stages["grid_bracket"]
+
+def test_counts_errors(profile):
+    with pytest.raises(ValueError):
+        Units.convert(1.0, CELSIUS, steam_engine.MPA)
+    assert profile.stats()["stages"]["Units.convert"]["errors"] == 1
+
+def test_times_converter_calls(profile):
+    to_kelvin = Units.converter(CELSIUS, steam_engine.UNITS["K"])
+    assert to_kelvin(100.0) == pytest.approx(373.15)
+    Units.convert(0.0, CELSIUS, steam_engine.UNITS["K"])
+    stages = profile.stats()["stages"]
+    assert stages["Units.Converter"]["calls"] == 2
+    assert stages["Units.convert"]["calls"] == 1
+
+def test_dump(profile, tmp_path):
+    steam_engine.find_value_T_P(250, 1.0, Property.ENTHALPY, steam_engine.comp_sup)
+    path = tmp_path / "profile.json"
+    profile.dump(str(path))
+    assert json.loads(path.read_text())["stages"]["find_value_T_P"]["calls"] == 1
@@ -0,0 +1,110 @@
+import asyncio
+import json
+import pytest
+import steam_server
+from steam_server import SteamServer, Metrics
+
+class FakeWriter():
+    def __init__(self):
+        self.data = b""
+        self.closed = False
+
+    def write(self, data):
+        self.data += data
+
+    async def drain(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+def serve(request: bytes) -> tuple:
+    # runs one connection of a server without its worker pool
+    server = SteamServer.__new__(SteamServer)
+    server.metrics = Metrics()
+    writer = FakeWriter()
+
+    async def run():
+        reader = asyncio.StreamReader()
+        reader.feed_data(request)
+        reader.feed_eof()
+        await server.serve_connection(reader, writer)
+    asyncio.run(run())
+    (head, body) = writer.data.split(b"\r\n\r\n", 1)
+    return head.decode("latin-1"), json.loads(body), writer.closed
+
+def test_negative_content_length():
+    (head, body, closed) = serve(b"POST /lookup HTTP/1.1\r\nContent-Length: -5\r\n\r\n")
+    assert head.startswith("HTTP/1.1 400 ")
+    assert body == {"error": "Bad Content-Length."}
+    assert "Connection: close" in head
+    assert closed
+
+def test_bad_content_length():
+    (head, body, closed) = serve(b"POST /lookup HTTP/1.1\r\nContent-Length: ten\r\n\r\n")
+    assert head.startswith("HTTP/1.1 400 ")
+    assert body == {"error": "Bad Content-Length."}
+
+def call(method: str, path: str, body=None) -> tuple:
+    data = json.dumps(body).encode("utf-8") if body is not None else b""
+    head = f"{method} {path} HTTP/1.1\r\nContent-Length: {len(data)}\r\nConnection: close\r\n\r\n"
+    (head, response, closed) = serve(head.encode("latin-1") + data)
+    return int(head.split(" ", 2)[1]), response
+
+def test_lookup():
+    (status, body) = call("POST", "/lookup", {"mode": "T_AND_P", "T": 250, "P": 1.0, "properties": "ENTHALPY;PHASE"})
+    assert status == 200
+    assert body["results"]["ENTHALPY"] == pytest.approx(2943.1)
+    assert body["results"]["PHASE"] == "vapor"
+
+def test_lookup_needs_properties():
+    (status, body) = call("POST", "/lookup", {"mode": "T_AND_P", "T": 250, "P": 1.0})
+    assert status == 400
+    assert "properties" in body["error"]
+
+def test_batch_matches_lookups():
+    T = [25.0, 250.0, 612.3, 99.5, 1e4]
+    P = [0.1, 1.0, 7.7, 0.101325, 1.0]
+    request = {"mode": "T_AND_P", "T": T, "P": P, "properties": ["ENTHALPY", "PHASE", "ENTROPY_LIQUID"],
+               "units": {"ENTHALPY": "kJ/mol"}, "dome": True}
+    (status, body) = call("POST", "/batch", request)
+    assert status == 200
+    for (i, (x, y)) in enumerate(zip(T, P)):
+        (status, one) = call("POST", "/lookup", dict(request, T=x, P=y))
+        for (name, value) in one["results"].items():
+            assert body["results"][name][i] == pytest.approx(value)
+    assert body["results"]["ENTROPY_LIQUID"] == [None] * len(T)
+    assert body["results"]["ENTHALPY"][-1] is None
+
+def test_batch_saturation_with_units():
+    (status, body) = call("POST", "/batch", {"mode": "SAT_BY_P", "P": [100, 1000], "P_unit": "kPa",
+                                             "properties": "TEMP;PHASE"})
+    assert status == 200
+    assert body["results"]["TEMP"] == [pytest.approx(99.61, abs=0.01), pytest.approx(179.88, abs=0.01)]
+    assert body["results"]["PHASE"] == [None, None]
+
+@pytest.mark.parametrize("request_body", [
+    {"mode": "T_AND_P", "T": [1, 2, 3], "P": [1, 2], "properties": "ENTHALPY"},
+    {"mode": "T_AND_P", "T": [1, 2], "P": [1, 2]},
+    {"mode": "T_AND_P", "T": [1, 2], "P": [1, 2], "properties": []},
+    {"mode": "T_AND_P", "T": [1, 2], "properties": "ENTHALPY"},
+    {"mode": "NOT_A_MODE", "T": [1, 2], "P": [1, 2], "properties": "ENTHALPY"},
+])
+def test_bad_batch(request_body):
+    (status, body) = call("POST", "/batch", request_body)
+    assert status == 400
+    assert body["error"]
+
+def test_health():
+    (status, body) = call("GET", "/health")
+    assert status == 200
+    assert body["status"] == "ok"
+    assert "comp_sup" in body["tables"]
+    assert call("POST", "/health")[0] == 405
+    assert call("GET", "/nowhere")[0] == 404
+
+def test_batch_without_numpy(monkeypatch):
+    request = {"mode": "SAT_BY_T", "T": [20.0, 150.5, 500.0], "properties": "PRESSURE;ENTHALPY_VAPOR;PHASE"}
+    vectorized = steam_server.lookup_batch(request)
+    monkeypatch.setattr(steam_server, "steam_batch", None)
+    assert steam_server.lookup_batch(request) == vectorized
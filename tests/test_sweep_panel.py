@@ -0,0 +1,84 @@
+import queue
+import threading
+import pytest
+
+sweep_panel = pytest.importorskip("sweep_panel")
+from steam_engine import Property, SearchMode
+
+class Value():
+    # stands in for the entries, comboboxes, spinbox and StringVar
+    def __init__(self, value=""):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+
+    def configure(self, **kwargs):
+        pass
+
+class Listbox():
+    def __init__(self, selected):
+        self.selected = selected
+
+    def curselection(self):
+        return self.selected
+
+class Table():
+    def __init__(self):
+        self.rows = []
+
+    def set_columns(self, headings):
+        self.headings = headings
+
+    def extend(self, rows):
+        self.rows.extend(rows)
+
+def make_panel(mode, temps="", pressures="", props=(Property.ENTHALPY,)):
+    # a panel without a display: run() and poll() only touch these attributes
+    panel = sweep_panel.SweepPanel.__new__(sweep_panel.SweepPanel)
+    panel.mode = Value(mode.value)
+    panel.mode_props = sorted(sweep_panel.mode_properties(mode), key=lambda x: x.disp_name)
+    panel.prop_list = Listbox([panel.mode_props.index(x) for x in props])
+    panel.temp_entry = Value(temps)
+    panel.pres_entry = Value(pressures)
+    panel.temp_unit_sel = Value("°C")
+    panel.pres_unit_sel = Value("MPa")
+    panel.workers = Value("1")
+    panel.status = Value()
+    panel.run_button = panel.cancel_button = panel.save_button = Value()
+    panel.table = Table()
+    panel.results = []
+    panel.inputs = ()
+    panel.chunks = queue.Queue()
+    panel.cancelled = threading.Event()
+    panel.after = lambda ms, func: "poll"
+    return panel
+
+def finish(panel):
+    panel.run()
+    panel.worker.join(10)
+    panel.poll()
+    return panel
+
+def test_run_T_AND_P_sweep():
+    panel = finish(make_panel(SearchMode.T_AND_P, "100:200:50", "0.1,1"))
+    assert panel.status.get() == "6 of 6 points."
+    assert panel.inputs == ("T", "P")
+    assert [x[:2] for x in panel.results] == [(100.0, 0.1), (150.0, 0.1), (200.0, 0.1),
+                                              (100.0, 1.0), (150.0, 1.0), (200.0, 1.0)]
+    assert panel.results[0][2]["ENTHALPY"] == pytest.approx(2675.8)
+    assert panel.table.rows[0] == ["100", "0.1", "2675.8"]
+
+def test_run_saturation_sweep_ignores_other_entry():
+    panel = finish(make_panel(SearchMode.SAT_BY_P, pressures="0.1:1:0.3", props=(Property.TEMP,)))
+    assert panel.status.get() == "4 of 4 points."
+    assert [x[1] for x in panel.results] == [0.1, 0.4, 0.7, 1.0]
+    assert all(x[0] is None for x in panel.results)
+
+def test_run_reports_missing_values():
+    panel = make_panel(SearchMode.T_AND_P, "100:200:50")
+    panel.run()
+    assert panel.status.get() == "ERROR: P values are required for mode T_AND_P."
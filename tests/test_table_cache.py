@@ -0,0 +1,89 @@
+import os
+import shutil
+import pytest
+import steam_engine
+import table_cache
+from steam_engine import Property
+
+@pytest.fixture
+def csv_copy(tmp_path, monkeypatch):
+    # a saturation table and unit config in a directory of their own, with a current cache
+    csv_path = str(tmp_path / "sat_by_T.csv")
+    shutil.copy(steam_engine.sat_by_T_file, csv_path)
+    config = str(tmp_path / "unit_config.json")
+    shutil.copy(steam_engine.unit_config_file, config)
+    monkeypatch.setattr(steam_engine, "unit_config_file", config)
+    table = steam_engine.read_csv(csv_path, steam_engine.TABLE_SCHEMAS["sat_by_T"])
+    table_cache.save(table, csv_path, Property.TEMP)
+    assert table_cache.load(csv_path) is not None
+    return csv_path
+
+def bump_mtime(path: str) -> None:
+    st = os.stat(path)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+
+def test_loads_same_table(csv_copy):
+    table = table_cache.load(csv_copy)
+    original = steam_engine.read_csv(csv_copy, steam_engine.TABLE_SCHEMAS["sat_by_T"])
+    assert list(table.columns[Property.PRESSURE]) == list(original.columns[Property.PRESSURE])
+    assert steam_engine.search_interpolate(Property.TEMP, 123.4, Property.PRESSURE, table) == \
+        steam_engine.search_interpolate(Property.TEMP, 123.4, Property.PRESSURE, original)
+
+def test_touched_csv_is_current(csv_copy):
+    bump_mtime(csv_copy)
+    assert table_cache.load(csv_copy) is not None
+
+def test_changed_csv_is_stale(csv_copy):
+    with open(csv_copy, "rb") as f:
+        data = f.read()
+    # same size, different content
+    i = data.index(b"1", data.index(b"\n"))
+    with open(csv_copy, "wb") as f:
+        f.write(data[:i] + b"2" + data[i + 1:])
+    bump_mtime(csv_copy)
+    assert table_cache.load(csv_copy) is None
+
+def test_changed_unit_config_is_stale(csv_copy):
+    with open(steam_engine.unit_config_file, "a", encoding="utf-8") as f:
+        f.write("\n")
+    assert table_cache.load(csv_copy) is None
+
+def test_unwritable_cache_is_skipped(csv_copy, monkeypatch):
+    def refuse(*args):
+        raise PermissionError("read-only")
+    monkeypatch.setattr(os, "replace", refuse)
+    os.remove(table_cache.cache_path(csv_copy))
+    table = steam_engine.read_csv(csv_copy, steam_engine.TABLE_SCHEMAS["sat_by_T"])
+    table_cache.save(table, csv_copy, Property.TEMP)
+    assert table_cache.load(csv_copy) is None
+    # nor is the temporary file left behind
+    assert sorted(os.listdir(os.path.dirname(csv_copy))) == ["sat_by_T.csv", "unit_config.json"]
+
+@pytest.mark.skipif(hasattr(os, "geteuid") and os.geteuid() == 0, reason="root can write to read-only directories")
+def test_read_only_directory(csv_copy):
+    os.remove(table_cache.cache_path(csv_copy))
+    directory = os.path.dirname(csv_copy)
+    os.chmod(directory, 0o555)
+    try:
+        table = steam_engine.read_csv(csv_copy, steam_engine.TABLE_SCHEMAS["sat_by_T"])
+        table_cache.save(table, csv_copy, Property.TEMP)
+        assert table_cache.load(csv_copy) is None
+    finally:
+        os.chmod(directory, 0o755)
+
+@pytest.mark.parametrize("damage", ["magic", "header", "truncated_header", "truncated_data", "empty"])
+def test_damaged_cache_is_stale(csv_copy, damage):
+    path = table_cache.cache_path(csv_copy)
+    with open(path, "rb") as f:
+        data = f.read()
+    header_end = len(table_cache.MAGIC) + 8 + 20
+    data = {
+        "magic": b"XXXXXXXX" + data[8:],
+        "header": data[:len(table_cache.MAGIC) + 8] + b"{" * 20 + data[header_end:],
+        "truncated_header": data[:header_end],
+        "truncated_data": data[:-100],
+        "empty": b"",
+    }[damage]
+    with open(path, "wb") as f:
+        f.write(data)
+    assert table_cache.load(csv_copy) is None
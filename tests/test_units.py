@@ -0,0 +1,12 @@
+import Units
+from Units import Unit, converter
+from steam_engine import CELSIUS, UNITS
+
+def test_equal_units_share_a_converter():
+    kelvin = UNITS["K"]
+    before = len(Units._converters)
+    for _ in range(100):
+        copy = Unit("K", kelvin.conversion, kelvin.type, kelvin.native_shift, kelvin.si_shift)
+        assert converter(copy, CELSIUS) is converter(kelvin, CELSIUS)
+    assert len(Units._converters) <= before + 1
+    assert converter(kelvin, CELSIUS)(373.15) == converter(copy, CELSIUS)(373.15)